@@ -12,13 +12,14 @@ sys.path.append(str(Path(__file__).parent.parent / "server"))
 
 from process.asr_func.live_microphone import LiveMicrophoneRecorder
 from process.llm_funcs.llm_scr import llm_response
-from process.tts_func.emotion_tts import sovits_gen_emotional, EmotionalTTS
+from process.tts_func.engine_manager import get_engine
+from process.asr_func.asr_pipeline import transcribe_samples
 from faster_whisper import WhisperModel
 
 class VRMInterface:
     def __init__(self):
         self.whisper_model = WhisperModel("base.en", device="cpu", compute_type="float32")
-        self.emotional_tts = EmotionalTTS()
+        self.emotional_tts = get_engine('emotional')
         self.live_recorder = None
         self.is_listening = False
         self.conversation_history = []
@@ -266,10 +267,9 @@ class VRMInterface:
         emotion = self.emotional_tts.detect_emotion(riko_response)
         self.current_emotion = emotion
         
-        # Generate emotional TTS
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-            audio_path = sovits_gen_emotional(riko_response, tmp_file.name, emotion)
+        # Generate emotional TTS in memory and hand Gradio (sample_rate, samples) directly
+        clip = self.emotional_tts.synthesize(riko_response, emotion)
+        audio = clip.to_gradio() if clip is not None else None
         
         # Update conversation history
         self.conversation_history.append(f"You: {user_input}")
@@ -278,7 +278,7 @@ class VRMInterface:
         # Generate animation data
         animation_data = self.get_vrm_animation_data(emotion, is_speaking=True)
         
-        return riko_response, audio_path, "\n".join(self.conversation_history[-10:]), animation_data
+        return riko_response, audio, "\n".join(self.conversation_history[-10:]), animation_data
     
     def create_interface(self):
         """Create the VRM interface with 3D model viewer"""
@@ -349,14 +349,8 @@ class VRMInterface:
                 if audio is None:
                     return "", "", None, "neutral", self.conversation_history, {}
                 
-                # Transcribe audio
-                import tempfile
-                import soundfile as sf
-                
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                    sf.write(tmp_file.name, audio[1], audio[0])
-                    segments, _ = self.whisper_model.transcribe(tmp_file.name)
-                    user_text = " ".join([segment.text for segment in segments])
+                # Transcribe audio - Gradio gives (sample_rate, samples)
+                user_text = transcribe_samples(self.whisper_model, audio[1], audio[0])
                 
                 if user_text.strip():
                     response, audio_out, history, anim_data = self.process_conversation(user_text)
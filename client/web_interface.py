@@ -4,7 +4,6 @@ import threading
 import queue
 import numpy as np
 import soundfile as sf
-import tempfile
 import os
 from pathlib import Path
 import sys
@@ -14,7 +13,8 @@ sys.path.append(str(Path(__file__).parent.parent / "server"))
 
 from process.asr_func.asr_push_to_talk import record_and_transcribe
 from process.llm_funcs.llm_scr import llm_response
-from process.tts_func.sovits_ping import sovits_gen
+from process.tts_func.sovits_ping import sovits_synthesize
+from process.asr_func.asr_pipeline import transcribe_samples
 from faster_whisper import WhisperModel
 
 class RikoWebInterface:
@@ -24,21 +24,17 @@ class RikoWebInterface:
         self.audio_queue = queue.Queue()
         self.conversation_history = []
         
-    def process_audio_input(self, audio_data, sample_rate):
+    def process_audio_input(self, audio):
         """Process audio input from the web interface"""
-        if audio_data is None:
+        if audio is None:
             return "No audio received", None, self.conversation_history
-            
-        # Save audio to temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-            sf.write(tmp_file.name, audio_data, sample_rate)
-            
-            # Transcribe audio
-            segments, _ = self.whisper_model.transcribe(tmp_file.name)
-            user_text = " ".join([segment.text for segment in segments])
-            
-            # Clean up temp file
-            os.unlink(tmp_file.name)
+        
+        # Gradio numpy audio arrives as (sample_rate, int16 samples)
+        sample_rate, audio_data = audio
+        
+        # Trim, normalize and resample in memory, then transcribe
+        # (junk/hallucinated turns come back empty)
+        user_text = transcribe_samples(self.whisper_model, audio_data, sample_rate)
             
         if not user_text.strip():
             return "No speech detected", None, self.conversation_history
@@ -46,15 +42,15 @@ class RikoWebInterface:
         # Get LLM response
         riko_response = llm_response(user_text)
         
-        # Generate TTS
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_output:
-            audio_path = sovits_gen(riko_response, tmp_output.name)
+        # Generate TTS in memory and hand Gradio (sample_rate, samples) directly
+        clip = sovits_synthesize(riko_response)
+        audio = clip.to_gradio() if clip is not None else None
             
         # Update conversation history
         self.conversation_history.append(f"You: {user_text}")
         self.conversation_history.append(f"Riko: {riko_response}")
         
-        return user_text, audio_path, "\n".join(self.conversation_history[-10:])  # Last 10 messages
+        return user_text, audio, "\n".join(self.conversation_history[-10:])  # Last 10 messages
     
     def create_interface(self):
         """Create the Gradio web interface"""
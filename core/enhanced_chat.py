@@ -11,7 +11,6 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from server.process.asr_func.asr_push_to_talk import record_and_transcribe
 from server.process.llm_funcs.llm_scr import llm_response
 from pathlib import Path
-import uuid
 import argparse
 
 def detect_emotion(text):
@@ -36,16 +35,16 @@ def detect_emotion(text):
     else:
         return 'happy'  # default
 
-def enhanced_sovits_gen(text, output_path, emotion='happy'):
-    """Generate audio with emotional parameters"""
+def enhanced_synthesize(text, emotion='happy'):
+    """Generate audio in memory with emotional parameters"""
     try:
         # Import here to avoid issues if not available
-        from server.process.tts_func.emotion_tts import sovits_gen_emotional
-        return sovits_gen_emotional(text, output_path, emotion)
+        from server.process.tts_func.engine_manager import get_engine
+        return get_engine('emotional').synthesize(text, emotion)
     except ImportError:
         # Fallback to basic generation
-        from server.process.tts_func.sovits_ping import sovits_gen
-        return sovits_gen(text, output_path)
+        from server.process.tts_func.sovits_ping import sovits_synthesize
+        return sovits_synthesize(text)
 
 def main():
     """Main enhanced chat loop"""
@@ -71,19 +70,10 @@ def main():
                 
                 print(f"🎌 Riko ({emotion}): {response}")
                 
-                # Generate audio
-                uid = uuid.uuid4().hex
-                output_path = Path("audio") / f"output_{uid}.wav"
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                enhanced_sovits_gen(response, output_path, emotion)
-                
-                # Play audio
-                from server.process.tts_func.sovits_ping import play_audio
-                play_audio(output_path)
-                
-                # Cleanup
-                output_path.unlink(missing_ok=True)
+                # Generate and play audio straight from memory
+                clip = enhanced_synthesize(response, emotion)
+                if clip is not None:
+                    clip.play().wait()
                 
             except KeyboardInterrupt:
                 print("\n👋 Chat ended")
@@ -108,20 +98,10 @@ def main():
                 
                 print(f"🎌 Riko ({emotion}): {response}")
                 
-                # Generate and play audio
-                uid = uuid.uuid4().hex
-                output_path = Path("audio") / f"output_{uid}.wav"
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                enhanced_sovits_gen(response, output_path, emotion)
-                
-                from server.process.tts_func.sovits_ping import play_audio
-                play_audio(output_path)
-                
-                # Cleanup
-                for fp in Path("audio").glob("*.wav"):
-                    if fp.is_file():
-                        fp.unlink()
+                # Generate and play audio straight from memory
+                clip = enhanced_synthesize(response, emotion)
+                if clip is not None:
+                    clip.play().wait()
                         
             except KeyboardInterrupt:
                 print("\n👋 Chat ended")
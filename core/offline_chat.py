@@ -10,7 +10,6 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from server.process.asr_func.asr_push_to_talk import record_and_transcribe
 from pathlib import Path
-import uuid
 
 def check_local_ai():
     """Check if local AI is available"""
@@ -28,32 +27,27 @@ def offline_response(text):
         return ai.get_response(text)
     except:
         # Simple fallback responses
-        responses = {
-            'hello': "Hello there! I'm Riko, your offline AI companion!",
-            'how are you': "I'm doing great! Thanks for asking, senpai!",
-            'what is your name': "I'm Riko, your snarky anime AI assistant!",
-            'goodbye': "See you later, senpai! Take care!",
-        }
+        from server.process.llm_funcs.canned_responses import OFFLINE_RESPONSES, OFFLINE_DEFAULT_RESPONSE
         
         text_lower = text.lower()
-        for key, response in responses.items():
+        for key, response in OFFLINE_RESPONSES.items():
             if key in text_lower:
                 return response
         
-        return "That's interesting! Tell me more about that, senpai!"
+        return OFFLINE_DEFAULT_RESPONSE
 
-def offline_voice_gen(text, output_path):
-    """Generate voice using available TTS"""
+def offline_voice_gen(text):
+    """Generate voice in memory using available TTS"""
     try:
         # Try dynamic voice cloning first
-        from server.process.tts_func.dynamic_voice_clone import DynamicVoiceClone
-        voice_clone = DynamicVoiceClone()
-        return voice_clone.generate_speech(text, output_path)
+        from server.process.tts_func.engine_manager import get_engine
+        voice_clone = get_engine('dynamic')
+        return voice_clone.synthesize(text)
     except:
         try:
             # Fallback to regular TTS
-            from server.process.tts_func.sovits_ping import sovits_gen
-            return sovits_gen(text, output_path)
+            from server.process.tts_func.sovits_ping import sovits_synthesize
+            return sovits_synthesize(text)
         except:
             print("⚠️ Voice synthesis not available in offline mode")
             return None
@@ -72,6 +66,13 @@ def main():
     # Initialize Whisper model
     whisper_model = WhisperModel("base.en", device="cpu", compute_type="float32")
     
+    # Pre-render the canned replies in the dynamic voice (no-op when the bank is current)
+    try:
+        from server.process.tts_func.phrase_bank import ensure_phrase_bank
+        ensure_phrase_bank('dynamic')
+    except Exception as e:
+        print(f"⚠️ Phrase bank unavailable: {e}")
+    
     while True:
         try:
             # Record and transcribe user input
@@ -88,22 +89,13 @@ def main():
             response = offline_response(user_text)
             print(f"🎌 Riko: {response}")
             
-            # Generate and play audio if available
-            uid = uuid.uuid4().hex
-            output_path = Path("audio") / f"output_{uid}.wav"
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            if offline_voice_gen(response, output_path):
+            # Generate and play audio if available (kept in memory, nothing to clean up)
+            clip = offline_voice_gen(response)
+            if clip is not None:
                 try:
-                    from server.process.tts_func.sovits_ping import play_audio
-                    play_audio(output_path)
+                    clip.play().wait()
                 except:
                     print("🔇 Audio playback not available")
-            
-            # Cleanup
-            for fp in Path("audio").glob("*.wav"):
-                if fp.is_file():
-                    fp.unlink()
                     
         except KeyboardInterrupt:
             print("\n👋 Chat ended")
@@ -11,9 +11,8 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from server.process.asr_func.asr_push_to_talk import record_and_transcribe
 from server.process.llm_funcs.llm_scr import llm_response
-from server.process.tts_func.sovits_ping import sovits_gen, play_audio
+from server.process.tts_func.sovits_ping import sovits_speak
 from pathlib import Path
-import uuid
 
 def main():
     """Main voice chat loop"""
@@ -40,18 +39,8 @@ def main():
             response = llm_response(user_text)
             print(f"🎌 Riko: {response}")
             
-            # Generate and play audio
-            uid = uuid.uuid4().hex
-            output_path = Path("audio") / f"output_{uid}.wav"
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            sovits_gen(response, output_path)
-            play_audio(output_path)
-            
-            # Cleanup
-            for fp in Path("audio").glob("*.wav"):
-                if fp.is_file():
-                    fp.unlink()
+            # Generate and play audio sentence by sentence
+            sovits_speak(response)
                     
         except KeyboardInterrupt:
             print("\n👋 Chat ended")
@@ -8,51 +8,19 @@ import subprocess
 import sys
 import os
 import time
-import requests
 from pathlib import Path
 
+from server.process.tts_func.sovits_client import get_sovits_client
+from server.process.tts_func.sovits_supervisor import start_gpt_sovits_pool
+
 def check_gpt_sovits_server():
     """Check if GPT-SoVITS server is running"""
-    try:
-        response = requests.get("http://127.0.0.1:9880", timeout=3)
-        return True
-    except:
-        return False
+    return get_sovits_client().is_alive(timeout=3)
 
 def start_gpt_sovits_server():
-    """Start GPT-SoVITS server"""
+    """Start GPT-SoVITS server (the configured worker pool, logs drained by the supervisor)"""
     print("🚀 Starting GPT-SoVITS server...")
-    
-    gpt_sovits_path = Path("GPT-SoVITS")
-    if not gpt_sovits_path.exists():
-        print("❌ GPT-SoVITS directory not found!")
-        print("💡 Make sure GPT-SoVITS is properly installed in the project directory")
-        return False
-    
-    try:
-        # Start server in background
-        process = subprocess.Popen(
-            [sys.executable, "api.py"],
-            cwd=gpt_sovits_path,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        
-        # Wait for server to start
-        print("⏳ Waiting for GPT-SoVITS server to start...")
-        for i in range(30):  # Wait up to 30 seconds
-            if check_gpt_sovits_server():
-                print("✅ GPT-SoVITS server is running!")
-                return True
-            time.sleep(1)
-            print(f"   Waiting... ({i+1}/30)")
-        
-        print("❌ GPT-SoVITS server failed to start within 30 seconds")
-        return False
-        
-    except Exception as e:
-        print(f"❌ Error starting GPT-SoVITS server: {e}")
-        return False
+    return start_gpt_sovits_pool(timeout=30)
 
 def launch_interface(interface_type):
     """Launch the specified interface"""
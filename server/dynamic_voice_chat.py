@@ -1,7 +1,7 @@
 from faster_whisper import WhisperModel
 from process.asr_func.asr_push_to_talk import record_and_transcribe
 from process.llm_funcs.llm_scr import llm_response  # Uses OpenAI with your API key
-from process.tts_func.dynamic_voice_clone import DynamicVoiceClone
+from process.tts_func.engine_manager import get_engine
 from pathlib import Path
 import threading
 import time
@@ -36,7 +36,7 @@ class DynamicVoiceChat:
         
         # Initialize dynamic voice cloning
         print("🎵 Initializing dynamic voice cloning...")
-        self.voice_clone = DynamicVoiceClone()
+        self.voice_clone = get_engine('dynamic')
         
         if self.voice_clone.voice_sample_path.exists():
             print("✅ Dynamic voice cloning ready!")
@@ -77,11 +77,10 @@ class DynamicVoiceChat:
         # Generate and play voice in background
         def speak_async():
             try:
-                audio_path = self.voice_clone.speak_text_dynamic(text, play_immediately=True)
-                if audio_path:
+                # The clip stays in memory - nothing to clean up afterwards
+                clip = self.voice_clone.speak_text_dynamic(text, play_immediately=True)
+                if clip is not None:
                     print("🔊 Playing dynamically cloned voice...")
-                    # Clean up temp file after a delay
-                    threading.Timer(10.0, lambda: self.cleanup_temp_file(audio_path)).start()
                 else:
                     print("❌ Failed to clone voice")
             except Exception as e:
@@ -93,15 +92,6 @@ class DynamicVoiceChat:
         speak_thread.daemon = True
         speak_thread.start()
     
-    def cleanup_temp_file(self, file_path: str):
-        """Clean up temporary audio file"""
-        try:
-            import os
-            if os.path.exists(file_path):
-                os.unlink(file_path)
-        except:
-            pass
-    
     def stop_speaking(self):
         """Stop current speech"""
         if self.voice_clone and self.is_speaking:
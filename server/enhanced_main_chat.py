@@ -1,11 +1,13 @@
 from faster_whisper import WhisperModel
 from process.asr_func.live_microphone import LiveMicrophoneRecorder
 from process.llm_funcs.llm_scr import llm_response
-from process.tts_func.emotion_tts import sovits_gen_emotional
+from process.tts_func.emotion_tts import sovits_speak_emotional
+from process.asr_func.transcript_gate import get_transcript_gate
+from process.tts_func.sovits_client import get_sovits_client
+from process.tts_func.tts_cache import get_tts_cache
 from pathlib import Path
 import threading
 import time
-import uuid
 import argparse
 import sys
 
@@ -41,26 +43,15 @@ class EnhancedRikoChat:
                 print("🤔 Riko is thinking...")
                 llm_output = llm_response(user_spoken_text)
                 
-                # Generate emotional TTS
-                uid = uuid.uuid4().hex
-                filename = f"output_{uid}.wav"
-                output_wav_path = Path("audio") / filename
-                output_wav_path.parent.mkdir(parents=True, exist_ok=True)
-                
+                # Speak with emotional TTS - the first sentence plays while the rest synthesize
                 print("🎵 Generating emotional voice...")
-                audio_path = sovits_gen_emotional(llm_output, str(output_wav_path))
-                
-                if audio_path:
-                    # Play audio
-                    from process.tts_func.sovits_ping import play_audio
-                    play_audio(output_wav_path)
-                    
-                    # Clean up
-                    [fp.unlink() for fp in Path("audio").glob("*.wav") if fp.is_file()]
-                else:
+                if not sovits_speak_emotional(llm_output):
                     print("❌ Failed to generate audio")
                 
             except KeyboardInterrupt:
+                get_transcript_gate().report()
+                get_sovits_client().report()
+                get_tts_cache().report()
                 print("\n👋 Goodbye!")
                 break
             except Exception as e:
@@ -95,21 +86,10 @@ class EnhancedRikoChat:
                         llm_output = llm_response(user_text)
                         print(f"🎌 Riko: {llm_output}")
                         
-                        # Generate emotional TTS
-                        uid = uuid.uuid4().hex
-                        filename = f"output_{uid}.wav"
-                        output_wav_path = Path("audio") / filename
-                        output_wav_path.parent.mkdir(parents=True, exist_ok=True)
-                        
+                        # Speak with emotional TTS - the first sentence plays while the rest synthesize
                         print("🎵 Generating emotional voice...")
-                        audio_path = sovits_gen_emotional(llm_output, str(output_wav_path))
-                        
-                        if audio_path:
-                            from process.tts_func.sovits_ping import play_audio
-                            play_audio(output_wav_path)
-                            
-                            # Clean up
-                            [fp.unlink() for fp in Path("audio").glob("*.wav") if fp.is_file()]
+                        if not sovits_speak_emotional(llm_output):
+                            print("❌ Failed to generate audio")
                         
                         print("\n🎧 Listening for more...")
                 
@@ -145,21 +125,10 @@ class EnhancedRikoChat:
                 llm_output = llm_response(user_input)
                 print(f"🎌 Riko: {llm_output}")
                 
-                # Generate emotional TTS
-                uid = uuid.uuid4().hex
-                filename = f"output_{uid}.wav"
-                output_wav_path = Path("audio") / filename
-                output_wav_path.parent.mkdir(parents=True, exist_ok=True)
-                
+                # Speak with emotional TTS - the first sentence plays while the rest synthesize
                 print("🎵 Generating emotional voice...")
-                audio_path = sovits_gen_emotional(llm_output, str(output_wav_path))
-                
-                if audio_path:
-                    from process.tts_func.sovits_ping import play_audio
-                    play_audio(output_wav_path)
-                    
-                    # Clean up
-                    [fp.unlink() for fp in Path("audio").glob("*.wav") if fp.is_file()]
+                if not sovits_speak_emotional(llm_output):
+                    print("❌ Failed to generate audio")
                 
                 print()  # Empty line for readability
                 
@@ -190,11 +159,9 @@ def main():
     print("=" * 50)
     
     # Check if GPT-SoVITS server is running
-    import requests
-    try:
-        response = requests.get("http://127.0.0.1:9880", timeout=5)
+    if get_sovits_client().is_alive(timeout=5):
         print("✅ GPT-SoVITS server is running")
-    except:
+    else:
         print("❌ GPT-SoVITS server not detected!")
         print("💡 Please start the GPT-SoVITS server first:")
         print("   cd riko_project/GPT-SoVITS")
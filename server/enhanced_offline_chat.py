@@ -1,7 +1,8 @@
 from faster_whisper import WhisperModel
 from process.asr_func.asr_push_to_talk import record_and_transcribe
 from process.llm_funcs.local_ai import llm_response
-from process.tts_func.gpt_sovits_clone import GPTSoVITSVoiceClone
+from process.tts_func.engine_manager import get_engine
+from process.tts_func.phrase_bank import ensure_phrase_bank
 from pathlib import Path
 import uuid
 import time
@@ -36,7 +37,7 @@ class EnhancedOfflineRiko:
         
         # Initialize voice cloning
         print("🎵 Initializing voice cloning system...")
-        self.voice_clone = GPTSoVITSVoiceClone()
+        self.voice_clone = get_engine('cloned')
         
         if not self.voice_clone.server_running:
             print("⚠️ GPT-SoVITS server not running")
@@ -50,6 +51,9 @@ class EnhancedOfflineRiko:
                 print("💡 Voice cloning disabled - text only mode")
         else:
             print("✅ Voice cloning ready!")
+        
+        # Pre-render the canned fallback replies in this voice (no-op when the bank is current)
+        ensure_phrase_bank('cloned')
     
     def listen_for_input(self) -> str:
         """Listen for voice input"""
@@ -85,10 +89,8 @@ class EnhancedOfflineRiko:
         # Generate and play voice in background
         def speak_async():
             try:
-                audio_path = self.voice_clone.speak_text(text, play_immediately=True)
-                if audio_path:
-                    print("🔊 Playing cloned voice...")
-                else:
+                # First sentence starts playing while the rest synthesize
+                if not self.voice_clone.speak_text_pipelined(text):
                     print("❌ Failed to generate voice")
             except Exception as e:
                 print(f"❌ Voice error: {e}")
@@ -1,12 +1,11 @@
 from faster_whisper import WhisperModel
 from process.asr_func.asr_push_to_talk import record_and_transcribe
 from process.llm_funcs.llm_scr import llm_response
-from process.tts_func.sovits_ping import sovits_gen, play_audio
+from process.tts_func.sovits_ping import sovits_speak
 from pathlib import Path
 import os
 import time
 ### transcribe audio 
-import uuid
 import soundfile as sf
 
 
@@ -24,6 +23,10 @@ while True:
     conversation_recording.parent.mkdir(parents=True, exist_ok=True)
 
     user_spoken_text = record_and_transcribe(whisper_model, conversation_recording)
+    if not user_spoken_text.strip():
+        # Silence, noise or a Whisper hallucination - don't spend LLM/TTS on it
+        print("⚠️ Didn't catch that, try again")
+        continue
 
     ### pass to LLM and get a LLM output.
 
@@ -31,21 +34,9 @@ while True:
 
     tts_read_text = llm_output
 
-    ### file organization 
+    # synthesize sentence by sentence - the first one plays while the rest generate
+    sovits_speak(tts_read_text)
 
-    # 1. Generate a unique filename
-    uid = uuid.uuid4().hex
-    filename = f"output_{uid}.wav"
-    output_wav_path = Path("audio") / filename
-    output_wav_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # generate audio and save it to client/audio 
-    gen_aud_path = sovits_gen(tts_read_text,output_wav_path)
-
-
-    play_audio(output_wav_path)
-    # clean up audio files
-    [fp.unlink() for fp in Path("audio").glob("*.wav") if fp.is_file()]
     # # Example
     # duration = get_wav_duration(output_wav_path)
 
@@ -1,9 +1,7 @@
 from faster_whisper import WhisperModel
 from process.asr_func.asr_push_to_talk import record_and_transcribe
 from process.llm_funcs.local_ai import llm_response
-from process.tts_func.voice_clone_tts import sovits_gen_character, play_audio
 from pathlib import Path
-import uuid
 import time
 
 def main():
@@ -26,8 +24,8 @@ def main():
     # Test character voice
     print("🎵 Loading character voice...")
     try:
-        from process.tts_func.voice_clone_tts import VoiceCloneTTS
-        tts = VoiceCloneTTS()
+        from process.tts_func.engine_manager import get_engine
+        tts = get_engine('character')
         if tts.voice_available:
             print("✅ Character voice ready!")
         else:
@@ -63,21 +61,12 @@ def main():
             # Generate and play voice response
             if tts and tts.voice_available:
                 print("🎵 Generating voice...")
-                uid = uuid.uuid4().hex
-                filename = f"output_{uid}.wav"
-                output_wav_path = Path("audio") / filename
+                # Synthesized straight into memory - no output files to clean up
+                clip = tts.synthesize(llm_output)
                 
-                audio_path = sovits_gen_character(llm_output, str(output_wav_path))
-                
-                if audio_path and Path(audio_path).exists():
+                if clip is not None:
                     print("🔊 Playing response...")
-                    play_audio(output_wav_path)
-                    
-                    # Clean up audio files
-                    try:
-                        [fp.unlink() for fp in Path("audio").glob("*.wav") if fp.is_file()]
-                    except:
-                        pass
+                    clip.play().wait()
                 else:
                     print("⚠️ Could not generate voice, continuing with text...")
             
@@ -1,5 +1,5 @@
 from process.llm_funcs.local_ai import llm_response
-from process.tts_func.voice_clone_tts import VoiceCloneTTS
+from process.tts_func.engine_manager import get_engine
 import time
 
 def main():
@@ -16,7 +16,7 @@ def main():
     # Initialize character voice (optional)
     print("🎵 Loading character voice...")
     try:
-        tts = VoiceCloneTTS()
+        tts = get_engine('character')
         voice_available = tts.voice_available
         if voice_available:
             print("✅ Character voice ready!")
@@ -0,0 +1,59 @@
+import os
+import time
+import soundfile as sf
+
+try:
+    from process.asr_func.transcript_gate import get_transcript_gate
+    from process.asr_func.decoding_profiles import DECODING_PROFILES, get_decoding_policy
+    from process.asr_func.audio_preprocess import prepare_for_asr, WHISPER_SAMPLE_RATE
+except ImportError:
+    from server.process.asr_func.transcript_gate import get_transcript_gate
+    from server.process.asr_func.decoding_profiles import DECODING_PROFILES, get_decoding_policy
+    from server.process.asr_func.audio_preprocess import prepare_for_asr, WHISPER_SAMPLE_RATE
+
+
+def audio_duration(audio) -> float:
+    """Length in seconds of a file path or 16 kHz array"""
+    if isinstance(audio, (str, os.PathLike)):
+        return sf.info(str(audio)).duration
+    return len(audio) / WHISPER_SAMPLE_RATE
+
+
+def transcribe_samples(model, audio, sample_rate: int, **kwargs) -> str:
+    """Run the shared preprocessing stage on raw samples, then transcribe"""
+    return transcribe_audio(model, prepare_for_asr(audio, sample_rate), **kwargs)
+
+
+def transcribe_audio(model, audio, gate=None, record: bool = True, profile=None) -> str:
+    """Transcribe a file path or 16 kHz float32 array and gate the result.
+
+    The decoding profile is picked per utterance from its duration and the
+    current ASR load unless ``profile`` names one explicitly. Returns an
+    empty string when the transcript is dropped, so callers can re-prompt
+    the user without spending an LLM call or TTS synthesis.
+    """
+    gate = gate or get_transcript_gate()
+    policy = get_decoding_policy()
+
+    # prepare_for_asr returns an empty array when there was no speech at all
+    if not isinstance(audio, (str, os.PathLike)) and len(audio) == 0:
+        if record:
+            gate.record('empty')
+        return ""
+
+    duration = audio_duration(audio)
+    profile = profile or policy.choose_profile(duration)
+    model = policy.choose_model(duration, model)
+
+    start = time.perf_counter()
+    with policy.track():
+        segments, _ = model.transcribe(audio, **DECODING_PROFILES[profile])
+        # Segments are generated lazily, so decoding happens inside the gate
+        text, reason = gate.filter(segments, record=record, duration=duration)
+    elapsed = time.perf_counter() - start
+
+    if record:
+        print(f"🎯 ASR: {duration:.1f}s clip, '{profile}' profile, {elapsed * 1000:.0f} ms")
+    if reason and record:
+        print(f"🚫 Dropped transcript ({reason}) - {gate.dropped_count()} dropped so far")
+    return text
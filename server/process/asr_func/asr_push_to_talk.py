@@ -3,6 +3,13 @@ import sounddevice as sd
 import soundfile as sf
 from faster_whisper import WhisperModel
 
+try:
+    from process.asr_func.asr_pipeline import transcribe_audio
+    from process.asr_func.audio_preprocess import prepare_for_asr, WHISPER_SAMPLE_RATE
+except ImportError:
+    from server.process.asr_func.asr_pipeline import transcribe_audio
+    from server.process.asr_func.audio_preprocess import prepare_for_asr, WHISPER_SAMPLE_RATE
+
 def record_and_transcribe(model, output_file="recording.wav", samplerate=44100):
     """
     Simple push-to-talk recorder: record -> save -> transcribe -> return text
@@ -24,14 +31,15 @@ def record_and_transcribe(model, output_file="recording.wav", samplerate=44100):
     
     print("⏹️  Saving audio...")
     
-    # Write the file
-    sf.write(output_file, recording, samplerate)
+    # Trim reaction-time silence and the unused tail of the 60 s buffer,
+    # normalize, and resample to 16 kHz once - Whisper only decodes speech
+    speech = prepare_for_asr(recording, samplerate)
+    sf.write(output_file, speech, WHISPER_SAMPLE_RATE)
     
     print("🎯 Transcribing...")
     
-    # Transcribe
-    segments, _ = model.transcribe(output_file)
-    transcription = " ".join([segment.text for segment in segments])
+    # Transcribe (silence/noise/hallucinations come back empty)
+    transcription = transcribe_audio(model, speech)
     
     print(f"Transcription: {transcription}")
     return transcription.strip()
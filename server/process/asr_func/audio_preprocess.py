@@ -0,0 +1,88 @@
+from math import gcd
+import numpy as np
+from scipy.signal import resample_poly
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+def to_float32_mono(audio: np.ndarray) -> np.ndarray:
+    """Convert int PCM / float64 / multi-channel input to a float32 mono array"""
+    audio = np.asarray(audio)
+    if np.issubdtype(audio.dtype, np.integer):
+        scale = float(np.iinfo(audio.dtype).max) + 1.0
+        audio = audio.astype(np.float32) / scale
+    else:
+        audio = audio.astype(np.float32, copy=False)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1, dtype=np.float32)
+    return audio
+
+
+def frame_rms(audio: np.ndarray, frame_size: int) -> np.ndarray:
+    """RMS of each non-overlapping frame (last partial frame is zero-padded)"""
+    n_frames = int(np.ceil(len(audio) / frame_size))
+    padded = np.zeros(n_frames * frame_size, dtype=np.float32)
+    padded[:len(audio)] = audio
+    frames = padded.reshape(n_frames, frame_size)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def silence_bounds(audio: np.ndarray, sample_rate: int, frame_ms=20, threshold_db=-35.0,
+                   min_rms=0.003, pad_ms=150):
+    """(start, end) sample indices of the voiced part; frames quieter than ``threshold_db``
+    below the loudest frame count as silence"""
+    if audio.size == 0:
+        return 0, 0
+
+    frame_size = max(1, int(sample_rate * frame_ms / 1000))
+    rms = frame_rms(audio, frame_size)
+    threshold = max(min_rms, float(rms.max()) * 10 ** (threshold_db / 20))
+
+    voiced = np.flatnonzero(rms > threshold)
+    if voiced.size == 0:
+        return 0, 0
+
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, voiced[0] * frame_size - pad)
+    end = min(len(audio), (voiced[-1] + 1) * frame_size + pad)
+    return int(start), int(end)
+
+
+def trim_silence(audio: np.ndarray, sample_rate: int, frame_ms=20, threshold_db=-35.0,
+                 min_rms=0.003, pad_ms=150) -> np.ndarray:
+    """Cut leading/trailing frames quieter than ``threshold_db`` below the loudest frame"""
+    start, end = silence_bounds(audio, sample_rate, frame_ms, threshold_db, min_rms, pad_ms)
+    return audio[start:end]
+
+
+def resample(audio: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """Polyphase resample (no-op when the rates already match)"""
+    if orig_rate == target_rate or audio.size == 0:
+        return audio
+    divisor = gcd(int(orig_rate), int(target_rate))
+    up, down = int(target_rate) // divisor, int(orig_rate) // divisor
+    return resample_poly(audio, up, down).astype(np.float32, copy=False)
+
+
+def prepare_for_asr(audio: np.ndarray, sample_rate: int, target_rate=WHISPER_SAMPLE_RATE,
+                    peak=0.9) -> np.ndarray:
+    """Shared pre-ASR stage: DC removal, silence trimming, one resample, peak normalization.
+
+    Returns a float32 mono array at ``target_rate`` ready to hand straight to
+    faster-whisper. An empty array means the clip had no speech at all.
+    """
+    audio = to_float32_mono(audio)
+    if audio.size == 0:
+        return audio
+
+    # DC removal before measuring energy, otherwise an offset looks like sound
+    audio = audio - np.mean(audio, dtype=np.float32)
+
+    # Trim first so we only resample the part Whisper will actually decode
+    audio = trim_silence(audio, sample_rate)
+    audio = resample(audio, sample_rate, target_rate)
+
+    max_abs = float(np.max(np.abs(audio))) if audio.size else 0.0
+    if max_abs > 0:
+        audio *= peak / max_abs
+    return audio
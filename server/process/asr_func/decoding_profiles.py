@@ -0,0 +1,127 @@
+import threading
+from contextlib import contextmanager
+
+try:
+    from process.config_loader import get_config_section
+except ImportError:
+    from server.process.config_loader import get_config_section
+
+# Named faster-whisper decoding settings, cheapest first
+DECODING_PROFILES = {
+    # Greedy, no timestamps, no temperature fallback - for "yes"/"no" turns
+    'fast': {
+        'beam_size': 1,
+        'best_of': 1,
+        'temperature': 0.0,
+        'without_timestamps': True,
+        'condition_on_previous_text': False,
+    },
+    'balanced': {
+        'beam_size': 2,
+        'best_of': 2,
+        'temperature': [0.0, 0.4],
+        'without_timestamps': True,
+        'condition_on_previous_text': False,
+    },
+    # faster-whisper defaults: beam search with the full fallback ladder
+    'accurate': {
+        'beam_size': 5,
+        'best_of': 5,
+        'temperature': [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+        'without_timestamps': False,
+        'condition_on_previous_text': True,
+    },
+}
+
+
+class DecodingPolicy:
+    """Pick a decoding profile (and optionally a smaller model) per utterance.
+
+    Short clips and busy periods get the ``fast`` profile, long dictation
+    with nothing else in flight gets ``accurate``. Very short clips can be
+    routed to a small model such as ``tiny.en``, which is loaded on a
+    background thread as soon as the policy is built. Until it is ready,
+    short clips use the main model instead of waiting for the load.
+    """
+
+    def __init__(self, short_clip_seconds=2.0, long_clip_seconds=8.0, busy_load=2,
+                 small_model=None, small_model_max_seconds=1.5,
+                 device="cpu", compute_type="int8"):
+        self.short_clip_seconds = short_clip_seconds
+        self.long_clip_seconds = long_clip_seconds
+        self.busy_load = busy_load
+        self.small_model_name = small_model
+        self.small_model_max_seconds = small_model_max_seconds
+        self.device = device
+        self.compute_type = compute_type
+
+        self.small_model = None
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+        if self.small_model_name:
+            threading.Thread(target=self.load_small_model, name="asr-small-model", daemon=True).start()
+
+    @classmethod
+    def from_config(cls):
+        """Build a policy from ``asr_config.decoding`` in character_config.yaml"""
+        config = get_config_section('asr_config').get('decoding') or {}
+        return cls(
+            short_clip_seconds=config.get('short_clip_seconds', 2.0),
+            long_clip_seconds=config.get('long_clip_seconds', 8.0),
+            busy_load=config.get('busy_load', 2),
+            small_model=config.get('small_model'),
+            small_model_max_seconds=config.get('small_model_max_seconds', 1.5),
+            device=config.get('device', 'cpu'),
+            compute_type=config.get('compute_type', 'int8'),
+        )
+
+    def choose_profile(self, duration: float) -> str:
+        """Name of the profile to use for a clip of ``duration`` seconds"""
+        load = self.in_flight
+        if duration <= self.short_clip_seconds or load >= self.busy_load:
+            return 'fast'
+        if duration >= self.long_clip_seconds and load == 0:
+            return 'accurate'
+        return 'balanced'
+
+    def load_small_model(self):
+        """Load the short-clip model (runs on a background thread at startup)"""
+        try:
+            from faster_whisper import WhisperModel
+            print(f"🧠 Loading {self.small_model_name} for short clips...")
+            model = WhisperModel(self.small_model_name, device=self.device, compute_type=self.compute_type)
+        except Exception as e:
+            print(f"⚠️ Could not load {self.small_model_name}: {e}")
+            return
+        self.small_model = model
+        print(f"✅ {self.small_model_name} ready for short clips")
+
+    def choose_model(self, duration: float, default_model):
+        """Route very short clips to the small model once it has loaded"""
+        small_model = self.small_model
+        if small_model is None or duration > self.small_model_max_seconds:
+            return default_model
+        return small_model
+
+    @contextmanager
+    def track(self):
+        """Count an in-flight transcription so concurrent turns see the load"""
+        with self.lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+_default_policy = None
+
+
+def get_decoding_policy() -> DecodingPolicy:
+    """Shared policy so load is counted across every ASR entry point"""
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = DecodingPolicy.from_config()
+    return _default_policy
@@ -0,0 +1,129 @@
+import re
+import time
+import numpy as np
+from collections import deque
+from typing import Optional, Tuple
+
+# Words that almost never end a sentence - if the user stops on one of these
+# they are mid-thought and we should keep listening.
+CONTINUATION_WORDS = {
+    'and', 'but', 'or', 'so', 'because', 'if', 'then', 'the', 'a', 'an',
+    'to', 'of', 'with', 'for', 'in', 'on', 'at', 'my', 'your', 'is', 'are',
+    'was', 'um', 'uh', 'like', 'that', 'which', 'when', 'while', 'about'
+}
+
+QUESTION_WORDS = {
+    'who', 'what', 'when', 'where', 'why', 'how', 'which', 'can', 'could',
+    'would', 'should', 'do', 'does', 'did', 'is', 'are', 'will', 'have'
+}
+
+
+class TurnEndpointer:
+    """Decide when the user has finished speaking.
+
+    Combines VAD silence length with cues from the partial transcript
+    (sentence-final punctuation, question words, dangling conjunctions) and
+    the energy contour of the last few speech frames. Clear turn ends are
+    closed after ``short_silence`` seconds; the ``long_silence`` wait only
+    applies when the user sounds like they're mid-sentence.
+    """
+
+    def __init__(self, short_silence=0.35, medium_silence=0.9, long_silence=2.0,
+                 energy_window=6, energy_drop_ratio=0.6):
+        self.short_silence = short_silence
+        self.medium_silence = medium_silence
+        self.long_silence = long_silence
+        self.energy_drop_ratio = energy_drop_ratio
+
+        # RMS of recent speech frames, used to spot falling (turn-final) prosody
+        self.speech_energy = deque(maxlen=64)
+        self.trailing_energy = deque(maxlen=energy_window)
+
+        self.partial_text = ""
+        self.last_speech_time = None
+        self.latencies = []
+
+    def reset(self):
+        """Forget the current turn"""
+        self.speech_energy.clear()
+        self.trailing_energy.clear()
+        self.partial_text = ""
+        self.last_speech_time = None
+
+    def observe_speech(self, rms: float):
+        """Record the energy of a frame classified as speech.
+
+        The user is talking again, so any partial transcript no longer
+        describes the end of the turn and is dropped.
+        """
+        self.partial_text = ""
+        self.speech_energy.append(rms)
+        self.trailing_energy.append(rms)
+        self.last_speech_time = time.perf_counter()
+
+    def update_partial(self, text: str):
+        """Update the partial transcript for the current turn"""
+        self.partial_text = (text or "").strip()
+
+    def energy_is_falling(self) -> bool:
+        """True when the last speech frames are clearly quieter than the turn average"""
+        if len(self.speech_energy) < 4 or len(self.trailing_energy) < 2:
+            return False
+        overall = float(np.median(self.speech_energy))
+        tail = np.asarray(self.trailing_energy, dtype=np.float32)
+        half = len(tail) // 2
+        tail_end = float(np.mean(tail[half:]))
+        tail_start = float(np.mean(tail[:half])) if half else tail_end
+        return tail_end < overall * self.energy_drop_ratio and tail_end <= tail_start
+
+    def text_cues(self) -> int:
+        """Score the partial transcript: positive = complete, negative = mid-sentence"""
+        text = self.partial_text
+        if not text:
+            return 0
+
+        words = re.findall(r"[a-z']+", text.lower())
+        if not words:
+            return 0
+
+        if text.endswith((',', '-', '...')) or words[-1] in CONTINUATION_WORDS:
+            return -2
+
+        score = 0
+        if re.search(r"[.!?]['\"]?$", text):
+            score += 2
+        if words[0] in QUESTION_WORDS and text.endswith('?'):
+            score += 1
+        return score
+
+    def required_silence(self) -> Tuple[float, str]:
+        """Silence needed before the turn is considered finished"""
+        score = self.text_cues()
+        if score < 0:
+            return self.long_silence, "mid-sentence"
+
+        if self.energy_is_falling():
+            score += 1
+
+        if score >= 2:
+            return self.short_silence, "clear turn end"
+        if score == 1:
+            return self.medium_silence, "probable turn end"
+        return self.long_silence, "no cues"
+
+    def should_end_turn(self, silence_duration: float) -> Tuple[bool, str]:
+        """Check whether ``silence_duration`` seconds of silence ends the turn"""
+        required, reason = self.required_silence()
+        return silence_duration >= required, reason
+
+    def log_endpoint(self, reason: str, now: Optional[float] = None) -> float:
+        """Log how long after the last speech frame the turn was closed"""
+        now = now if now is not None else time.perf_counter()
+        latency = now - self.last_speech_time if self.last_speech_time else 0.0
+        self.latencies.append(latency)
+        print(f"⏱️ Endpoint after {latency * 1000:.0f} ms ({reason})")
+        return latency
+
+    def average_latency(self) -> float:
+        """Mean endpoint latency across all turns so far"""
+        return float(np.mean(self.latencies)) if self.latencies else 0.0
@@ -4,12 +4,18 @@ import threading
 import queue
 import time
 from collections import deque
-import soundfile as sf
-import tempfile
-import os
+
+try:
+    from process.asr_func.endpointing import TurnEndpointer
+    from process.asr_func.asr_pipeline import transcribe_samples
+    from process.asr_func.transcript_gate import get_transcript_gate
+except ImportError:
+    from server.process.asr_func.endpointing import TurnEndpointer
+    from server.process.asr_func.asr_pipeline import transcribe_samples
+    from server.process.asr_func.transcript_gate import get_transcript_gate
 
 class LiveMicrophoneRecorder:
-    def __init__(self, whisper_model, sample_rate=16000, chunk_duration=0.5):
+    def __init__(self, whisper_model, sample_rate=16000, chunk_duration=0.1):
         self.whisper_model = whisper_model
         self.sample_rate = sample_rate
         self.chunk_size = int(sample_rate * chunk_duration)
@@ -19,8 +25,11 @@ class LiveMicrophoneRecorder:
         
         # Voice Activity Detection parameters
         self.silence_threshold = 0.01  # Adjust based on your microphone
-        self.min_speech_duration = 1.0  # Minimum seconds of speech
-        self.max_silence_duration = 2.0  # Max seconds of silence before stopping
+        self.min_speech_duration = 0.25  # Minimum seconds of speech (a clear "yes" is ~0.3-0.4s)
+        self.max_silence_duration = 2.0  # Max seconds of silence when mid-sentence
+        
+        # Adaptive end-of-turn detection (short wait on clear turn ends)
+        self.endpointer = TurnEndpointer(long_silence=self.max_silence_duration)
         
         # Audio buffer for VAD
         self.audio_buffer = deque(maxlen=int(sample_rate * 10))  # 10 second buffer
@@ -28,6 +37,14 @@ class LiveMicrophoneRecorder:
         self.silence_counter = 0
         self.speech_detected = False
         
+        # Transcription runs off the audio thread so the callback never blocks
+        self.transcribe_queue = queue.Queue()
+        self.transcribe_thread = None
+        self.turn_id = 0
+        self.partial_requested = False
+        self.partial_result = None  # (turn_id, samples_covered, text)
+        self.speech_end = 0  # speech_buffer length after the last speech frame
+        
     def audio_callback(self, indata, frames, time, status):
         """Callback function for audio stream"""
         if status:
@@ -46,57 +63,114 @@ class LiveMicrophoneRecorder:
                 print("🎤 Speech detected, starting recording...")
                 self.speech_detected = True
                 self.speech_buffer = []
+                self.endpointer.reset()
             
             self.speech_buffer.extend(audio_chunk)
+            self.speech_end = len(self.speech_buffer)
+            self.endpointer.observe_speech(float(rms))
             self.silence_counter = 0
+            self.partial_requested = False
         else:
             # Silence detected
             if self.speech_detected:
                 self.silence_counter += len(audio_chunk) / self.sample_rate
                 self.speech_buffer.extend(audio_chunk)  # Include some silence
                 
+                # Transcribe what we have once per pause so the endpointer can
+                # look at punctuation and wording, not just silence length
+                if not self.partial_requested and self.silence_counter >= self.endpointer.short_silence:
+                    self.partial_requested = True
+                    self.transcribe_queue.put(('partial', self.turn_id, list(self.speech_buffer)))
+                
                 # Check if we should stop recording
-                if self.silence_counter > self.max_silence_duration:
-                    if len(self.speech_buffer) / self.sample_rate > self.min_speech_duration:
+                end_turn, reason = self.endpointer.should_end_turn(self.silence_counter)
+                if end_turn:
+                    self.endpointer.log_endpoint(reason)
+                    # Speech length up to the last voiced frame - the closing silence doesn't count
+                    speech_duration = self.speech_end / self.sample_rate
+                    if speech_duration >= self.min_speech_duration:
                         # We have enough speech, process it
                         self.process_speech_buffer()
+                    else:
+                        print(f"🔇 Ignoring {speech_duration * 1000:.0f} ms blip "
+                              f"(under {self.min_speech_duration * 1000:.0f} ms of speech)")
                     
                     # Reset for next speech
                     self.speech_detected = False
                     self.silence_counter = 0
                     self.speech_buffer = []
+                    self.partial_requested = False
+                    self.turn_id += 1
     
     def process_speech_buffer(self):
-        """Process the collected speech buffer"""
+        """Queue the collected speech buffer for final transcription"""
         if not self.speech_buffer:
             return
             
         print("🎯 Processing speech...")
+        self.transcribe_queue.put(('final', self.turn_id, list(self.speech_buffer)))
+    
+    def transcribe_audio(self, audio_data, record=True):
+        """Run Whisper on a float32 buffer captured at ``self.sample_rate``
         
-        # Convert to numpy array
-        audio_data = np.array(self.speech_buffer, dtype=np.float32)
-        
-        # Save to temporary file for Whisper
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-            sf.write(tmp_file.name, audio_data, self.sample_rate)
+        Partial transcripts pass ``record=False`` so they don't count
+        towards the transcript gate's drop statistics, and always decode
+        with the fast profile since they only feed the endpointer.
+        """
+        profile = None if record else 'fast'
+        return transcribe_samples(self.whisper_model, audio_data, self.sample_rate,
+                                  record=record, profile=profile)
+    
+    def transcription_worker(self):
+        """Consume partial/final transcription jobs from the audio callback"""
+        while self.is_recording or not self.transcribe_queue.empty():
+            try:
+                kind, turn_id, samples = self.transcribe_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
             
-            # Transcribe
             try:
-                segments, _ = self.whisper_model.transcribe(tmp_file.name)
-                transcription = " ".join([segment.text for segment in segments])
+                if kind == 'partial':
+                    # Stale partials (the turn ended, or the user kept talking after
+                    # it was queued) would describe the wrong end of the turn
+                    if self.partial_is_stale(turn_id, samples):
+                        continue
+                    text = self.transcribe_audio(np.array(samples, dtype=np.float32), record=False)
+                    self.partial_result = (turn_id, len(samples), text)
+                    if not self.partial_is_stale(turn_id, samples):
+                        self.endpointer.update_partial(text)
+                    continue
+                
+                # Reuse the partial if no new speech arrived after it
+                partial = self.partial_result
+                if (partial and partial[0] == turn_id and partial[2]
+                        and self.trailing_is_silence(samples, partial[1])):
+                    transcription = partial[2]
+                    # The partial skipped the gate's bookkeeping; count the turn now
+                    get_transcript_gate().record(None)
+                else:
+                    transcription = self.transcribe_audio(np.array(samples, dtype=np.float32))
                 
                 if transcription.strip():
                     print(f"📝 Transcription: {transcription}")
                     # Put transcription in queue for main thread
                     self.audio_queue.put(transcription.strip())
                 else:
-                    print("⚠️ No speech detected in audio")
+                    print("⚠️ No speech detected in audio - keep talking")
                     
             except Exception as e:
                 print(f"❌ Transcription error: {e}")
-            finally:
-                # Clean up temp file
-                os.unlink(tmp_file.name)
+    
+    def partial_is_stale(self, turn_id, samples):
+        """True if the turn ended or new speech arrived after ``samples`` was captured"""
+        return turn_id != self.turn_id or self.speech_end > len(samples)
+    
+    def trailing_is_silence(self, samples, covered):
+        """True if everything after the first ``covered`` samples is below the VAD threshold"""
+        tail = np.asarray(samples[covered:], dtype=np.float32)
+        if tail.size == 0:
+            return True
+        return float(np.sqrt(np.mean(tail**2))) <= self.silence_threshold
     
     def start_listening(self):
         """Start continuous listening"""
@@ -109,6 +183,9 @@ class LiveMicrophoneRecorder:
         print("🛑 Press Ctrl+C to stop")
         
         self.is_recording = True
+        self.transcribe_thread = threading.Thread(target=self.transcription_worker)
+        self.transcribe_thread.daemon = True
+        self.transcribe_thread.start()
         
         try:
             with sd.InputStream(
@@ -127,6 +204,11 @@ class LiveMicrophoneRecorder:
             print(f"❌ Audio stream error: {e}")
         finally:
             self.is_recording = False
+            if self.transcribe_thread:
+                self.transcribe_thread.join(timeout=5)
+            if self.endpointer.latencies:
+                print(f"⏱️ Average endpoint latency: {self.endpointer.average_latency() * 1000:.0f} ms")
+            get_transcript_gate().report()
     
     def stop_listening(self):
         """Stop continuous listening"""
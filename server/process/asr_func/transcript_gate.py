@@ -0,0 +1,167 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    from process.config_loader import get_config_section
+except ImportError:
+    from server.process.config_loader import get_config_section
+
+# Phrases Whisper is known to produce from silence, breathing or background noise.
+# Several are also ordinary replies, so a match only drops the turn when the
+# decoder's own scores or the clip length back it up (see ``is_hallucination``).
+DEFAULT_HALLUCINATIONS = [
+    "you",
+    "thank you",
+    "thanks for watching",
+    "thank you for watching",
+    "thanks for watching and see you next time",
+    "please subscribe",
+    "subtitles by the amara org community",
+    "bye",
+    "so",
+    "okay",
+]
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and strip punctuation so phrase matching ignores formatting"""
+    text = re.sub(r"[^a-z0-9' ]+", " ", text.lower())
+    return " ".join(text.split())
+
+
+class TranscriptGate:
+    """Drop transcripts that are silence, noise or known Whisper hallucinations.
+
+    Uses the per-segment metadata faster-whisper already computes
+    (``no_speech_prob``, ``avg_logprob``, ``compression_ratio``) so junk
+    turns never reach the LLM or TTS. A segment is dropped outright below
+    ``low_confidence_logprob``. A turn that is only a known hallucination
+    phrase is dropped when its ``no_speech_prob`` is at least
+    ``hallucination_no_speech``, its ``avg_logprob`` is below
+    ``hallucination_logprob`` or the clip is under ``hallucination_max_seconds``,
+    so a clearly spoken "okay" or "bye" still gets through.
+    """
+
+    def __init__(self, no_speech_threshold=0.6, logprob_threshold=-1.0,
+                 compression_ratio_threshold=2.4, hallucinations: Optional[List[str]] = None,
+                 low_confidence_logprob=-1.5, hallucination_no_speech=0.3,
+                 hallucination_logprob=-0.8, hallucination_max_seconds=0.3):
+        self.no_speech_threshold = no_speech_threshold
+        self.logprob_threshold = logprob_threshold
+        self.compression_ratio_threshold = compression_ratio_threshold
+        self.low_confidence_logprob = low_confidence_logprob
+        self.hallucination_no_speech = hallucination_no_speech
+        self.hallucination_logprob = hallucination_logprob
+        self.hallucination_max_seconds = hallucination_max_seconds
+        phrases = hallucinations if hallucinations is not None else DEFAULT_HALLUCINATIONS
+        self.hallucinations = {normalize_text(p) for p in phrases}
+
+        self.stats = {
+            'accepted': 0,
+            'dropped_no_speech': 0,
+            'dropped_low_confidence': 0,
+            'dropped_repetitive': 0,
+            'dropped_hallucination': 0,
+            'dropped_empty': 0,
+        }
+
+    @classmethod
+    def from_config(cls):
+        """Build a gate from the ``asr_config`` section of character_config.yaml"""
+        config = get_config_section('asr_config')
+        return cls(
+            no_speech_threshold=config.get('no_speech_threshold', 0.6),
+            logprob_threshold=config.get('logprob_threshold', -1.0),
+            compression_ratio_threshold=config.get('compression_ratio_threshold', 2.4),
+            hallucinations=config.get('hallucination_phrases'),
+            low_confidence_logprob=config.get('low_confidence_logprob', -1.5),
+            hallucination_no_speech=config.get('hallucination_no_speech', 0.3),
+            hallucination_logprob=config.get('hallucination_logprob', -0.8),
+            hallucination_max_seconds=config.get('hallucination_max_seconds', 0.3),
+        )
+
+    def check_segment(self, segment) -> Optional[str]:
+        """Return the reason a segment should be dropped, or None to keep it"""
+        no_speech = getattr(segment, 'no_speech_prob', 0.0)
+        avg_logprob = getattr(segment, 'avg_logprob', 0.0)
+        compression = getattr(segment, 'compression_ratio', 0.0)
+
+        # Same rule Whisper itself uses: "no speech" only counts when the
+        # decoder was also unsure about the text it produced
+        if no_speech > self.no_speech_threshold and avg_logprob < self.logprob_threshold:
+            return 'no_speech'
+        if avg_logprob < self.low_confidence_logprob:
+            return 'low_confidence'
+        if compression > self.compression_ratio_threshold:
+            return 'repetitive'
+        return None
+
+    def is_hallucination(self, text: str, segments: List, duration: Optional[float] = None) -> bool:
+        """True if ``text`` is a known hallucination phrase and the evidence agrees it wasn't spoken"""
+        if normalize_text(text) not in self.hallucinations:
+            return False
+        if duration is not None and duration < self.hallucination_max_seconds:
+            return True
+        return any(getattr(segment, 'no_speech_prob', 0.0) >= self.hallucination_no_speech
+                   or getattr(segment, 'avg_logprob', 0.0) < self.hallucination_logprob
+                   for segment in segments)
+
+    def filter(self, segments: Iterable, record: bool = True,
+               duration: Optional[float] = None) -> Tuple[str, Optional[str]]:
+        """Join the segments that pass the gate.
+
+        ``duration`` is the length of the decoded clip in seconds, when known.
+        Returns ``(text, reason)`` where ``reason`` is None when the turn is
+        accepted, otherwise the reason it was dropped and ``text`` is empty.
+        """
+        kept = []
+        drop_reasons = []
+        for segment in segments:
+            reason = self.check_segment(segment)
+            if reason:
+                drop_reasons.append(reason)
+            else:
+                kept.append(segment)
+
+        text = " ".join(segment.text for segment in kept).strip()
+
+        if not text:
+            reason = drop_reasons[0] if drop_reasons else 'empty'
+        elif self.is_hallucination(text, kept, duration):
+            reason = 'hallucination'
+        else:
+            reason = None
+
+        if record:
+            self.record(reason)
+
+        return ("", reason) if reason else (text, None)
+
+    def record(self, reason: Optional[str]):
+        """Count a turn as accepted (``reason`` is None) or dropped"""
+        key = 'accepted' if reason is None else f'dropped_{reason}'
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+    def dropped_count(self) -> int:
+        """Total number of turns dropped so far"""
+        return sum(count for key, count in self.stats.items() if key.startswith('dropped_'))
+
+    def report(self):
+        """Print how many turns were accepted/dropped and why"""
+        total = self.stats['accepted'] + self.dropped_count()
+        print(f"🚦 Transcript gate: {self.stats['accepted']}/{total} turns accepted, "
+              f"{self.dropped_count()} dropped")
+        for key, count in self.stats.items():
+            if key.startswith('dropped_') and count:
+                print(f"   {key[len('dropped_'):]}: {count}")
+
+
+_default_gate = None
+
+
+def get_transcript_gate() -> TranscriptGate:
+    """Shared gate so drop counts cover every ASR entry point"""
+    global _default_gate
+    if _default_gate is None:
+        _default_gate = TranscriptGate.from_config()
+    return _default_gate
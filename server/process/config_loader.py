@@ -0,0 +1,34 @@
+from pathlib import Path
+import threading
+import yaml
+
+# character_config.yaml lives in the project root, two levels above server/process
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CONFIG_PATH = PROJECT_ROOT / "character_config.yaml"
+
+_config_lock = threading.Lock()
+_char_config = None
+
+
+def load_char_config(reload: bool = False) -> dict:
+    """Load character_config.yaml once and share it between modules"""
+    global _char_config
+    with _config_lock:
+        if _char_config is None or reload:
+            with open(CONFIG_PATH, 'r') as f:
+                _char_config = yaml.safe_load(f) or {}
+        return _char_config
+
+
+def get_config_section(name: str, default=None) -> dict:
+    """Return a top-level config section, or ``default`` if it isn't set"""
+    section = load_char_config().get(name)
+    if section is None:
+        return {} if default is None else default
+    return section
+
+
+def resolve_project_path(path) -> Path:
+    """Resolve a config path relative to the project root instead of the cwd"""
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
@@ -0,0 +1,48 @@
+"""Fixed replies used when no language model is available.
+
+Kept in one place so the TTS phrase bank can pre-render every one of them.
+"""
+
+# (trigger keywords, reply) checked in order by LocalAI.get_fallback_response
+KEYWORD_RESPONSES = [
+    (['hello', 'hi', 'hey'], "Oh, hello there! *waves* What brings you to talk to me today?"),
+    (['how are you', 'how do you feel'], "I'm doing great! Thanks for asking~ How about you?"),
+    (['thank you', 'thanks'], "Aww, you're welcome! *smiles* It's not like I did it for you or anything... baka!"),
+    (['love', 'like you'], "E-eh?! *blushes* Don't say such embarrassing things so suddenly!"),
+    (['sad', 'upset', 'down'], "Aww, don't be sad... *pats head gently* Want to talk about it?"),
+    (['happy', 'excited', 'great'], "Yay! I'm so happy to hear that! *bounces excitedly* Tell me more!"),
+    (['bye', 'goodbye', 'see you'], "Aww, leaving already? Take care! Come back soon, okay?"),
+    (['baka'], "Hey! Who are you calling baka?! *pouts* Hmph!"),
+    (['cute', 'kawaii'], "*blushes furiously* I-I'm not cute! Don't say such things!"),
+]
+
+QUESTION_RESPONSE = "Hmm, that's a good question! Let me think... *taps chin thoughtfully*"
+
+SMALL_TALK_RESPONSES = [
+    "That's interesting! Tell me more about that~",
+    "Oh really? *tilts head curiously*",
+    "Hmm, I see! What do you think about it?",
+    "That sounds cool! I'd love to hear more!",
+    "*nods thoughtfully* Go on...",
+    "Ooh, that reminds me of something! But what were you saying?",
+]
+
+# Used by core/offline_chat when the local AI can't even be imported
+OFFLINE_RESPONSES = {
+    'hello': "Hello there! I'm Riko, your offline AI companion!",
+    'how are you': "I'm doing great! Thanks for asking, senpai!",
+    'what is your name': "I'm Riko, your snarky anime AI assistant!",
+    'goodbye': "See you later, senpai! Take care!",
+}
+
+OFFLINE_DEFAULT_RESPONSE = "That's interesting! Tell me more about that, senpai!"
+
+
+def all_canned_responses():
+    """Every fixed reply, deduplicated, in a stable order"""
+    replies = [reply for _, reply in KEYWORD_RESPONSES]
+    replies.append(QUESTION_RESPONSE)
+    replies.extend(SMALL_TALK_RESPONSES)
+    replies.extend(OFFLINE_RESPONSES.values())
+    replies.append(OFFLINE_DEFAULT_RESPONSE)
+    return list(dict.fromkeys(replies))
@@ -4,6 +4,11 @@ import yaml
 import os
 from typing import Optional, List, Dict
 
+try:
+    from process.llm_funcs.canned_responses import KEYWORD_RESPONSES, QUESTION_RESPONSE, SMALL_TALK_RESPONSES
+except ImportError:
+    from server.process.llm_funcs.canned_responses import KEYWORD_RESPONSES, QUESTION_RESPONSE, SMALL_TALK_RESPONSES
+
 # Load config
 with open('../character_config.yaml', 'r') as f:
     char_config = yaml.safe_load(f)
@@ -131,47 +136,15 @@ class LocalAI:
         user_lower = user_input.lower()
         
         # Anime-style responses based on keywords
-        if any(word in user_lower for word in ['hello', 'hi', 'hey']):
-            return "Oh, hello there! *waves* What brings you to talk to me today?"
-        
-        elif any(word in user_lower for word in ['how are you', 'how do you feel']):
-            return "I'm doing great! Thanks for asking~ How about you?"
-        
-        elif any(word in user_lower for word in ['thank you', 'thanks']):
-            return "Aww, you're welcome! *smiles* It's not like I did it for you or anything... baka!"
-        
-        elif any(word in user_lower for word in ['love', 'like you']):
-            return "E-eh?! *blushes* Don't say such embarrassing things so suddenly!"
-        
-        elif any(word in user_lower for word in ['sad', 'upset', 'down']):
-            return "Aww, don't be sad... *pats head gently* Want to talk about it?"
+        for keywords, response in KEYWORD_RESPONSES:
+            if any(word in user_lower for word in keywords):
+                return response
         
-        elif any(word in user_lower for word in ['happy', 'excited', 'great']):
-            return "Yay! I'm so happy to hear that! *bounces excitedly* Tell me more!"
+        if '?' in user_input:
+            return QUESTION_RESPONSE
         
-        elif any(word in user_lower for word in ['bye', 'goodbye', 'see you']):
-            return "Aww, leaving already? Take care! Come back soon, okay?"
-        
-        elif 'baka' in user_lower:
-            return "Hey! Who are you calling baka?! *pouts* Hmph!"
-        
-        elif any(word in user_lower for word in ['cute', 'kawaii']):
-            return "*blushes furiously* I-I'm not cute! Don't say such things!"
-        
-        elif '?' in user_input:
-            return "Hmm, that's a good question! Let me think... *taps chin thoughtfully*"
-        
-        else:
-            responses = [
-                "That's interesting! Tell me more about that~",
-                "Oh really? *tilts head curiously*",
-                "Hmm, I see! What do you think about it?",
-                "That sounds cool! I'd love to hear more!",
-                "*nods thoughtfully* Go on...",
-                "Ooh, that reminds me of something! But what were you saying?",
-            ]
-            import random
-            return random.choice(responses)
+        import random
+        return random.choice(SMALL_TALK_RESPONSES)
     
     def get_response(self, user_input: str) -> str:
         """Main method to get AI response"""
@@ -0,0 +1,131 @@
+import io
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import numpy as np
+import soundfile as sf
+
+try:
+    from process.tts_func.playback_engine import get_playback_engine
+except ImportError:
+    from server.process.tts_func.playback_engine import get_playback_engine
+
+# WAVE_FORMAT_* codes we can map straight onto a NumPy dtype
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode WAV bytes to float32 (frames,) or (frames, channels) without touching disk.
+
+    PCM 8/16/32-bit and 32-bit float are read with ``np.frombuffer`` from the
+    parsed header; anything else goes through soundfile on a BytesIO.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE buffer")
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        chunk_size = struct.unpack('<I', data[pos + 4:pos + 8])[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', data[body:body + 16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                # The real format is the first two bytes of the SubFormat GUID
+                format_tag = struct.unpack('<H', data[body + 24:body + 26])[0]
+            fmt = (format_tag, channels, sample_rate, bits)
+        elif chunk_id == b"data" and fmt is not None:
+            # Streamed/piped WAVs often carry a 0 or 0xFFFFFFFF size - take the rest of the buffer
+            end = len(data) if chunk_size in (0, 0xFFFFFFFF) else min(len(data), body + chunk_size)
+            format_tag, channels, sample_rate, bits = fmt
+            frame_bytes = channels * bits // 8
+            pcm = data[body:end - (end - body) % frame_bytes]
+
+            if format_tag == WAVE_FORMAT_PCM and bits == 16:
+                samples = np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+            elif format_tag == WAVE_FORMAT_PCM and bits == 32:
+                samples = (np.frombuffer(pcm, dtype='<i4') / 2147483648.0).astype(np.float32)
+            elif format_tag == WAVE_FORMAT_PCM and bits == 8:
+                samples = (np.frombuffer(pcm, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+            elif format_tag == WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+                samples = np.frombuffer(pcm, dtype='<f4').astype(np.float32)
+            else:
+                break
+            if channels > 1:
+                samples = samples.reshape(-1, channels)
+            return samples, sample_rate
+        pos = body + chunk_size + (chunk_size & 1)
+
+    # 24-bit, ADPCM, odd headers... let libsndfile sort it out
+    samples, sample_rate = sf.read(io.BytesIO(data), dtype='float32')
+    return samples, sample_rate
+
+
+class AudioClip:
+    """Synthesized speech held in memory: float32 samples, sample rate and metadata.
+
+    Every TTS engine's ``synthesize`` returns one of these. It goes straight
+    to the playback engine or to Gradio; disk is only touched by ``save``.
+    A clip still unpacks like the old ``(samples, sample_rate)`` tuple.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int, meta: Optional[Dict] = None):
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.sample_rate = int(sample_rate)
+        self.meta = meta or {}
+
+    @classmethod
+    def from_wav_bytes(cls, data: bytes, meta: Optional[Dict] = None) -> 'AudioClip':
+        """Decode an HTTP response body (or any WAV bytes)"""
+        samples, sample_rate = decode_wav(data)
+        return cls(samples, sample_rate, meta)
+
+    @classmethod
+    def from_file(cls, path, meta: Optional[Dict] = None) -> 'AudioClip':
+        samples, sample_rate = sf.read(str(path), dtype='float32')
+        return cls(samples, sample_rate, meta)
+
+    def __iter__(self):
+        # Lets ``samples, sample_rate = clip`` keep working for tuple-era callers
+        return iter((self.samples, self.sample_rate))
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    def to_int16(self) -> np.ndarray:
+        return (np.clip(self.samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+    def to_gradio(self) -> Tuple[int, np.ndarray]:
+        """``(sample_rate, int16 ndarray)`` - what ``gr.Audio`` takes as an output value"""
+        return self.sample_rate, self.to_int16()
+
+    def wav_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        sf.write(buffer, self.samples, self.sample_rate, format='WAV', subtype='PCM_16')
+        return buffer.getvalue()
+
+    def save(self, path) -> str:
+        """Persist the clip as a WAV file (only when the caller actually wants a file)"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        sf.write(str(path), self.samples, self.sample_rate)
+        return str(path)
+
+    def play(self, priority: int = 0, interrupt: bool = False):
+        """Queue on the shared playback engine; returns its handle"""
+        return get_playback_engine().play(self.samples, self.sample_rate, priority, interrupt)
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:]:
+        with open(path, 'rb') as f:
+            clip = AudioClip.from_wav_bytes(f.read(), meta={'source': path})
+        print(f"{path}: {clip.duration:.2f}s @ {clip.sample_rate}Hz, shape {clip.samples.shape}")
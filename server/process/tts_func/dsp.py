@@ -0,0 +1,134 @@
+import time
+from fractions import Fraction
+from typing import Dict
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import fft
+from scipy.signal import get_window, resample_poly
+
+try:
+    from process.asr_func.audio_preprocess import resample
+except ImportError:
+    from server.process.asr_func.audio_preprocess import resample
+
+N_FFT = 1024
+HOP = N_FFT // 4
+
+
+def as_float32(audio: np.ndarray) -> np.ndarray:
+    """Writable, contiguous float32 mono array (copies only when it has to)"""
+    audio = np.asarray(audio)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if audio.dtype != np.float32 or not audio.flags.writeable or not audio.flags.c_contiguous:
+        audio = np.array(audio, dtype=np.float32)
+    return audio
+
+
+def apply_gain(audio: np.ndarray, gain: float, limit: float = 1.0) -> np.ndarray:
+    """Scale and hard-limit in place"""
+    np.multiply(audio, np.float32(gain), out=audio)
+    np.clip(audio, -limit, limit, out=audio)
+    return audio
+
+
+def stft(audio: np.ndarray, n_fft: int = N_FFT, hop: int = HOP) -> np.ndarray:
+    """Hann-windowed STFT as (frames, bins) complex64; the signal is centred with n_fft/2 padding"""
+    window = get_window('hann', n_fft).astype(np.float32)
+    padded = np.pad(audio, (n_fft // 2, n_fft // 2 + hop))
+    frames = sliding_window_view(padded, n_fft)[::hop] * window
+    return fft.rfft(frames, axis=1)
+
+
+def istft(spec: np.ndarray, length: int, n_fft: int = N_FFT, hop: int = HOP) -> np.ndarray:
+    """Overlap-add inverse of ``stft``, trimmed to ``length`` samples"""
+    window = get_window('hann', n_fft).astype(np.float32)
+    frames = fft.irfft(spec, n=n_fft, axis=1).astype(np.float32) * window
+    count = frames.shape[0]
+    out = np.zeros((count - 1) * hop + n_fft + n_fft, dtype=np.float32)
+    norm = np.zeros_like(out)
+
+    # Frames k, k+r, k+2r... (r = n_fft/hop) don't overlap each other, so each
+    # of the r phases is one contiguous reshape-and-add instead of a Python loop
+    overlap = n_fft // hop
+    for k in range(overlap):
+        block = frames[k::overlap].reshape(-1)
+        start = k * hop
+        out[start:start + block.size] += block
+        norm[start:start + block.size] += np.tile(window * window, len(frames[k::overlap]))
+
+    out = out[n_fft // 2:n_fft // 2 + length]
+    norm = norm[n_fft // 2:n_fft // 2 + length]
+    np.divide(out, norm, out=out, where=norm > 1e-6)
+    return out
+
+
+def time_stretch(audio: np.ndarray, rate: float, n_fft: int = N_FFT, hop: int = HOP) -> np.ndarray:
+    """Phase-vocoder time stretch: ``rate`` > 1 is faster/shorter, pitch is unchanged"""
+    audio = as_float32(audio)
+    if abs(rate - 1.0) < 1e-3 or audio.size < n_fft:
+        return audio
+
+    spec = stft(audio, n_fft, hop)
+    steps = np.arange(0, spec.shape[0] - 1, rate)
+    index = steps.astype(np.int64)
+    frac = (steps - index).astype(np.float32)[:, None]
+
+    left, right = spec[index], spec[index + 1]
+    magnitude = (1.0 - frac) * np.abs(left) + frac * np.abs(right)
+
+    # Expected phase advance per hop for each bin, plus the measured deviation
+    omega = (2 * np.pi * hop * np.arange(spec.shape[1]) / n_fft).astype(np.float32)
+    delta = np.angle(right) - np.angle(left) - omega
+    delta -= 2 * np.pi * np.round(delta / (2 * np.pi))
+    phase = np.empty_like(magnitude)
+    phase[0] = np.angle(spec[0])
+    np.cumsum(omega + delta[:-1], axis=0, out=phase[1:])
+    phase[1:] += phase[0]
+
+    return istft(magnitude * np.exp(1j * phase), int(round(audio.size / rate)), n_fft, hop)
+
+
+def pitch_shift(audio: np.ndarray, factor: float, n_fft: int = N_FFT, hop: int = HOP) -> np.ndarray:
+    """Shift pitch by ``factor`` (1.1 = ~1.65 semitones up) while keeping the duration"""
+    audio = as_float32(audio)
+    if abs(factor - 1.0) < 1e-3 or audio.size < n_fft:
+        return audio
+
+    # Stretch to factor x the length, then polyphase-resample back down
+    ratio = Fraction(factor).limit_denominator(64)
+    stretched = time_stretch(audio, 1.0 / factor, n_fft, hop)
+    shifted = resample_poly(stretched, ratio.denominator, ratio.numerator).astype(np.float32, copy=False)
+    if shifted.size >= audio.size:
+        return shifted[:audio.size]
+    return np.pad(shifted, (0, audio.size - shifted.size))
+
+
+def semitones(factor: float) -> float:
+    return 12 * np.log2(factor)
+
+
+def benchmark(seconds: float = 10.0, sample_rate: int = 32000) -> Dict[str, float]:
+    """Throughput of each stage in input samples per second"""
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(int(seconds * sample_rate)) * 0.1).astype(np.float32)
+    stages = {
+        'resample 32k->48k': lambda: resample(audio, sample_rate, 48000),
+        'time_stretch x1.1': lambda: time_stretch(audio, 1.1),
+        'pitch_shift x1.1': lambda: pitch_shift(audio, 1.1),
+        'apply_gain': lambda: apply_gain(audio.copy(), 0.5),
+    }
+    results = {}
+    for name, stage in stages.items():
+        stage()  # warm up FFT plans
+        start = time.perf_counter()
+        stage()
+        elapsed = time.perf_counter() - start
+        results[name] = audio.size / elapsed
+        print(f"⚡ {name:<20} {results[name] / 1e6:8.2f} M samples/s "
+              f"({seconds / elapsed:.0f}x realtime)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,36 +1,51 @@
 import os
-import requests
-import tempfile
-import threading
-import time
+import sys
 import subprocess
 import json
 from pathlib import Path
-import soundfile as sf
-import sounddevice as sd
 import numpy as np
 from typing import Optional
-import yaml
 
-# Load config
-with open('../character_config.yaml', 'r') as f:
-    char_config = yaml.safe_load(f)
+try:
+    from process.tts_func.sovits_client import get_sovits_client
+    from process.tts_func.sovits_supervisor import routed_client, start_gpt_sovits_pool
+    from process.tts_func.engine_manager import get_engine
+    from process.tts_func.phrase_bank import get_phrase_bank
+    from process.tts_func.voice_profile import load_voice_profile
+    from process.tts_func.voice_library import get_voice_library
+    from process.tts_func.playback_engine import get_playback_engine
+    from process.tts_func.audio_clip import AudioClip
+    from process.tts_func.scratch_audio import get_scratch_arena
+    from process.tts_func import dsp
+    from process.tts_func.fallback_synth import get_fallback_synth
+except ImportError:
+    from server.process.tts_func.sovits_client import get_sovits_client
+    from server.process.tts_func.sovits_supervisor import routed_client, start_gpt_sovits_pool
+    from server.process.tts_func.engine_manager import get_engine
+    from server.process.tts_func.phrase_bank import get_phrase_bank
+    from server.process.tts_func.voice_profile import load_voice_profile
+    from server.process.tts_func.voice_library import get_voice_library
+    from server.process.tts_func.playback_engine import get_playback_engine
+    from server.process.tts_func.audio_clip import AudioClip
+    from server.process.tts_func.scratch_audio import get_scratch_arena
+    from server.process.tts_func import dsp
+    from server.process.tts_func.fallback_synth import get_fallback_synth
+
 
 class DynamicVoiceClone:
     def __init__(self):
-        self.voice_sample_path = Path("..") / char_config['sovits_ping_config']['ref_audio_path']
-        self.prompt_text = char_config['sovits_ping_config']['prompt_text']
-        self.text_lang = char_config['sovits_ping_config']['text_lang']
-        self.prompt_lang = char_config['sovits_ping_config']['prompt_lang']
+        # Follow the active voice from the voice library, including hot switches
+        library = get_voice_library()
+        self.use_voice(library.active)
+        library.on_switch(self.use_voice)
         
         # GPT-SoVITS API settings
-        self.api_url = "http://127.0.0.1:9880"
+        self.client = get_sovits_client()
+        self.api_url = self.client.base_url
         self.server_running = False
         
         # Playback control
         self.current_playback = None
-        self.playback_thread = None
-        self.stop_playback_flag = False
         
         print(f"🎵 Initializing Dynamic Voice Cloning")
         print(f"   Voice sample: {self.voice_sample_path}")
@@ -38,6 +53,14 @@ class DynamicVoiceClone:
         
         self.check_systems()
     
+    def use_voice(self, voice):
+        """Take reference audio and prompt from a voice library entry"""
+        self.voice = voice
+        self.voice_sample_path = Path(voice.ref_audio_path)
+        self.prompt_text = voice.prompt_text
+        self.text_lang = voice.text_lang
+        self.prompt_lang = voice.prompt_lang
+    
     def check_systems(self):
         """Check available voice synthesis systems"""
         # Check GPT-SoVITS server
@@ -51,54 +74,25 @@ class DynamicVoiceClone:
         print(f"✅ Voice sample found: {self.voice_sample_path}")
         return True
     
-    def check_gpt_sovits_server(self):
+    def check_gpt_sovits_server(self) -> bool:
         """Check if GPT-SoVITS server is running"""
-        try:
-            response = requests.get(f"{self.api_url}/", timeout=3)
-            self.server_running = True
+        self.server_running = self.client.is_alive(timeout=3)
+        if self.server_running:
             print("✅ GPT-SoVITS server is running")
-        except:
-            self.server_running = False
+        else:
             print("⚠️ GPT-SoVITS server not running")
+        return self.server_running
     
     def start_gpt_sovits_server(self):
-        """Start GPT-SoVITS server"""
+        """Start GPT-SoVITS server (the configured worker pool, logs drained by the supervisor)"""
         if self.server_running:
             return True
         
         print("🚀 Starting GPT-SoVITS server...")
-        try:
-            gpt_sovits_path = Path("GPT-SoVITS")
-            if not gpt_sovits_path.exists():
-                print("❌ GPT-SoVITS directory not found")
-                return False
-            
-            # Start server in background
-            process = subprocess.Popen(
-                ["python", "api.py"],
-                cwd=gpt_sovits_path,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                creationflags=subprocess.CREATE_NEW_CONSOLE if os.name == 'nt' else 0
-            )
-            
-            # Wait for server to start
-            for i in range(30):
-                time.sleep(2)
-                self.check_gpt_sovits_server()
-                if self.server_running:
-                    print("✅ GPT-SoVITS server started!")
-                    return True
-                print(f"   Waiting for server... ({i+1}/30)")
-            
-            print("❌ GPT-SoVITS server failed to start")
-            return False
-            
-        except Exception as e:
-            print(f"❌ Error starting server: {e}")
-            return False
+        self.server_running = start_gpt_sovits_pool()
+        return self.server_running
     
-    def clone_voice_dynamic(self, text: str, emotion: str = "neutral") -> Optional[str]:
+    def clone_voice_dynamic(self, text: str, emotion: str = "neutral") -> Optional[AudioClip]:
         """Clone voice to say ANY text dynamically"""
         
         # Method 1: Try GPT-SoVITS (best quality) - but only if working
@@ -110,72 +104,74 @@ class DynamicVoiceClone:
         # Method 2: Use advanced voice modification (reliable fallback)
         return self.clone_with_voice_modification(text, emotion)
     
-    def clone_with_gpt_sovits(self, text: str, emotion: str) -> Optional[str]:
+    def clone_with_gpt_sovits(self, text: str, emotion: str) -> Optional[AudioClip]:
         """Use GPT-SoVITS for true voice cloning"""
         try:
             print(f"🎭 Cloning voice with GPT-SoVITS: {text[:50]}...")
             
-            # Enhance text based on emotion
-            enhanced_text = self.enhance_text_for_emotion(text, emotion)
+            # Emotion picks the reference clip; the text is synthesized as written
+            reference = self.voice.for_emotion(emotion)
             
             payload = {
-                "text": enhanced_text,
-                "text_lang": self.text_lang,
-                "ref_audio_path": str(self.voice_sample_path),
-                "prompt_text": self.prompt_text,
-                "prompt_lang": self.prompt_lang,
-                "top_k": 15,
-                "top_p": 1.0,
-                "temperature": 1.0,
-                "speed": self.get_speed_for_emotion(emotion)
-            }
-            
-            # Convert to GET parameters for GPT-SoVITS API
-            params = {
-                "text": enhanced_text,
-                "text_language": self.text_lang,
-                "refer_wav_path": str(self.voice_sample_path),
-                "prompt_text": self.prompt_text,
-                "prompt_language": self.prompt_lang,
+                "text": text,
+                "text_lang": reference.text_lang,
+                "ref_audio_path": reference.ref_audio_path,
+                "prompt_text": reference.prompt_text,
+                "prompt_lang": reference.prompt_lang,
                 "top_k": 15,
                 "top_p": 1.0,
                 "temperature": 1.0,
                 "speed": self.get_speed_for_emotion(emotion)
             }
             
-            response = requests.get(
-                f"{self.api_url}/",
-                params=params,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                # Save to temporary file
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                    tmp_file.write(response.content)
-                    audio_path = tmp_file.name
-                
-                print(f"✅ Voice cloned successfully!")
-                return audio_path
-            else:
-                print(f"❌ GPT-SoVITS API error: {response.status_code}")
+            # The client sends it as api.py GET / or api_v2 POST /tts, whichever the server speaks
+            with routed_client() as client:
+                clip = client.synthesize(payload, meta={'engine': 'dynamic', 'text': text, 'emotion': emotion})
+            if clip is None:
                 return None
+            
+            print(f"✅ Voice cloned successfully!")
+            return clip
                 
         except Exception as e:
             print(f"❌ Error with GPT-SoVITS: {e}")
             return None
     
-    def clone_with_voice_modification(self, text: str, emotion: str) -> Optional[str]:
+    def clone_with_voice_modification(self, text: str, emotion: str) -> Optional[AudioClip]:
         """TRUE voice synthesis - generates NEW speech in your voice"""
         try:
             print(f"🎵 Synthesizing NEW speech: {text[:50]}...")
             
-            # Generate unique filename
-            import hashlib
-            text_hash = hashlib.md5(text.encode()).hexdigest()[:8]
-            temp_tts_file = f"temp_tts_{text_hash}.wav"
+            # In-process base voice (espeak-ng / pyttsx3); PowerShell only as a Windows last resort
+            base = get_fallback_synth().synthesize(text, emotion)
+            if base is None and sys.platform == 'win32':
+                base = self.system_speech_base(text)
+            if base is None:
+                print("❌ TTS generation failed")
+                return None
+            
+            # Your voice sample's characteristics (cached profile, no re-read)
+            profile = load_voice_profile(self.voice_sample_path)
+            voice_rate = profile.sample_rate
             
-            # Use Windows TTS to generate base speech
+            # Apply your voice characteristics
+            modified_speech = self.apply_voice_style(base.samples, base.sample_rate, profile.rms, voice_rate, emotion)
+            
+            # Ensure valid range
+            modified_speech = np.clip(modified_speech, -1.0, 1.0)
+            
+            print("✅ TRUE speech synthesis successful!")
+            return AudioClip(modified_speech, voice_rate, {'engine': 'dynamic', 'text': text, 'emotion': emotion})
+                
+        except Exception as e:
+            print(f"❌ Error with speech synthesis: {e}")
+            return None
+    
+    def system_speech_base(self, text: str) -> Optional[AudioClip]:
+        """Windows System.Speech through PowerShell - a process spawn per sentence, so only when nothing else loaded"""
+        # System.Speech can only write a file; it lives in the scratch arena until we've read it
+        with get_scratch_arena().create() as scratch:
+            temp_tts_file = str(scratch.path)
             ps_command = f'''
             Add-Type -AssemblyName System.Speech
             $synth = New-Object System.Speech.Synthesis.SpeechSynthesizer
@@ -183,130 +179,37 @@ class DynamicVoiceClone:
             $synth.Speak("{text}")
             $synth.Dispose()
             '''
-            
-            import subprocess
-            result = subprocess.run(
+            subprocess.run(
                 ["powershell", "-Command", ps_command],
                 capture_output=True,
                 text=True,
                 timeout=15
             )
-            
-            if os.path.exists(temp_tts_file):
-                # Load your voice sample for characteristics
-                voice_data, voice_rate = sf.read(self.voice_sample_path)
-                
-                # Load generated TTS
-                tts_data, tts_rate = sf.read(temp_tts_file)
-                
-                # Apply your voice characteristics
-                modified_speech = self.apply_voice_style(tts_data, tts_rate, voice_data, voice_rate, emotion)
-                
-                # Ensure valid range
-                modified_speech = np.clip(modified_speech, -1.0, 1.0)
-                
-                # Save to temporary file
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                    sf.write(tmp_file.name, modified_speech, voice_rate)
-                    audio_path = tmp_file.name
-                
-                # Cleanup
-                os.remove(temp_tts_file)
-                
-                print("✅ TRUE speech synthesis successful!")
-                return audio_path
-            else:
-                print("❌ TTS generation failed")
+            if not os.path.exists(temp_tts_file):
                 return None
-                
-        except Exception as e:
-            print(f"❌ Error with speech synthesis: {e}")
-            return None
+            return AudioClip.from_file(temp_tts_file)
     
-    def add_text_variation(self, audio: np.ndarray, text: str, sample_rate: int) -> np.ndarray:
-        """Add variation based on text content to make each response unique"""
-        try:
-            # Create unique variations based on text content
-            text_hash = hash(text) % 10000
-            
-            # Vary speed based on text length and content
-            speed_factor = 0.9 + (text_hash % 200) / 1000.0  # 0.9 to 1.1x speed
-            
-            # Vary pitch based on text characteristics
-            pitch_factor = 0.95 + (text_hash % 100) / 1000.0  # 0.95 to 1.05x pitch
-            
-            # Apply speed variation (time stretching)
-            if abs(speed_factor - 1.0) > 0.01:
-                new_length = int(len(audio) / speed_factor)
-                if new_length > 0:
-                    indices = np.linspace(0, len(audio) - 1, new_length)
-                    audio = np.interp(indices, np.arange(len(audio)), audio)
-            
-            # Apply pitch variation (simple frequency scaling)
-            audio = audio * pitch_factor
-            
-            # Add subtle amplitude variation for naturalness (much quieter)
-            amp_variation = 0.5 + (text_hash % 30) / 1000.0  # 0.5 to 0.53x volume (much quieter)
-            audio = audio * amp_variation
-            
-            # Ensure audio stays in valid range
-            audio = np.clip(audio, -1.0, 1.0)
-            
-            return audio
-            
-        except Exception as e:
-            print(f"⚠️ Error adding text variation: {e}")
-            return audio
-    
-    def apply_voice_style(self, tts_audio, tts_rate, voice_sample, voice_rate, emotion):
+    def apply_voice_style(self, tts_audio, tts_rate, voice_rms, voice_rate, emotion):
         """Apply your voice characteristics to TTS audio"""
         
-        # Resample TTS to match voice sample rate
-        if tts_rate != voice_rate:
-            ratio = voice_rate / tts_rate
-            new_length = int(len(tts_audio) * ratio)
-            if new_length > 0:
-                indices = np.linspace(0, len(tts_audio) - 1, new_length)
-                tts_audio = np.interp(indices, np.arange(len(tts_audio)), tts_audio)
+        tts_audio = dsp.as_float32(tts_audio)
         
-        # Preserve quiet, gentle tone from your voice sample
-        voice_rms = np.sqrt(np.mean(voice_sample**2))
-        tts_rms = np.sqrt(np.mean(tts_audio**2))
-        
-        if tts_rms > 0:
-            # Match your quiet voice level (even quieter than before)
-            amplitude_factor = voice_rms / tts_rms
-            tts_audio = tts_audio * amplitude_factor * 0.4  # Much quieter, gentle tone
+        # Resample TTS to match voice sample rate (polyphase, anti-aliased)
+        tts_audio = dsp.resample(tts_audio, tts_rate, voice_rate)
         
         # Apply feminine pitch characteristics
-        # Simple pitch adjustment to make it sound more feminine
         pitch_adjustment = 1.1  # Slightly higher pitch for feminine tone
-        tts_audio = tts_audio * pitch_adjustment
-        
-        # Apply gentle emotion-based modifications
-        emotion_mods = self.get_emotion_modifications(emotion)
-        tts_audio = tts_audio * emotion_mods['volume_mult']
+        tts_audio = dsp.pitch_shift(tts_audio, pitch_adjustment)
         
-        # Ensure it stays quiet and gentle
-        tts_audio = np.clip(tts_audio, -0.5, 0.5)  # Cap at 50% max volume
+        # Preserve quiet, gentle tone from your voice sample
+        tts_rms = float(np.sqrt(np.mean(tts_audio ** 2))) if tts_audio.size else 0.0
         
-        return tts_audio
-    
-    def enhance_text_for_emotion(self, text: str, emotion: str) -> str:
-        """Enhance text based on emotion"""
-        if emotion == 'happy':
-            if not text.endswith(('!', '?')):
-                text = text.rstrip('.') + '!'
-        elif emotion == 'sad':
-            text = text.replace('.', '...')
-        elif emotion == 'tsundere':
-            if 'baka' not in text.lower() and len(text) < 100:
-                text += " ...baka."
-        elif emotion == 'surprised':
-            if not text.endswith('!'):
-                text = text.rstrip('.') + '!'
+        # Match your quiet voice level (even quieter than before), then the gentle emotion level
+        gain = voice_rms / tts_rms * 0.4 if tts_rms > 0 else 1.0
+        gain *= self.get_emotion_modifications(emotion)['volume_mult']
         
-        return text
+        # One in-place scale, capped at 50% max volume to stay quiet and gentle
+        return dsp.apply_gain(tts_audio, gain, limit=0.5)
     
     def get_emotion_modifications(self, emotion: str) -> dict:
         """Get emotion-based audio modifications"""
@@ -350,7 +253,17 @@ class DynamicVoiceClone:
         else:
             return 'neutral'
     
-    def speak_text_dynamic(self, text: str, play_immediately: bool = True) -> Optional[str]:
+    def synthesize(self, text: str, emotion: Optional[str] = None) -> Optional[AudioClip]:
+        """Clone voice in memory to say any text; canned replies come from the phrase bank"""
+        clip = get_phrase_bank('dynamic').get(text, emotion)
+        if clip is not None:
+            return clip
+        
+        if emotion is None:
+            emotion = self.detect_emotion(text)
+        return self.clone_voice_dynamic(text, emotion)
+    
+    def speak_text_dynamic(self, text: str, play_immediately: bool = True) -> Optional[AudioClip]:
         """Main function: clone voice to say any text"""
         if not text.strip():
             return None
@@ -359,37 +272,24 @@ class DynamicVoiceClone:
         emotion = self.detect_emotion(text)
         print(f"🎭 Detected emotion: {emotion}")
         
-        # Clone voice dynamically
-        audio_path = self.clone_voice_dynamic(text, emotion)
+        # Canned replies are pre-rendered; anything else is cloned dynamically
+        clip = get_phrase_bank('dynamic').get(text, emotion)
+        if clip is None:
+            clip = self.clone_voice_dynamic(text, emotion)
         
-        if audio_path and play_immediately:
-            self.play_cloned_audio(audio_path)
+        if clip is not None and play_immediately:
+            self.play_cloned_audio(clip)
         
-        return audio_path
+        return clip
     
-    def play_cloned_audio(self, audio_path: str):
+    def play_cloned_audio(self, clip: AudioClip):
         """Play cloned audio with interrupt capability"""
         try:
             # Stop any current playback
             self.stop_current_playback()
             
-            # Load audio
-            data, samplerate = sf.read(audio_path)
-            
-            # Play in separate thread
-            def play_audio():
-                try:
-                    if not self.stop_playback_flag:
-                        sd.play(data, samplerate)
-                        sd.wait()
-                except Exception as e:
-                    if not self.stop_playback_flag:
-                        print(f"⚠️ Playback interrupted: {e}")
-            
-            self.stop_playback_flag = False
-            self.playback_thread = threading.Thread(target=play_audio)
-            self.playback_thread.daemon = True
-            self.playback_thread.start()
+            # Queued on the shared engine; keep the handle so it can be interrupted
+            self.current_playback = clip.play()
             
             print("🔊 Playing cloned voice...")
             
@@ -399,47 +299,34 @@ class DynamicVoiceClone:
     def stop_current_playback(self):
         """Stop current audio playback"""
         try:
-            self.stop_playback_flag = True
-            sd.stop()
-            if self.playback_thread and self.playback_thread.is_alive():
-                self.playback_thread.join(timeout=1)
-            print("⏹️ Playback stopped")
+            if self.current_playback:
+                self.current_playback.cancel()
+                self.current_playback = None
+                print("⏹️ Playback stopped")
         except Exception as e:
             print(f"⚠️ Error stopping playback: {e}")
     
     def cleanup_temp_files(self):
         """Clean up temporary files"""
-        # This would be called periodically to clean up temp files
-        pass
+        get_scratch_arena().cleanup()
 
 # Convenience functions
-def clone_and_speak(text: str, play_immediately: bool = True) -> Optional[str]:
+def clone_and_speak(text: str, play_immediately: bool = True) -> Optional[AudioClip]:
     """Main function to clone voice and speak any text"""
-    voice_clone = DynamicVoiceClone()
-    return voice_clone.speak_text_dynamic(text, play_immediately)
+    return get_engine('dynamic').speak_text_dynamic(text, play_immediately)
 
 def play_audio(path: str):
     """Play audio file"""
     try:
-        data, samplerate = sf.read(path)
-        sd.play(data, samplerate)
-        sd.wait()
+        get_playback_engine().play_file(path).wait()
     except Exception as e:
         print(f"❌ Error playing audio: {e}")
 
 # For compatibility
 def sovits_gen(text: str, output_path: str = "output.wav") -> str:
     """Compatibility function that uses dynamic voice cloning"""
-    voice_clone = DynamicVoiceClone()
-    temp_path = voice_clone.speak_text_dynamic(text, play_immediately=False)
-    
-    if temp_path:
-        import shutil
-        shutil.copy2(temp_path, output_path)
-        os.unlink(temp_path)  # Clean up temp file
-        return output_path
-    
-    return None
+    clip = get_engine('dynamic').speak_text_dynamic(text, play_immediately=False)
+    return clip.save(output_path) if clip is not None else None
 
 if __name__ == "__main__":
     # Test dynamic voice cloning
@@ -458,8 +345,8 @@ if __name__ == "__main__":
     
     for i, text in enumerate(test_phrases, 1):
         print(f"\n🎭 Test {i}: {text}")
-        audio_path = voice_clone.speak_text_dynamic(text)
-        if audio_path:
+        clip = voice_clone.speak_text_dynamic(text)
+        if clip is not None:
             input("Press Enter for next test...")
         else:
             print("❌ Failed to generate voice")
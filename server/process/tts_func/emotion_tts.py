@@ -1,60 +1,59 @@
-import requests
-import yaml
-import re
-import random
 from typing import Dict, List, Optional
 
-# Load YAML config
-with open('character_config.yaml', 'r') as f:
-    char_config = yaml.safe_load(f)
+try:
+    from process.tts_func.pipelined_speaker import PipelinedSpeaker
+    from process.tts_func.streaming_tts import can_stream, speak_streaming
+    from process.tts_func.sovits_supervisor import routed_client, worker_count
+    from process.tts_func.phrase_bank import get_phrase_bank
+    from process.tts_func.engine_manager import get_engine
+    from process.tts_func.voice_library import get_active_voice
+    from process.tts_func.audio_clip import AudioClip
+except ImportError:
+    from server.process.tts_func.pipelined_speaker import PipelinedSpeaker
+    from server.process.tts_func.streaming_tts import can_stream, speak_streaming
+    from server.process.tts_func.sovits_supervisor import routed_client, worker_count
+    from server.process.tts_func.phrase_bank import get_phrase_bank
+    from server.process.tts_func.engine_manager import get_engine
+    from server.process.tts_func.voice_library import get_active_voice
+    from server.process.tts_func.audio_clip import AudioClip
+
 
 class EmotionalTTS:
     def __init__(self):
         self.emotions = {
             'happy': {
                 'speed': 1.1,
-                'pitch_shift': 0.1,
-                'energy': 1.2,
                 'keywords': ['happy', 'excited', 'joy', 'great', 'awesome', 'wonderful', 'amazing', 'love', '!', 'haha', 'yay']
             },
             'sad': {
                 'speed': 0.8,
-                'pitch_shift': -0.1,
-                'energy': 0.7,
                 'keywords': ['sad', 'sorry', 'disappointed', 'upset', 'cry', 'terrible', 'awful', 'bad', 'wrong']
             },
             'angry': {
                 'speed': 1.2,
-                'pitch_shift': 0.05,
-                'energy': 1.4,
                 'keywords': ['angry', 'mad', 'furious', 'annoyed', 'stupid', 'idiot', 'hate', 'damn', 'hell']
             },
             'surprised': {
                 'speed': 1.3,
-                'pitch_shift': 0.2,
-                'energy': 1.3,
                 'keywords': ['wow', 'really', 'seriously', 'no way', 'what', 'omg', 'incredible', 'unbelievable', '?!']
             },
             'sleepy': {
                 'speed': 0.7,
-                'pitch_shift': -0.2,
-                'energy': 0.6,
                 'keywords': ['tired', 'sleepy', 'yawn', 'exhausted', 'bed', 'sleep', 'zzz']
             },
             'flirty': {
                 'speed': 0.9,
-                'pitch_shift': -0.05,
-                'energy': 0.9,
                 'keywords': ['senpai', 'cute', 'handsome', 'darling', 'sweetie', 'honey', 'kiss', 'love you']
             },
             'tsundere': {
                 'speed': 1.1,
-                'pitch_shift': 0.15,
-                'energy': 1.1,
                 'keywords': ['baka', 'idiot', 'not like', "it's not", 'whatever', 'hmph', 'stupid']
             }
         }
         
+        # Sentence-pipelined playback, created on first use
+        self.speaker = None
+        
         # Anime-specific expressions that modify emotion
         self.anime_expressions = {
             'kyaa': 'surprised',
@@ -101,33 +100,29 @@ class EmotionalTTS:
         max_emotion = max(emotion_scores, key=emotion_scores.get)
         return max_emotion if emotion_scores[max_emotion] > 0 else 'happy'
     
-    def modify_text_for_emotion(self, text: str, emotion: str) -> str:
-        """Modify text to enhance emotional expression"""
-        if emotion == 'happy':
-            # Add more enthusiasm
-            text = text.replace('.', '!')
-            if not text.endswith(('!', '?')):
-                text += '!'
-        elif emotion == 'sad':
-            # Add hesitation
-            text = re.sub(r'\.', '...', text)
-        elif emotion == 'angry':
-            # Make more emphatic
-            text = text.upper() if len(text) < 50 else text
-        elif emotion == 'surprised':
-            # Add surprise markers
-            if not text.endswith('!'):
-                text += '!'
-        elif emotion == 'tsundere':
-            # Add tsundere filler words
-            tsundere_fillers = ['hmph', 'baka', "it's not like I care or anything"]
-            if random.random() < 0.3:  # 30% chance
-                text += f" {random.choice(tsundere_fillers)}"
-        
-        return text
+    def build_payload(self, text: str, emotion: str) -> dict:
+        """Canonical TTS request for ``text`` spoken with ``emotion`` (the client picks the API dialect)"""
+        emotion_config = self.emotions.get(emotion, self.emotions['happy'])
+        
+        # Emotion comes from the reference clip, so the text is synthesized as written
+        voice = get_active_voice().for_emotion(emotion)
+        return {
+            "text": text,
+            "text_lang": voice.text_lang,
+            "ref_audio_path": voice.ref_audio_path,
+            "prompt_text": voice.prompt_text,
+            "prompt_lang": voice.prompt_lang,
+            "speed": emotion_config.get('speed', 1.0),
+        }
     
-    def generate_emotional_audio(self, text: str, output_path: str, emotion: Optional[str] = None) -> str:
-        """Generate TTS with emotional parameters"""
+    def post_tts(self, payload: dict) -> Optional[AudioClip]:
+        """Synthesize and decode in memory, served from the TTS cache when this exact request was made before"""
+        # Keyed on the payload, so each emotion's reference clip caches separately
+        with routed_client() as client:
+            return client.synthesize(payload, meta={'engine': 'emotional'})
+    
+    def request_emotional_audio(self, text: str, emotion: Optional[str] = None) -> Optional[AudioClip]:
+        """Request emotional TTS from GPT-SoVITS and return it as an AudioClip"""
         
         # Auto-detect emotion if not provided
         if emotion is None:
@@ -135,73 +130,110 @@ class EmotionalTTS:
         
         print(f"🎭 Detected emotion: {emotion}")
         
-        # Modify text for emotion
-        modified_text = self.modify_text_for_emotion(text, emotion)
-        
-        # Get emotion parameters
-        emotion_config = self.emotions.get(emotion, self.emotions['happy'])
-        
         # Prepare TTS request with emotional parameters
-        url = "http://127.0.0.1:9880/tts"
-        
-        payload = {
-            "text": modified_text,
-            "text_lang": char_config['sovits_ping_config']['text_lang'],
-            "ref_audio_path": char_config['sovits_ping_config']['ref_audio_path'],
-            "prompt_text": char_config['sovits_ping_config']['prompt_text'],
-            "prompt_lang": char_config['sovits_ping_config']['prompt_lang'],
-            # Emotional parameters (if GPT-SoVITS supports them)
-            "speed": emotion_config.get('speed', 1.0),
-            "pitch": emotion_config.get('pitch_shift', 0.0),
-            "energy": emotion_config.get('energy', 1.0)
-        }
+        payload = self.build_payload(text, emotion)
         
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            
-            # Save the response audio
-            with open(output_path, "wb") as f:
-                f.write(response.content)
+            clip = self.post_tts(payload)
+            if clip is not None:
+                clip.meta['emotion'] = emotion
             
             print(f"🎵 Generated emotional audio: {emotion}")
-            return output_path
+            return clip
             
         except Exception as e:
             print(f"❌ Error in emotional TTS: {e}")
             # Fallback to regular TTS
-            return self.fallback_tts(text, output_path)
+            return self.request_fallback_audio(text)
     
-    def fallback_tts(self, text: str, output_path: str) -> str:
-        """Fallback to regular TTS if emotional TTS fails"""
-        url = "http://127.0.0.1:9880/tts"
+    def generate_emotional_audio(self, text: str, output_path: str, emotion: Optional[str] = None) -> str:
+        """Generate TTS with emotional parameters"""
+        clip = self.synthesize(text, emotion)
+        if clip is None:
+            return None
         
+        # Save the response audio
+        return clip.save(output_path)
+    
+    def synthesize(self, text: str, emotion: Optional[str] = None) -> Optional[AudioClip]:
+        """Generate emotional TTS in memory; canned replies come from the phrase bank"""
+        clip = get_phrase_bank('emotional').get(text, emotion)
+        if clip is not None:
+            return clip
+        
+        try:
+            return self.request_emotional_audio(text, emotion)
+        except Exception as e:
+            print(f"❌ Could not decode TTS audio: {e}")
+            return None
+    
+    def speak(self, text: str, emotion: Optional[str] = None) -> bool:
+        """Speak a reply as it is generated: streamed from an api_v2 server,
+        otherwise sentence by sentence, synthesizing ahead while playing"""
+        # Detect once on the whole reply so every sentence shares the same mood
+        if emotion is None:
+            emotion = self.detect_emotion(text)
+        
+        if self.speaker is None:
+            self.speaker = PipelinedSpeaker(self.synthesize, max_workers=max(2, worker_count()),
+                                            prefetch=max(2, worker_count()))
+        
+        # Canned replies are pre-rendered - play them without touching the server
+        clip = get_phrase_bank('emotional').get(text, emotion)
+        if clip is not None:
+            print("📦 Playing pre-rendered reply")
+            return self.speaker.play(*clip)
+        if can_stream():
+            return speak_streaming(self.build_payload(text, emotion))
+        return self.speaker.speak(text, lambda sentence: self.synthesize(sentence, emotion))
+    
+    def speak_streaming(self, text: str, emotion: Optional[str] = None) -> bool:
+        """Stream emotional TTS straight to the speakers, starting with the first chunk"""
+        if emotion is None:
+            emotion = self.detect_emotion(text)
+        
+        print(f"🎭 Detected emotion: {emotion}")
+        return speak_streaming(self.build_payload(text, emotion))
+    
+    def request_fallback_audio(self, text: str) -> Optional[AudioClip]:
+        """Fallback to regular TTS if emotional TTS fails"""
+        voice = get_active_voice()
         payload = {
             "text": text,
-            "text_lang": char_config['sovits_ping_config']['text_lang'],
-            "ref_audio_path": char_config['sovits_ping_config']['ref_audio_path'],
-            "prompt_text": char_config['sovits_ping_config']['prompt_text'],
-            "prompt_lang": char_config['sovits_ping_config']['prompt_lang']
+            "text_lang": voice.text_lang,
+            "ref_audio_path": voice.ref_audio_path,
+            "prompt_text": voice.prompt_text,
+            "prompt_lang": voice.prompt_lang
         }
         
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-            
-            return output_path
+            return self.post_tts(payload)
             
         except Exception as e:
             print(f"❌ Fallback TTS also failed: {e}")
             return None
+    
+    def fallback_tts(self, text: str, output_path: str) -> str:
+        """Fallback to regular TTS if emotional TTS fails"""
+        clip = self.request_fallback_audio(text)
+        if clip is None:
+            return None
+        
+        return clip.save(output_path)
 
 # Convenience function to replace the original sovits_gen
 def sovits_gen_emotional(text: str, output_path: str = "output.wav", emotion: Optional[str] = None) -> str:
     """Enhanced TTS generation with emotion detection"""
-    emotional_tts = EmotionalTTS()
-    return emotional_tts.generate_emotional_audio(text, output_path, emotion)
+    return get_engine('emotional').generate_emotional_audio(text, output_path, emotion)
+
+def sovits_speak_emotional(text: str, emotion: Optional[str] = None) -> bool:
+    """Emotional TTS that starts playing early: streamed when the server can, else pipelined"""
+    return get_engine('emotional').speak(text, emotion)
+
+
+def sovits_stream_emotional(text: str, emotion: Optional[str] = None) -> bool:
+    """Streaming emotional TTS: audio starts with the first chunk from the server"""
+    return get_engine('emotional').speak_streaming(text, emotion)
 
 if __name__ == "__main__":
     # Test emotional TTS
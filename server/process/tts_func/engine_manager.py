@@ -0,0 +1,83 @@
+import importlib
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+
+def _load_class(module: str, name: str):
+    """Import a tts_func class from either the server/ or the project root import path"""
+    try:
+        return getattr(importlib.import_module(f"process.tts_func.{module}"), name)
+    except ImportError:
+        return getattr(importlib.import_module(f"server.process.tts_func.{module}"), name)
+
+
+class EngineManager:
+    """Creates each TTS engine once and hands the same instance to every caller.
+
+    Engines are registered as factories and built lazily on first use under
+    a per-engine lock, so two threads asking for the same engine at startup
+    still only construct it once.
+    """
+
+    def __init__(self):
+        self.factories: Dict[str, Callable[[], object]] = {}
+        self.engines: Dict[str, object] = {}
+        self.locks: Dict[str, threading.Lock] = {}
+        self.registry_lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], object]):
+        with self.registry_lock:
+            self.factories[name] = factory
+            self.locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str):
+        """Return the shared engine, building it on first request"""
+        engine = self.engines.get(name)
+        if engine is not None:
+            return engine
+
+        with self.registry_lock:
+            if name not in self.factories:
+                raise KeyError(f"Unknown TTS engine: {name}")
+            lock = self.locks[name]
+
+        with lock:
+            if name not in self.engines:
+                start = time.perf_counter()
+                self.engines[name] = self.factories[name]()
+                print(f"🔧 TTS engine '{name}' ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return self.engines[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self.engines
+
+    def warm(self, names: Iterable[str]):
+        """Build engines up front (e.g. at startup) so the first turn doesn't pay for it"""
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"⚠️ Could not warm TTS engine '{name}': {e}")
+
+
+_manager: Optional[EngineManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_engine_manager() -> EngineManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = EngineManager()
+            _manager.register('emotional', lambda: _load_class('emotion_tts', 'EmotionalTTS')())
+            _manager.register('cloned', lambda: _load_class('gpt_sovits_clone', 'GPTSoVITSVoiceClone')())
+            _manager.register('dynamic', lambda: _load_class('dynamic_voice_clone', 'DynamicVoiceClone')())
+            _manager.register('character', lambda: _load_class('voice_clone_tts', 'VoiceCloneTTS')())
+            _manager.register('local', lambda: _load_class('local_tts', 'LocalTTS')())
+        return _manager
+
+
+def get_engine(name: str):
+    """Shared instance of a TTS engine: emotional, cloned, dynamic, character or local"""
+    return get_engine_manager().get(name)
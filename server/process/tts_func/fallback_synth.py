@@ -0,0 +1,185 @@
+import ctypes
+import ctypes.util
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import List, Optional
+import numpy as np
+
+try:
+    from process.config_loader import get_config_section
+    from process.tts_func.audio_clip import AudioClip
+    from process.tts_func.engine_manager import get_engine
+    from process.tts_func.scratch_audio import get_scratch_arena
+except ImportError:
+    from server.process.config_loader import get_config_section
+    from server.process.tts_func.audio_clip import AudioClip
+    from server.process.tts_func.engine_manager import get_engine
+    from server.process.tts_func.scratch_audio import get_scratch_arena
+
+# Per-emotion (rate in words/min, volume 0-1); neutral is the base voice
+EMOTION_VOICE = {
+    'happy': (200, 1.0),      # Faster, louder
+    'sad': (150, 0.7),        # Slower, quieter
+    'tsundere': (190, 0.9),   # Slightly faster
+    'surprised': (220, 1.0),  # Much faster
+    'sleepy': (140, 0.6),     # Much slower
+    'flirty': (170, 0.8),     # Slower, more sultry
+    'neutral': (180, 0.9),
+}
+
+# espeak-ng speak_lib.h constants
+AUDIO_OUTPUT_SYNCHRONOUS = 2
+POS_CHARACTER = 1
+ESPEAK_CHARS_UTF8 = 1
+ESPEAK_RATE, ESPEAK_VOLUME = 1, 2
+
+SynthCallback = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+
+
+class EspeakBackend:
+    """espeak-ng called in-process through ctypes; PCM arrives in a callback, nothing touches disk.
+
+    Synthesis can be aborted from the callback, which is how the latency
+    budget is enforced: past the deadline the clip is cut at the current
+    chunk instead of stalling the reply.
+    """
+
+    name = 'espeak-ng'
+
+    def __init__(self, voice: str = 'en+f3'):
+        path = ctypes.util.find_library('espeak-ng') or ctypes.util.find_library('espeak')
+        if path is None:
+            raise OSError("libespeak-ng not found")
+        self.lib = ctypes.CDLL(path)
+        self.lib.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+        self.lib.espeak_Initialize.restype = ctypes.c_int
+        self.lib.espeak_SetSynthCallback.argtypes = [SynthCallback]
+        self.lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        self.lib.espeak_SetParameter.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        self.lib.espeak_Synth.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int,
+                                          ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_uint),
+                                          ctypes.c_void_p]
+
+        self.sample_rate = self.lib.espeak_Initialize(AUDIO_OUTPUT_SYNCHRONOUS, 0, None, 0)
+        if self.sample_rate <= 0:
+            raise OSError("espeak_Initialize failed")
+        self.lib.espeak_SetVoiceByName(voice.encode())
+
+        # espeak keeps global state, so one synthesis at a time
+        self.lock = threading.Lock()
+        self.chunks: List[np.ndarray] = []
+        self.deadline = None
+        # Keep a reference so the callback isn't garbage-collected while C holds it
+        self.callback = SynthCallback(self.on_audio)
+        self.lib.espeak_SetSynthCallback(self.callback)
+
+    def on_audio(self, wav, count, events) -> int:
+        if wav and count > 0:
+            self.chunks.append(np.ctypeslib.as_array(wav, shape=(count,)).copy())
+        # Non-zero aborts the rest of the utterance
+        return 1 if self.deadline is not None and time.perf_counter() > self.deadline else 0
+
+    def synthesize(self, text: str, emotion: str, budget: float) -> Optional[AudioClip]:
+        rate, volume = EMOTION_VOICE.get(emotion, EMOTION_VOICE['neutral'])
+        data = text.encode('utf-8') + b'\0'
+        with self.lock:
+            self.chunks = []
+            self.deadline = time.perf_counter() + budget
+            self.lib.espeak_SetParameter(ESPEAK_RATE, rate, 0)
+            self.lib.espeak_SetParameter(ESPEAK_VOLUME, int(volume * 100), 0)
+            self.lib.espeak_Synth(data, len(data), 0, POS_CHARACTER, 0, ESPEAK_CHARS_UTF8, None, None)
+            chunks, self.chunks = self.chunks, []
+        if not chunks:
+            return None
+        samples = np.concatenate(chunks).astype(np.float32) / 32768.0
+        return AudioClip(samples, self.sample_rate, {'engine': self.name, 'text': text, 'emotion': emotion})
+
+
+class Pyttsx3Backend:
+    """The shared pyttsx3 engine thread, rendered into the RAM-backed scratch arena"""
+
+    name = 'pyttsx3'
+
+    def __init__(self):
+        self.tts = get_engine('local')
+        if not self.tts.engine:
+            raise OSError("pyttsx3 engine not available")
+
+    def synthesize(self, text: str, emotion: str, budget: float) -> Optional[AudioClip]:
+        with get_scratch_arena().create() as scratch:
+            try:
+                self.tts.submit(text, emotion, scratch.path).result(timeout=budget)
+            except FutureTimeout:
+                return None
+            return AudioClip.from_file(scratch.path, {'engine': self.name, 'text': text, 'emotion': emotion})
+
+
+BACKENDS = {'espeak': EspeakBackend, 'pyttsx3': Pyttsx3Backend}
+
+
+class FallbackSynth:
+    """In-process base voice for when GPT-SoVITS is down.
+
+    Tries espeak-ng, then pyttsx3, keeping whichever loads first. Each
+    sentence gets ``budget_ms``; a sentence that can't be rendered in time
+    comes back cut short (espeak) or not at all (pyttsx3).
+    """
+
+    def __init__(self, backend: str = 'auto', budget_ms: float = 800.0, voice: str = 'en+f3'):
+        self.budget = budget_ms / 1000.0
+        self.backend = None
+        names = list(BACKENDS) if backend == 'auto' else [backend]
+        for name in names:
+            try:
+                self.backend = BACKENDS[name](voice) if name == 'espeak' else BACKENDS[name]()
+                print(f"🗣️ Fallback synthesizer: {self.backend.name}")
+                break
+            except Exception as e:
+                print(f"⚠️ Fallback backend '{name}' unavailable: {e}")
+
+    @classmethod
+    def from_config(cls):
+        """Build from the ``fallback_tts`` section of character_config.yaml"""
+        config = get_config_section('fallback_tts')
+        return cls(config.get('backend', 'auto'), config.get('budget_ms', 800), config.get('voice', 'en+f3'))
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def synthesize(self, text: str, emotion: str = 'neutral') -> Optional[AudioClip]:
+        if self.backend is None:
+            return None
+        start = time.perf_counter()
+        try:
+            clip = self.backend.synthesize(text, emotion, self.budget)
+        except Exception as e:
+            print(f"❌ {self.backend.name} synthesis failed: {e}")
+            return None
+        elapsed = time.perf_counter() - start
+        if clip is None or elapsed > self.budget:
+            print(f"⚠️ {self.backend.name} went over its {self.budget * 1000:.0f} ms budget "
+                  f"({elapsed * 1000:.0f} ms)")
+        return clip
+
+
+_synth = None
+_synth_lock = threading.Lock()
+
+
+def get_fallback_synth() -> FallbackSynth:
+    global _synth
+    with _synth_lock:
+        if _synth is None:
+            _synth = FallbackSynth.from_config()
+        return _synth
+
+
+if __name__ == "__main__":
+    synth = get_fallback_synth()
+    for text, emotion in [("Hello! I'm Riko.", 'happy'), ("I'm a bit tired today...", 'sleepy')]:
+        start = time.perf_counter()
+        clip = synth.synthesize(text, emotion)
+        if clip is not None:
+            print(f"{text!r}: {clip.duration:.2f}s of audio in {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -1,31 +1,43 @@
-import requests
 import json
-import time
-import tempfile
-import os
-import subprocess
-import threading
-from pathlib import Path
-import soundfile as sf
-import sounddevice as sd
 from typing import Optional
-import yaml
 
-# Load config
-with open('character_config.yaml', 'r') as f:
-    char_config = yaml.safe_load(f)
+try:
+    from process.tts_func.pipelined_speaker import PipelinedSpeaker
+    from process.tts_func.streaming_tts import can_stream, speak_streaming, get_streaming_player
+    from process.tts_func.sovits_client import get_sovits_client
+    from process.tts_func.sovits_supervisor import routed_client, start_gpt_sovits_pool, worker_count
+    from process.tts_func.phrase_bank import get_phrase_bank
+    from process.tts_func.engine_manager import get_engine
+    from process.tts_func.voice_library import get_voice_library
+    from process.tts_func.playback_engine import get_playback_engine
+    from process.tts_func.audio_clip import AudioClip
+    from process.tts_func.scratch_audio import get_scratch_arena
+except ImportError:
+    from server.process.tts_func.pipelined_speaker import PipelinedSpeaker
+    from server.process.tts_func.streaming_tts import can_stream, speak_streaming, get_streaming_player
+    from server.process.tts_func.sovits_client import get_sovits_client
+    from server.process.tts_func.sovits_supervisor import routed_client, start_gpt_sovits_pool, worker_count
+    from server.process.tts_func.phrase_bank import get_phrase_bank
+    from server.process.tts_func.engine_manager import get_engine
+    from server.process.tts_func.voice_library import get_voice_library
+    from server.process.tts_func.playback_engine import get_playback_engine
+    from server.process.tts_func.audio_clip import AudioClip
+    from server.process.tts_func.scratch_audio import get_scratch_arena
+
 
 class GPTSoVITSVoiceClone:
     def __init__(self):
-        self.api_url = "http://127.0.0.1:9880"
-        self.voice_sample_path = char_config['sovits_ping_config']['ref_audio_path']
-        self.prompt_text = char_config['sovits_ping_config']['prompt_text']
-        self.text_lang = char_config['sovits_ping_config']['text_lang']
-        self.prompt_lang = char_config['sovits_ping_config']['prompt_lang']
+        self.client = get_sovits_client()
+        self.api_url = self.client.base_url
+        
+        # Follow the active voice from the voice library, including hot switches
+        library = get_voice_library()
+        self.use_voice(library.active)
+        library.on_switch(self.use_voice)
         
         self.server_running = False
         self.current_playback = None
-        self.playback_thread = None
+        self.speaker = None
         
         print(f"🎵 Initializing GPT-SoVITS Voice Clone")
         print(f"   Voice sample: {self.voice_sample_path}")
@@ -33,52 +45,31 @@ class GPTSoVITSVoiceClone:
         
         self.check_server_status()
     
-    def check_server_status(self):
+    def use_voice(self, voice):
+        """Take reference audio and prompt from a voice library entry"""
+        self.voice = voice
+        self.voice_sample_path = voice.ref_audio_path
+        self.prompt_text = voice.prompt_text
+        self.text_lang = voice.text_lang
+        self.prompt_lang = voice.prompt_lang
+    
+    def check_server_status(self) -> bool:
         """Check if GPT-SoVITS server is running"""
-        try:
-            response = requests.get(f"{self.api_url}/", timeout=5)
-            self.server_running = True
+        self.server_running = self.client.is_alive(timeout=5)
+        if self.server_running:
             print("✅ GPT-SoVITS server is running")
-        except:
-            self.server_running = False
+        else:
             print("❌ GPT-SoVITS server not running")
+        return self.server_running
     
     def start_server(self):
-        """Start GPT-SoVITS server"""
+        """Start GPT-SoVITS server (the configured worker pool, logs drained by the supervisor)"""
         if self.server_running:
             return True
         
         print("🚀 Starting GPT-SoVITS server...")
-        
-        try:
-            # Start server in background
-            gpt_sovits_path = Path("GPT-SoVITS")
-            if not gpt_sovits_path.exists():
-                print("❌ GPT-SoVITS directory not found")
-                return False
-            
-            # Start the API server
-            process = subprocess.Popen(
-                ["python", "api.py"],
-                cwd=gpt_sovits_path,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            
-            # Wait for server to start
-            for i in range(30):
-                time.sleep(1)
-                if self.check_server_status():
-                    print("✅ GPT-SoVITS server started successfully!")
-                    return True
-                print(f"   Waiting for server... ({i+1}/30)")
-            
-            print("❌ GPT-SoVITS server failed to start")
-            return False
-            
-        except Exception as e:
-            print(f"❌ Error starting server: {e}")
-            return False
+        self.server_running = start_gpt_sovits_pool()
+        return self.server_running
     
     def detect_emotion(self, text: str) -> str:
         """Detect emotion from text for voice modulation"""
@@ -99,85 +90,87 @@ class GPTSoVITSVoiceClone:
         else:
             return 'neutral'
     
-    def enhance_text_for_emotion(self, text: str, emotion: str) -> str:
-        """Enhance text based on emotion for better voice synthesis"""
-        if emotion == 'happy':
-            # Add enthusiasm
-            if not text.endswith(('!', '?')):
-                text = text.rstrip('.') + '!'
-        elif emotion == 'sad':
-            # Add hesitation
-            text = text.replace('.', '...')
-        elif emotion == 'tsundere':
-            # Add tsundere filler
-            if 'baka' not in text.lower() and len(text) < 100:
-                text += " ...baka."
-        elif emotion == 'surprised':
-            # Add surprise
-            if not text.endswith('!'):
-                text = text.rstrip('.') + '!'
-        elif emotion == 'sleepy':
-            # Add yawning effect
-            text = text.replace(',', '... ')
-        
-        return text
-    
-    def clone_voice(self, text: str, emotion: Optional[str] = None) -> Optional[str]:
-        """Clone voice using GPT-SoVITS to say any text"""
+    def ensure_server(self) -> bool:
+        """Make sure the server is up before a request, starting it if needed"""
         if not self.server_running:
             print("⚠️ GPT-SoVITS server not running, attempting to start...")
             if not self.start_server():
                 print("❌ Cannot generate voice without server")
-                return None
+                return False
+        return True
+    
+    def build_payload(self, text: str, emotion: str) -> dict:
+        """Canonical TTS request for ``text`` spoken with ``emotion`` (the client picks the API dialect)"""
+        # The emotion's own reference clip carries the mood; the text goes out unchanged
+        reference = self.voice.for_emotion(emotion)
+        
+        print(f"🎭 Generating voice with emotion: {emotion}")
+        print(f"🗣️ Text: {text}")
         
+        return {
+            "text": text,
+            "text_lang": reference.text_lang,
+            "ref_audio_path": reference.ref_audio_path,
+            "prompt_text": reference.prompt_text,
+            "prompt_lang": reference.prompt_lang,
+            "top_k": 15,
+            "top_p": 1.0,
+            "temperature": 1.0,
+            "speed": self.get_speed_for_emotion(emotion)
+        }
+    
+    def request_cloned_audio(self, text: str, emotion: Optional[str] = None) -> Optional[AudioClip]:
+        """Clone voice using GPT-SoVITS and return it as an AudioClip"""
         try:
             # Detect emotion if not provided
             if emotion is None:
                 emotion = self.detect_emotion(text)
             
-            # Enhance text for emotion
-            enhanced_text = self.enhance_text_for_emotion(text, emotion)
-            
-            print(f"🎭 Generating voice with emotion: {emotion}")
-            print(f"🗣️ Text: {enhanced_text}")
-            
             # Prepare API request
-            payload = {
-                "text": enhanced_text,
-                "text_lang": self.text_lang,
-                "ref_audio_path": self.voice_sample_path,
-                "prompt_text": self.prompt_text,
-                "prompt_lang": self.prompt_lang,
-                # Add emotion-based parameters
-                "top_k": 15,
-                "top_p": 1.0,
-                "temperature": 1.0,
-                "speed": self.get_speed_for_emotion(emotion)
-            }
-            
-            # Make request to GPT-SoVITS
-            response = requests.post(
-                f"{self.api_url}/tts",
-                json=payload,
-                timeout=30
-            )
+            payload = self.build_payload(text, emotion)
             
-            if response.status_code == 200:
-                # Create temporary file for audio
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                    tmp_file.write(response.content)
-                    audio_path = tmp_file.name
-                
-                print(f"✅ Voice cloned successfully: {audio_path}")
-                return audio_path
-            else:
-                print(f"❌ GPT-SoVITS API error: {response.status_code}")
-                return None
+            # Only a cache miss needs the server
+            with routed_client() as client:
+                return client.synthesize(payload, meta={'engine': 'cloned', 'text': text, 'emotion': emotion},
+                                         on_miss=self.ensure_server)
                 
         except Exception as e:
             print(f"❌ Error cloning voice: {e}")
             return None
     
+    def clone_voice(self, text: str, emotion: Optional[str] = None) -> Optional[str]:
+        """Clone voice using GPT-SoVITS to say any text"""
+        clip = self.request_cloned_audio(text, emotion)
+        if clip is None:
+            return None
+        
+        # Callers get a plain path, so the arena evicts it once over its cap
+        audio_path = get_scratch_arena().write_clip(clip).detach()
+        
+        print(f"✅ Voice cloned successfully: {audio_path}")
+        return audio_path
+    
+    def speak_streaming(self, text: str, emotion: Optional[str] = None) -> bool:
+        """Stream cloned audio straight into the output device as it is generated"""
+        if not self.ensure_server():
+            return False
+        
+        if emotion is None:
+            emotion = self.detect_emotion(text)
+        return speak_streaming(self.build_payload(text, emotion))
+    
+    def synthesize(self, text: str, emotion: Optional[str] = None) -> Optional[AudioClip]:
+        """Clone voice in memory; canned replies come from the phrase bank"""
+        clip = get_phrase_bank('cloned').get(text, emotion)
+        if clip is not None:
+            return clip
+        
+        try:
+            return self.request_cloned_audio(text, emotion)
+        except Exception as e:
+            print(f"❌ Could not decode cloned audio: {e}")
+            return None
+    
     def get_speed_for_emotion(self, emotion: str) -> float:
         """Get speech speed based on emotion"""
         speed_map = {
@@ -195,25 +188,13 @@ class GPTSoVITSVoiceClone:
     def play_cloned_voice(self, audio_path: str):
         """Play the cloned voice audio with interrupt capability"""
         try:
-            data, samplerate = sf.read(audio_path)
-            
             # Stop any current playback
             self.stop_playback()
             
-            # Play audio in a separate thread so it can be interrupted
-            def play_audio():
-                try:
-                    sd.play(data, samplerate)
-                    sd.wait()
-                except Exception as e:
-                    print(f"⚠️ Playback interrupted: {e}")
-            
-            self.playback_thread = threading.Thread(target=play_audio)
-            self.playback_thread.daemon = True
-            self.playback_thread.start()
-            
-            # Store reference for stopping
-            self.current_playback = True
+            # Queued on the shared engine; keep the handle so it can be interrupted
+            self.current_playback = get_playback_engine().play_file(audio_path)
+            # The engine has the samples now - a scratch clip can go
+            get_scratch_arena().release_path(audio_path)
             
         except Exception as e:
             print(f"❌ Error playing cloned voice: {e}")
@@ -221,51 +202,63 @@ class GPTSoVITSVoiceClone:
     def stop_playback(self):
         """Stop current voice playback"""
         try:
+            if self.speaker:
+                self.speaker.stop()
+            get_streaming_player().stop()
             if self.current_playback:
-                sd.stop()  # Stop sounddevice playback
+                self.current_playback.cancel()
                 self.current_playback = None
                 print("⏹️ Voice playback stopped")
         except Exception as e:
             print(f"⚠️ Error stopping playback: {e}")
     
-    def speak_text(self, text: str, emotion: Optional[str] = None, play_immediately: bool = True) -> Optional[str]:
-        """Complete pipeline: clone voice and optionally play it"""
-        audio_path = self.clone_voice(text, emotion)
+    def speak_text(self, text: str, emotion: Optional[str] = None, play_immediately: bool = True) -> Optional[AudioClip]:
+        """Complete pipeline: clone voice and optionally play it (no file involved)"""
+        clip = self.synthesize(text, emotion)
+        
+        if clip is not None and play_immediately:
+            self.stop_playback()
+            self.current_playback = clip.play()
+        
+        return clip
+    
+    def speak_text_pipelined(self, text: str, emotion: Optional[str] = None) -> bool:
+        """Speak a reply as it is generated: streamed from an api_v2 server, otherwise
+        sentence by sentence with the next sentence synthesizing while one plays"""
+        # Detect once on the whole reply so every sentence shares the same mood
+        if emotion is None:
+            emotion = self.detect_emotion(text)
         
-        if audio_path and play_immediately:
-            self.play_cloned_voice(audio_path)
+        if self.speaker is None:
+            self.speaker = PipelinedSpeaker(self.synthesize, max_workers=max(2, worker_count()),
+                                            prefetch=max(2, worker_count()))
         
-        return audio_path
+        # Canned replies are pre-rendered - play them without touching the server
+        clip = get_phrase_bank('cloned').get(text, emotion)
+        if clip is not None:
+            print("📦 Playing pre-rendered reply")
+            return self.speaker.play(*clip)
+        if can_stream() and self.ensure_server():
+            return speak_streaming(self.build_payload(text, emotion))
+        return self.speaker.speak(text, lambda sentence: self.synthesize(sentence, emotion))
     
     def cleanup_temp_files(self):
         """Clean up temporary audio files"""
         try:
-            # This would clean up temp files created during voice cloning
-            pass
+            get_scratch_arena().cleanup()
         except Exception as e:
             print(f"⚠️ Error cleaning up: {e}")
 
 # Convenience functions for compatibility
 def sovits_gen_cloned(text: str, output_path: str = "output.wav", emotion: Optional[str] = None) -> str:
     """Generate cloned voice and save to file"""
-    voice_clone = GPTSoVITSVoiceClone()
-    temp_path = voice_clone.clone_voice(text, emotion)
-    
-    if temp_path:
-        # Copy to desired output path
-        import shutil
-        shutil.copy2(temp_path, output_path)
-        os.unlink(temp_path)  # Clean up temp file
-        return output_path
-    
-    return None
+    clip = get_engine('cloned').synthesize(text, emotion)
+    return clip.save(output_path) if clip is not None else None
 
 def play_audio(path):
     """Play audio file"""
     try:
-        data, samplerate = sf.read(path)
-        sd.play(data, samplerate)
-        sd.wait()
+        get_playback_engine().play_file(path).wait()
     except Exception as e:
         print(f"❌ Error playing audio: {e}")
 
@@ -290,8 +283,8 @@ if __name__ == "__main__":
         
         for text, emotion in test_phrases:
             print(f"\n🎭 Testing: {text} ({emotion})")
-            audio_path = voice_clone.speak_text(text, emotion)
-            if audio_path:
+            clip = voice_clone.speak_text(text, emotion)
+            if clip is not None:
                 input("Press Enter for next test...")
             else:
                 print("❌ Failed to generate voice")
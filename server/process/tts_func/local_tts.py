@@ -1,17 +1,118 @@
 import pyttsx3
-import tempfile
 import os
+import queue
+import sys
 import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
 import soundfile as sf
-import sounddevice as sd
 from typing import Optional
 
+try:
+    from process.tts_func.tts_cache import get_tts_cache, make_key
+    from process.tts_func.engine_manager import get_engine
+    from process.tts_func.playback_engine import get_playback_engine
+    from process.tts_func.audio_clip import AudioClip
+    from process.tts_func.scratch_audio import get_scratch_arena
+    from process.tts_func.fallback_synth import EMOTION_VOICE
+except ImportError:
+    from server.process.tts_func.tts_cache import get_tts_cache, make_key
+    from server.process.tts_func.engine_manager import get_engine
+    from server.process.tts_func.playback_engine import get_playback_engine
+    from server.process.tts_func.audio_clip import AudioClip
+    from server.process.tts_func.scratch_audio import get_scratch_arena
+    from server.process.tts_func.fallback_synth import EMOTION_VOICE
+
+class SpeechJob:
+    """One utterance for the engine thread: render to ``output_path``, or speak aloud if None"""
+
+    def __init__(self, text: str, emotion: str, output_path: Optional[str] = None):
+        self.text = text
+        self.emotion = emotion
+        self.output_path = output_path
+        # Runs on the engine thread after rendering, before the future resolves
+        self.on_rendered = None
+        self.future = Future()
+
+
 class LocalTTS:
-    def __init__(self):
+    """pyttsx3 voice driven by one dedicated engine thread.
+
+    pyttsx3 isn't thread-safe, so a single thread owns the engine and works
+    through a queue of ``SpeechJob``s. Callers get a ``Future`` back and can
+    keep going while earlier sentences render. Jobs that pile up while the
+    engine is busy are queued into one ``runAndWait()`` together.
+    """
+
+    def __init__(self, max_batch: Optional[int] = None):
         self.engine = None
+        self.voice_id = None
+        # NSSS (macOS) drops files when several save_to_file calls share one run loop
+        self.max_batch = max_batch or (1 if sys.platform == 'darwin' else 8)
+        self.jobs = queue.Queue()
+        self.ready = threading.Event()
+        self.worker = threading.Thread(target=self.engine_loop, name="pyttsx3-engine", daemon=True)
+        self.worker.start()
+        self.ready.wait()
+    
+    def engine_loop(self):
+        """Own the pyttsx3 instance for its whole life and run queued jobs"""
         self.setup_engine()
+        self.ready.set()
+        
+        running = True
+        while running:
+            job = self.jobs.get()
+            if job is None:
+                break
+            
+            batch = [job]
+            while len(batch) < self.max_batch:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    running = False
+                    break
+                batch.append(job)
+            
+            self.run_batch(batch)
+    
+    def run_batch(self, batch):
+        """Queue every job's voice settings and text on the engine, then run them in one go"""
+        batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        if not self.engine:
+            for job in batch:
+                job.future.set_exception(RuntimeError("TTS engine not available"))
+            return
+        
+        try:
+            # pyttsx3 queues property changes in order with the utterances,
+            # so each job keeps its own emotion inside a shared run loop
+            for job in batch:
+                self.modify_voice_for_emotion(job.emotion)
+                if job.output_path:
+                    self.engine.save_to_file(job.text, job.output_path)
+                else:
+                    self.engine.say(job.text)
+            self.engine.runAndWait()
+        except Exception as e:
+            for job in batch:
+                job.future.set_exception(e)
+            return
+        
+        for job in batch:
+            if job.on_rendered is not None:
+                job.on_rendered()
+            job.future.set_result(job.output_path)
+    
+    def shutdown(self):
+        """Stop the engine thread once queued jobs are done"""
+        self.jobs.put(None)
         
     def setup_engine(self):
         """Initialize the TTS engine"""
@@ -31,6 +132,7 @@ class LocalTTS:
             # Set voice
             if female_voice:
                 self.engine.setProperty('voice', female_voice.id)
+                self.voice_id = female_voice.id
                 print(f"🎵 Using voice: {female_voice.name}")
             else:
                 print("🎵 Using default voice")
@@ -73,46 +175,50 @@ class LocalTTS:
             return
             
         try:
-            if emotion == 'happy':
-                self.engine.setProperty('rate', 200)  # Faster
-                self.engine.setProperty('volume', 1.0)  # Louder
-            elif emotion == 'sad':
-                self.engine.setProperty('rate', 150)  # Slower
-                self.engine.setProperty('volume', 0.7)  # Quieter
-            elif emotion == 'tsundere':
-                self.engine.setProperty('rate', 190)  # Slightly faster
-                self.engine.setProperty('volume', 0.9)
-            elif emotion == 'surprised':
-                self.engine.setProperty('rate', 220)  # Much faster
-                self.engine.setProperty('volume', 1.0)
-            elif emotion == 'sleepy':
-                self.engine.setProperty('rate', 140)  # Much slower
-                self.engine.setProperty('volume', 0.6)
-            elif emotion == 'flirty':
-                self.engine.setProperty('rate', 170)  # Slower, more sultry
-                self.engine.setProperty('volume', 0.8)
-            else:  # neutral
-                self.engine.setProperty('rate', 180)
-                self.engine.setProperty('volume', 0.9)
+            rate, volume = EMOTION_VOICE.get(emotion, EMOTION_VOICE['neutral'])
+            self.engine.setProperty('rate', rate)
+            self.engine.setProperty('volume', volume)
                 
         except Exception as e:
             print(f"⚠️ Could not modify voice: {e}")
     
-    def enhance_text_for_emotion(self, text: str, emotion: str) -> str:
-        """Add emotional markers to text"""
-        if emotion == 'happy':
-            if not text.endswith('!'):
-                text = text.rstrip('.') + '!'
-        elif emotion == 'sad':
-            text = text.replace('.', '...')
-        elif emotion == 'tsundere':
-            if 'baka' not in text.lower():
-                text += " ...baka."
-        elif emotion == 'surprised':
-            if not text.endswith('!'):
-                text = text.rstrip('.') + '!'
+    def submit(self, text: str, emotion: Optional[str] = None, output_path: Optional[str] = None) -> Future:
+        """Queue an utterance and return at once; the future resolves to ``output_path``.
+
+        With no ``output_path`` the text is spoken through the speakers.
+        Rendered files are served from the TTS cache when possible.
+        """
+        # Detect emotion if not provided
+        if emotion is None:
+            emotion = self.detect_emotion(text)
+        
+        # Emotion is carried by rate and volume (EMOTION_VOICE); the words are spoken as given
+        job = SpeechJob(text, emotion, str(output_path) if output_path else None)
         
-        return text
+        if job.output_path:
+            cache = get_tts_cache()
+            rate, volume = EMOTION_VOICE.get(emotion, EMOTION_VOICE['neutral'])
+            key = make_key("pyttsx3", job.text,
+                           emotion_params={'emotion': emotion, 'rate': rate, 'volume': volume, 'voice': self.voice_id})
+            cached = cache.get(key)
+            if cached is not None:
+                sf.write(job.output_path, cached[0], cached[1])
+                job.future.set_result(job.output_path)
+                return job.future
+            
+            # Stored before the future resolves, so a caller may delete the file right after result()
+            def store():
+                if not os.path.exists(job.output_path):
+                    return
+                try:
+                    samples, sample_rate = sf.read(job.output_path, dtype='float32')
+                    cache.put(key, samples, sample_rate)
+                except Exception as e:
+                    print(f"⚠️ Could not cache local TTS audio: {e}")
+            job.on_rendered = store
+        
+        self.jobs.put(job)
+        return job.future
     
     def generate_speech(self, text: str, output_path: str, emotion: Optional[str] = None) -> str:
         """Generate speech audio file"""
@@ -127,15 +233,7 @@ class LocalTTS:
             
             print(f"🎭 Speaking with emotion: {emotion}")
             
-            # Modify voice for emotion
-            self.modify_voice_for_emotion(emotion)
-            
-            # Enhance text for emotion
-            enhanced_text = self.enhance_text_for_emotion(text, emotion)
-            
-            # Generate speech to file
-            self.engine.save_to_file(enhanced_text, output_path)
-            self.engine.runAndWait()
+            output_path = self.submit(text, emotion, output_path).result()
             
             print(f"🎵 Generated speech: {output_path}")
             return output_path
@@ -144,6 +242,23 @@ class LocalTTS:
             print(f"❌ Error generating speech: {e}")
             return None
     
+    def synthesize(self, text: str, emotion: Optional[str] = None) -> Optional[AudioClip]:
+        """Generate speech into memory (pyttsx3 can only render to a file, so that one is thrown away)"""
+        if not self.engine:
+            print("❌ TTS engine not available")
+            return None
+        
+        if emotion is None:
+            emotion = self.detect_emotion(text)
+        
+        with get_scratch_arena().create() as scratch:
+            try:
+                self.submit(text, emotion, scratch.path).result()
+                return AudioClip.from_file(scratch.path, {'engine': 'pyttsx3', 'text': text, 'emotion': emotion})
+            except Exception as e:
+                print(f"❌ Error generating speech: {e}")
+                return None
+    
     def speak_directly(self, text: str, emotion: Optional[str] = None):
         """Speak text directly without saving to file"""
         if not self.engine:
@@ -157,15 +272,7 @@ class LocalTTS:
             
             print(f"🎭 Speaking with emotion: {emotion}")
             
-            # Modify voice for emotion
-            self.modify_voice_for_emotion(emotion)
-            
-            # Enhance text for emotion
-            enhanced_text = self.enhance_text_for_emotion(text, emotion)
-            
-            # Speak directly
-            self.engine.say(enhanced_text)
-            self.engine.runAndWait()
+            self.submit(text, emotion).result()
             
         except Exception as e:
             print(f"❌ Error speaking: {e}")
@@ -173,16 +280,13 @@ class LocalTTS:
 def play_audio(path):
     """Play audio file"""
     try:
-        data, samplerate = sf.read(path)
-        sd.play(data, samplerate)
-        sd.wait()  # Wait until playback is finished
+        get_playback_engine().play_file(path).wait()  # Wait until playback is finished
     except Exception as e:
         print(f"❌ Error playing audio: {e}")
 
 def sovits_gen_local(text: str, output_path: str = "output.wav", emotion: Optional[str] = None) -> str:
     """Local TTS generation function (replaces GPT-SoVITS)"""
-    local_tts = LocalTTS()
-    return local_tts.generate_speech(text, output_path, emotion)
+    return get_engine('local').generate_speech(text, output_path, emotion)
 
 # For compatibility with existing code
 def sovits_gen(text: str, output_path: str = "output.wav") -> str:
@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+try:
+    from process.config_loader import get_config_section, resolve_project_path
+    from process.llm_funcs.canned_responses import all_canned_responses
+    from process.tts_func.tts_cache import file_hash
+    from process.tts_func.voice_library import get_voice_library
+    from process.tts_func.audio_clip import AudioClip
+except ImportError:
+    from server.process.config_loader import get_config_section, resolve_project_path
+    from server.process.llm_funcs.canned_responses import all_canned_responses
+    from server.process.tts_func.tts_cache import file_hash
+    from server.process.tts_func.voice_library import get_voice_library
+    from server.process.tts_func.audio_clip import AudioClip
+
+DEFAULT_EMOTIONS = ['happy', 'sad', 'angry', 'surprised', 'sleepy', 'flirty', 'tsundere']
+
+# Bump when the pack layout changes so old packs get rebuilt
+PACK_VERSION = 1
+
+# One pack per GPT-SoVITS engine, each rendered with that engine's own request
+# method (straight to the server, bypassing the bank) since every engine speaks
+# with its own speed and style. Local engines synthesize fast enough without one.
+BANK_RENDERERS = {
+    'emotional': 'request_emotional_audio',
+    'cloned': 'request_cloned_audio',
+    'dynamic': 'clone_with_gpt_sovits',
+}
+
+
+class PhraseBank:
+    """Pre-rendered audio for the fixed fallback replies.
+
+    Every canned reply is synthesized once per emotion by ``engine`` into a
+    single int16 PCM pack file plus a JSON index of ``(offset, length, sample_rate)``
+    per clip. At runtime the pack is memory-mapped, so a lookup is a dict
+    hit and a slice - no synthesis at all. The index stores a fingerprint of
+    the rendering engine, the reference voice, the voice config and the
+    phrase list; any change marks the pack stale so it gets rebuilt.
+    """
+
+    def __init__(self, pack_path, engine: str, phrases: Optional[List[str]] = None,
+                 emotions: Optional[List[str]] = None):
+        self.pack_path = Path(pack_path)
+        self.engine = engine
+        self.index_path = self.pack_path.with_suffix('.json')
+        self.phrases = phrases if phrases is not None else all_canned_responses()
+        self.emotions = emotions or DEFAULT_EMOTIONS
+        self.clips: Dict[str, list] = {}
+        self.default_emotion: Dict[str, str] = {}
+        self.pack = None
+        self.lock = threading.Lock()
+        self.build_thread = None
+
+    @classmethod
+    def from_config(cls, engine: str):
+        """Build ``engine``'s bank from the ``phrase_bank`` section of character_config.yaml"""
+        config = get_config_section('phrase_bank')
+        base = resolve_project_path(config.get('pack_path', 'audio/cache/phrase_bank.pcm'))
+        return cls(
+            base.with_name(f"{base.stem}-{engine}{base.suffix}"),
+            engine,
+            emotions=config.get('emotions'),
+        )
+
+    def fingerprint(self) -> str:
+        """Hash of everything that changes how the pack would sound"""
+        voice = get_voice_library().active
+        parts = {
+            'version': PACK_VERSION,
+            'engine': self.engine,
+            'ref_audio': file_hash(voice.ref_audio_path),
+            'voice_config': [voice.prompt_text, voice.prompt_lang, voice.text_lang],
+            'emotion_refs': {emotion: [file_hash(variant.ref_audio_path), variant.prompt_text, variant.prompt_lang]
+                             for emotion, variant in voice.emotions.items()},
+            'phrases': self.phrases,
+            'emotions': self.emotions,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def clip_key(text: str, emotion: str) -> str:
+        return f"{emotion}\t{text.strip()}"
+
+    def load(self) -> bool:
+        """Map the pack into memory. False if it's missing or stale."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if index.get('fingerprint') != self.fingerprint() or not self.pack_path.exists():
+            # Stale for the current voice - stop serving its clips
+            with self.lock:
+                self.clips = {}
+                self.pack = None
+            return False
+
+        with self.lock:
+            self.clips = index['clips']
+            self.default_emotion = index.get('default_emotion', {})
+            size = self.pack_path.stat().st_size
+            self.pack = np.memmap(self.pack_path, dtype='<i2', mode='r') if size else None
+        return True
+
+    def is_loaded(self) -> bool:
+        return bool(self.clips)
+
+    def get(self, text: str, emotion: Optional[str] = None) -> Optional[AudioClip]:
+        """Return the clip for a canned reply, or None if it isn't in the bank"""
+        text = text.strip()
+        with self.lock:
+            if not self.clips or self.pack is None:
+                return None
+            entry = self.clips.get(self.clip_key(text, emotion)) if emotion else None
+            if entry is None and text in self.default_emotion:
+                entry = self.clips.get(self.clip_key(text, self.default_emotion[text]))
+            if entry is None:
+                return None
+            offset, length, sample_rate = entry
+            samples = np.asarray(self.pack[offset:offset + length], dtype=np.float32) / 32768.0
+        return AudioClip(samples, sample_rate, {'source': 'phrase_bank', 'text': text, 'emotion': emotion})
+
+    def build(self, synthesize: Callable[[str, str], Optional[Tuple[np.ndarray, int]]],
+              detect_emotion: Optional[Callable[[str], str]] = None,
+              wait_turn: Optional[Callable[[], None]] = None) -> bool:
+        """Synthesize every phrase for every emotion and write a fresh pack.
+
+        ``wait_turn`` runs before each phrase, so a background build can
+        hold off while live replies are being synthesized or played. Each
+        phrase is also rendered in the emotion ``detect_emotion`` gives it,
+        so a lookup without an explicit emotion always finds a clip.
+        """
+        default_emotion = {text: detect_emotion(text) for text in self.phrases} if detect_emotion else {}
+        print(f"📦 Building phrase bank: {len(self.phrases)} phrases x {len(self.emotions)} emotions")
+        start = time.perf_counter()
+        self.pack_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_pack = self.pack_path.with_suffix('.tmp')
+
+        clips = {}
+        offset = 0
+        with open(tmp_pack, 'wb') as pack:
+            for text in self.phrases:
+                emotions = list(self.emotions)
+                if text in default_emotion and default_emotion[text] not in emotions:
+                    emotions.append(default_emotion[text])
+                for emotion in emotions:
+                    if wait_turn is not None:
+                        wait_turn()
+                    result = synthesize(text, emotion)
+                    if result is None:
+                        print(f"⚠️ Could not render '{text[:30]}' ({emotion}) - skipping")
+                        continue
+                    samples, sample_rate = result
+                    samples = np.asarray(samples, dtype=np.float32)
+                    if samples.ndim > 1:
+                        samples = samples.mean(axis=1)
+                    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+                    pack.write(pcm.tobytes())
+                    clips[self.clip_key(text, emotion)] = [offset, len(pcm), int(sample_rate)]
+                    offset += len(pcm)
+
+        if not clips:
+            os.remove(tmp_pack)
+            print("❌ Phrase bank build failed - nothing was synthesized")
+            return False
+
+        index = {
+            'fingerprint': self.fingerprint(),
+            'clips': clips,
+            'default_emotion': default_emotion,
+        }
+        with self.lock:
+            # Drop the old mapping before replacing the file underneath it
+            self.pack = None
+            os.replace(tmp_pack, self.pack_path)
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+
+        self.load()
+        print(f"✅ Phrase bank ready: {len(clips)} clips, {offset * 2 / 1e6:.1f} MB "
+              f"in {time.perf_counter() - start:.0f}s")
+        return True
+
+    def ensure(self, background: bool = True) -> bool:
+        """Load the pack, rebuilding it (optionally in the background) if missing or stale"""
+        if self.load():
+            return True
+        if self.build_thread is not None and self.build_thread.is_alive():
+            return False
+
+        if background:
+            self.build_thread = threading.Thread(target=build_default_bank, args=(self, True),
+                                                 name=f"phrase-bank-{self.engine}", daemon=True)
+            self.build_thread.start()
+            return False
+        return build_default_bank(self)
+
+
+def wait_for_live_speech(poll: float = 0.25):
+    """Block while a live reply is synthesizing or playing, so bank renders queue behind it"""
+    try:
+        from process.tts_func.sovits_supervisor import get_sovits_supervisor
+        from process.tts_func.playback_engine import playback_busy
+    except ImportError:
+        from server.process.tts_func.sovits_supervisor import get_sovits_supervisor
+        from server.process.tts_func.playback_engine import playback_busy
+
+    supervisor = get_sovits_supervisor()
+    while not supervisor.is_idle() or playback_busy():
+        time.sleep(poll)
+
+
+def build_default_bank(bank: PhraseBank, background: bool = False) -> bool:
+    """Render the bank with its engine's GPT-SoVITS voice.
+
+    A ``background`` build yields to live speech between phrases.
+    """
+    try:
+        try:
+            from process.tts_func.engine_manager import get_engine
+            from process.tts_func.sovits_client import get_sovits_client
+        except ImportError:
+            from server.process.tts_func.engine_manager import get_engine
+            from server.process.tts_func.sovits_client import get_sovits_client
+
+        if not get_sovits_client().is_alive():
+            print("⚠️ GPT-SoVITS not running - phrase bank will be built on a later run")
+            return False
+
+        tts = get_engine(bank.engine)
+        # Straight to the server - synthesize() would consult the bank being rebuilt
+        return bank.build(getattr(tts, BANK_RENDERERS[bank.engine]), tts.detect_emotion,
+                          wait_turn=wait_for_live_speech if background else None)
+    except Exception as e:
+        print(f"❌ Error building phrase bank: {e}")
+        return False
+
+
+_banks: Dict[str, PhraseBank] = {}
+_bank_lock = threading.Lock()
+
+
+def get_phrase_bank(engine: str) -> PhraseBank:
+    """``engine``'s shared bank, mapped on first use. Lookups miss until a current pack exists."""
+    with _bank_lock:
+        bank = _banks.get(engine)
+        if bank is None:
+            bank = _banks[engine] = PhraseBank.from_config(engine)
+            bank.load()
+            # A voice switch makes the pack stale until it's rebuilt for the new voice
+            get_voice_library().on_switch(lambda voice: bank.load())
+        return bank
+
+
+def ensure_phrase_bank(engine: str, background: bool = True) -> bool:
+    """First-run hook: rebuild ``engine``'s bank if it's missing or stale"""
+    return get_phrase_bank(engine).ensure(background=background)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Build (or rebuild) the phrase banks up front, e.g. right after install
+    for engine in sys.argv[1:] or BANK_RENDERERS:
+        bank = PhraseBank.from_config(engine)
+        if bank.load():
+            print(f"✅ Phrase bank for '{engine}' is up to date ({len(bank.clips)} clips)")
+        else:
+            build_default_bank(bank)
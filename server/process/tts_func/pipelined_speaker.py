@@ -0,0 +1,158 @@
+import re
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+try:
+    from process.tts_func.playback_engine import get_playback_engine
+except ImportError:
+    from server.process.tts_func.playback_engine import get_playback_engine
+
+# (samples, sample_rate) for one synthesized chunk, or None if synthesis failed
+SynthResult = Optional[Tuple[np.ndarray, int]]
+
+
+def split_sentences(text: str, min_chars: int = 12) -> List[str]:
+    """Split a reply into sentence-sized chunks for pipelined synthesis.
+
+    Very short fragments ("Hmph.", "Eh?!") are merged into the next sentence
+    so we don't pay a full request for a single word.
+    """
+    parts = [p.strip() for p in re.split(r'(?<=[.!?~])\s+|\n+', text) if p.strip()]
+
+    sentences = []
+    carry = ""
+    for part in parts:
+        part = f"{carry} {part}".strip() if carry else part
+        if len(part) < min_chars:
+            carry = part
+            continue
+        sentences.append(part)
+        carry = ""
+    if carry:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {carry}"
+        else:
+            sentences.append(carry)
+    return sentences
+
+
+class PipelinedSpeaker:
+    """Synthesize sentence N+1 while sentence N is playing.
+
+    ``synthesize`` turns one sentence into ``(samples, sample_rate)``. Up to
+    ``prefetch`` sentences are synthesized ahead on a bounded worker pool and
+    queued in order on the shared playback engine, which plays them
+    gaplessly, so the time to first audio is the synthesis time of the first
+    sentence only. Sentences still synthesizing and sentences queued but not
+    yet played both count towards ``prefetch``, so a long reply never holds
+    more than that much audio ahead of the speakers.
+    """
+
+    def __init__(self, synthesize: Callable[[str], SynthResult], max_workers: int = 2, prefetch: int = 2):
+        self.synthesize = synthesize
+        self.prefetch = max(1, prefetch)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts-synth")
+        self.stop_flag = threading.Event()
+        self.handles = []
+        self.lock = threading.Lock()
+
+    def play_chunk(self, samples: np.ndarray, sample_rate: int):
+        """Queue one chunk on the playback engine behind anything already queued"""
+        handle = get_playback_engine().play(samples, sample_rate)
+        self.handles.append(handle)
+        return handle
+
+    def unplayed(self) -> List:
+        """Queued chunks the engine hasn't finished playing, oldest first"""
+        return [handle for handle in self.handles if not handle.done.is_set()]
+
+    def wait_for_playback(self, handle) -> bool:
+        """Wait for one queued chunk to finish; False if the reply was stopped meanwhile"""
+        while not handle.wait(0.1):
+            if self.stop_flag.is_set():
+                return False
+        return not self.stop_flag.is_set()
+
+    def play(self, samples: np.ndarray, sample_rate: int) -> bool:
+        """Play one ready-made clip (e.g. from the phrase bank) through the same engine"""
+        with self.lock:
+            self.stop_flag.clear()
+            self.handles = []
+            try:
+                self.play_chunk(samples, sample_rate).wait()
+                return not self.stop_flag.is_set()
+            except Exception as e:
+                print(f"❌ Playback error: {e}")
+                return False
+
+    def speak(self, text: str, synthesize: Optional[Callable[[str], SynthResult]] = None) -> bool:
+        """Synthesize and play ``text`` sentence by sentence. Returns True if anything played.
+
+        ``synthesize`` overrides the default callable for this reply only, so a
+        shared speaker can serve callers with different voices or emotions.
+        """
+        synthesize = synthesize or self.synthesize
+        sentences = split_sentences(text)
+        if not sentences:
+            return False
+
+        with self.lock:
+            self.stop_flag.clear()
+            self.handles = []
+            start = time.perf_counter()
+            pending = deque()
+            next_index = 0
+            played_any = False
+
+            try:
+                while next_index < len(sentences) or pending:
+                    # The playing sentence plus ``prefetch`` more, synthesizing or queued
+                    while (next_index < len(sentences)
+                           and len(pending) + len(self.unplayed()) <= self.prefetch):
+                        pending.append(self.executor.submit(synthesize, sentences[next_index]))
+                        next_index += 1
+
+                    if not pending:
+                        # Everything synthesized is queued - let the oldest chunk play out first
+                        waiting = self.unplayed()
+                        if waiting and not self.wait_for_playback(waiting[0]):
+                            break
+                        continue
+
+                    result = pending.popleft().result()
+                    if self.stop_flag.is_set():
+                        break
+                    if result is None:
+                        continue
+
+                    samples, sample_rate = result
+                    if not played_any:
+                        print(f"⚡ Time to first audio: {(time.perf_counter() - start) * 1000:.0f} ms "
+                              f"({len(sentences)} chunks)")
+                        played_any = True
+                    self.play_chunk(samples, sample_rate)
+
+                # Return once the last sentence has actually played
+                if self.handles and not self.stop_flag.is_set():
+                    self.wait_for_playback(self.handles[-1])
+            except Exception as e:
+                print(f"❌ Pipelined playback error: {e}")
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        return played_any
+
+    def stop(self):
+        """Interrupt the current reply; queued sentences are dropped"""
+        self.stop_flag.set()
+        for handle in list(self.handles):
+            handle.cancel()
+
+    def shutdown(self):
+        self.stop()
+        self.executor.shutdown(wait=False)
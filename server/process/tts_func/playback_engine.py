@@ -0,0 +1,384 @@
+import heapq
+import itertools
+import threading
+from collections import deque
+from typing import Iterable, Iterator, Optional
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+
+try:
+    from process.asr_func.audio_preprocess import resample
+except ImportError:
+    from server.process.asr_func.audio_preprocess import resample
+
+
+class StreamResampler:
+    """Linear-interpolation resampler that stays continuous across chunk boundaries"""
+
+    def __init__(self, orig_rate: int, target_rate: int):
+        self.step = orig_rate / target_rate
+        self.pos = 0.0
+        self.prev = None
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        data = chunk if self.prev is None else np.concatenate([self.prev, chunk])
+        if len(data) < 2:
+            self.prev = data
+            return data[:0]
+
+        positions = np.arange(self.pos, len(data) - 1, self.step)
+        base = positions.astype(np.int64)
+        frac = (positions - base)[:, None]
+        out = data[base] * (1.0 - frac) + data[base + 1] * frac
+
+        # Carry the last input frame and the fractional read position into the next chunk
+        self.pos = positions[-1] + self.step - (len(data) - 1) if len(positions) else self.pos - (len(data) - 1)
+        self.prev = data[-1:]
+        return out.astype(np.float32, copy=False)
+
+
+def close_source(source):
+    """Close a chunk generator so whatever it holds open (an HTTP stream, a worker slot) is released now"""
+    close = getattr(source, 'close', None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            print(f"⚠️ Error closing audio source: {e}")
+
+
+class PlaybackHandle:
+    """Ticket for one queued clip or stream: wait for it, or cancel it"""
+
+    def __init__(self, engine: 'PlaybackEngine', source: Iterable[np.ndarray], sample_rate: int,
+                 priority: int, resample_whole: bool):
+        self.engine = engine
+        self.source = source
+        self.sample_rate = sample_rate
+        self.priority = priority
+        self.resample_whole = resample_whole
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the clip has been handed to the device (or cancelled)"""
+        return self.done.wait(timeout)
+
+    def cancel(self):
+        """Drop this item, fading it out if it's already playing"""
+        self.engine.cancel(self)
+
+    @property
+    def played(self) -> bool:
+        return self.done.is_set() and not self.cancelled.is_set()
+
+
+class PlaybackEngine:
+    """One long-lived output stream shared by every TTS module.
+
+    The stream runs at the device's native rate for the life of the process;
+    clips and chunk iterators are queued, resampled on a feeder thread and
+    played back to back with a short crossfade between them. An item queued
+    with ``interrupt=True`` fades out whatever is playing and drops the
+    queue before it starts.
+    """
+
+    def __init__(self, sample_rate: Optional[int] = None, channels: int = 1, crossfade_ms: float = 10.0,
+                 max_buffer_ms: float = 500.0, device=None):
+        if sample_rate is None:
+            sample_rate = int(sd.query_devices(device, kind='output')['default_samplerate'])
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.crossfade = int(sample_rate * crossfade_ms / 1000)
+        self.max_buffer = int(sample_rate * max_buffer_ms / 1000)
+
+        # Device-side buffer of (handle, frames) in play order; frames=None marks the end of an item
+        self.ring = deque()
+        self.buffered = 0
+        self.cond = threading.Condition()
+
+        # Items waiting for the feeder, highest priority first then FIFO
+        self.pending = []
+        self.counter = itertools.count()
+        self.current: Optional[PlaybackHandle] = None
+        self.carry = None
+        self.closed = False
+
+        self.stream = sd.OutputStream(samplerate=sample_rate, channels=channels, dtype='float32',
+                                      callback=self.callback, device=device)
+        self.stream.start()
+        self.feeder = threading.Thread(target=self.feed_loop, name="playback-feeder", daemon=True)
+        self.feeder.start()
+        print(f"🔈 Playback engine running at {sample_rate} Hz")
+
+    def callback(self, outdata, frames, time_info, status):
+        """PortAudio callback: copy queued frames out, pad with silence on underrun"""
+        filled = 0
+        with self.cond:
+            while self.ring and filled < frames:
+                handle, data = self.ring[0]
+                if data is None:
+                    self.ring.popleft()
+                    handle.done.set()
+                    continue
+                n = min(frames - filled, len(data))
+                outdata[filled:filled + n] = data[:n]
+                if n == len(data):
+                    self.ring.popleft()
+                else:
+                    self.ring[0] = (handle, data[n:])
+                filled += n
+            while self.ring and self.ring[0][1] is None:
+                self.ring.popleft()[0].done.set()
+            self.buffered -= filled
+            self.cond.notify_all()
+        outdata[filled:] = 0
+
+    def to_device(self, chunk: np.ndarray, handle: PlaybackHandle, resampler: Optional[StreamResampler]) -> np.ndarray:
+        """Convert a chunk to float32 frames at the device rate and channel count"""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        if chunk.shape[1] != self.channels:
+            chunk = chunk.mean(axis=1, keepdims=True)
+            if self.channels > 1:
+                chunk = np.repeat(chunk, self.channels, axis=1)
+        if handle.sample_rate != self.sample_rate:
+            if resampler is not None:
+                chunk = resampler.process(chunk)
+            else:
+                chunk = resample(chunk, handle.sample_rate, self.sample_rate)
+        return chunk
+
+    def push(self, frames: Optional[np.ndarray], handle: PlaybackHandle) -> bool:
+        """Append to the device buffer, blocking while it's full. False if the item was cancelled.
+
+        Long chunks go in as space frees up, so the buffer never holds more
+        than ``max_buffer`` frames. ``frames=None`` marks the end of the item.
+        """
+        if frames is None:
+            with self.cond:
+                if handle.cancelled.is_set() or self.closed:
+                    return False
+                self.ring.append((handle, None))
+                return True
+
+        pos = 0
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.buffered < self.max_buffer or handle.cancelled.is_set()
+                                   or self.closed)
+                if handle.cancelled.is_set() or self.closed:
+                    return False
+                if pos >= len(frames):
+                    return True
+                n = min(len(frames) - pos, self.max_buffer - self.buffered)
+                self.ring.append((handle, frames[pos:pos + n]))
+                self.buffered += n
+                pos += n
+
+    def feed_loop(self):
+        """Feeder thread: pull items in priority order and stream them into the device buffer"""
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending or self.closed)
+                if self.closed:
+                    return
+                _, _, handle = heapq.heappop(self.pending)
+                self.current = handle
+            try:
+                self.feed(handle)
+            except Exception as e:
+                print(f"❌ Playback error: {e}")
+            finally:
+                with self.cond:
+                    self.current = None
+                    if handle.cancelled.is_set():
+                        handle.done.set()
+
+    def feed(self, handle: PlaybackHandle):
+        """Stream one item and close its source, however the item ends"""
+        try:
+            self.feed_item(handle)
+        finally:
+            close_source(handle.source)
+
+    def feed_item(self, handle: PlaybackHandle):
+        """Stream one item, crossfading its head with the previous item's held-back tail"""
+        if handle.cancelled.is_set():
+            return
+        resampler = None if handle.resample_whole else StreamResampler(handle.sample_rate, self.sample_rate)
+        carry, self.carry = self.carry, None
+        held = None
+
+        for chunk in handle.source:
+            if handle.cancelled.is_set():
+                return
+            chunk = self.to_device(chunk, handle, resampler)
+            if not len(chunk):
+                continue
+
+            if carry is not None:
+                n = len(carry)
+                if len(chunk) >= n:
+                    fade = np.linspace(0.0, 1.0, n, dtype=np.float32)[:, None]
+                    chunk = chunk.copy()
+                    chunk[:n] = carry * (1.0 - fade) + chunk[:n] * fade
+                else:
+                    chunk = np.concatenate([carry, chunk])
+                carry = None
+
+            data = chunk if held is None else np.concatenate([held, chunk])
+            # Hold back the tail so the next queued item can crossfade into it
+            held = data[-self.crossfade:] if self.crossfade else data[:0]
+            if not self.push(data[:len(data) - len(held)], handle):
+                return
+
+        if carry is not None:
+            held = carry
+        with self.cond:
+            next_queued = bool(self.pending) and not handle.cancelled.is_set()
+        if next_queued and held is not None and len(held):
+            self.carry = held
+        elif held is not None:
+            self.push(held, handle)
+        self.push(None, handle)
+
+    def enqueue(self, source: Iterable[np.ndarray], sample_rate: int, priority: int = 0,
+                interrupt: bool = False, resample_whole: bool = False) -> PlaybackHandle:
+        handle = PlaybackHandle(self, source, sample_rate, priority, resample_whole)
+        if interrupt:
+            self.stop()
+        with self.cond:
+            # Higher priority first; FIFO within a priority
+            heapq.heappush(self.pending, (-priority, next(self.counter), handle))
+            self.cond.notify_all()
+        return handle
+
+    def play(self, samples: np.ndarray, sample_rate: int, priority: int = 0, interrupt: bool = False) -> PlaybackHandle:
+        """Queue a whole clip; returns immediately"""
+        return self.enqueue([samples], sample_rate, priority, interrupt, resample_whole=True)
+
+    def play_stream(self, chunks: Iterator[np.ndarray], sample_rate: int, priority: int = 0,
+                    interrupt: bool = False) -> PlaybackHandle:
+        """Queue an iterator of chunks (e.g. a streaming TTS response); returns immediately"""
+        return self.enqueue(chunks, sample_rate, priority, interrupt)
+
+    def play_file(self, path, priority: int = 0, interrupt: bool = False) -> PlaybackHandle:
+        data, samplerate = sf.read(path, dtype='float32')
+        return self.play(data, samplerate, priority, interrupt)
+
+    def purge(self, should_drop):
+        """Remove buffered frames of matching items, keeping a short fade-out if they were playing"""
+        fade_len = max(self.crossfade, 1)
+        kept = deque()
+        head = []
+        taken = 0
+        at_front = True
+        for handle, data in self.ring:
+            if not should_drop(handle):
+                kept.append((handle, data))
+                at_front = False
+                continue
+            if data is None:
+                handle.done.set()
+            elif at_front and taken < fade_len:
+                # Only audio at the very front is audible right now - fade that out
+                part = data[:fade_len - taken]
+                head.append(part)
+                taken += len(part)
+        if head:
+            head = np.concatenate(head)
+            kept.appendleft((None, head * np.linspace(1.0, 0.0, len(head), dtype=np.float32)[:, None]))
+        self.ring = kept
+        self.buffered = sum(len(data) for _, data in kept if data is not None)
+
+    def cancel(self, handle: PlaybackHandle):
+        """Cancel one item whether it's queued, being fed or already buffered"""
+        with self.cond:
+            handle.cancelled.set()
+            remaining = [entry for entry in self.pending if entry[2] is not handle]
+            was_pending = len(remaining) != len(self.pending)
+            if was_pending:
+                self.pending = remaining
+                heapq.heapify(self.pending)
+                handle.done.set()
+            self.purge(lambda h: h is handle)
+            if self.current is not handle and not self.pending:
+                self.carry = None
+            self.cond.notify_all()
+        # Never fed, so the feeder won't close it (an item being fed is closed by feed())
+        if was_pending:
+            close_source(handle.source)
+
+    def stop(self):
+        """Fade out what's playing and drop everything queued"""
+        with self.cond:
+            dropped = [handle for _, _, handle in self.pending]
+            for handle in dropped:
+                handle.cancelled.set()
+                handle.done.set()
+            self.pending.clear()
+            if self.current is not None:
+                self.current.cancelled.set()
+            self.carry = None
+            self.purge(lambda h: h is not None)
+            self.cond.notify_all()
+        for handle in dropped:
+            close_source(handle.source)
+
+    def is_busy(self) -> bool:
+        with self.cond:
+            return bool(self.pending or self.current is not None or self.buffered > 0)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued has been played"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not (self.pending or self.current is not None or self.buffered > 0),
+                                      timeout)
+
+    def close(self):
+        self.stop()
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except Exception as e:
+            print(f"⚠️ Error closing output stream: {e}")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_playback_engine() -> PlaybackEngine:
+    """Shared engine so every module plays through the same output stream"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PlaybackEngine()
+        return _engine
+
+
+def playback_busy() -> bool:
+    """True while the shared engine has audio queued or playing (False if it was never started)"""
+    with _engine_lock:
+        engine = _engine
+    return engine is not None and engine.is_busy()
+
+
+def play_audio(path, interrupt: bool = False):
+    """Play a file through the shared engine and wait for it to finish"""
+    get_playback_engine().play_file(path, interrupt=interrupt).wait()
+
+
+if __name__ == "__main__":
+    import sys
+
+    engine = get_playback_engine()
+    for path in sys.argv[1:]:
+        engine.play_file(path)
+    engine.wait_idle()
@@ -0,0 +1,93 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+# Lines GPT-SoVITS (uvicorn) prints once the socket is bound
+READY_PATTERN = re.compile(r"Uvicorn running on|Application startup complete|Running on|listening", re.IGNORECASE)
+
+
+class ReadinessProbe:
+    """Tells the moment a freshly spawned server starts answering.
+
+    Probes ``is_alive`` with exponential backoff starting at ``initial``
+    seconds, and probes immediately whenever the server logs a line matching
+    ``pattern`` - so readiness is noticed within milliseconds of the listen
+    line instead of up to a whole poll interval later. The log line alone is
+    never trusted; a probe has to succeed. ``ready`` is an Event that can be
+    waited on from threads or, through ``wait_async``, from asyncio code.
+    """
+
+    def __init__(self, is_alive: Callable[[], bool], initial: float = 0.05, max_interval: float = 1.0,
+                 pattern=READY_PATTERN):
+        self.is_alive = is_alive
+        self.initial = initial
+        self.max_interval = max_interval
+        self.pattern = pattern
+        self.ready = threading.Event()
+        self.done = threading.Event()
+        self.wake = threading.Event()
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def on_log_line(self, line: str):
+        """Feed child output here; a listen line triggers an immediate probe"""
+        if not self.ready.is_set() and self.pattern.search(line):
+            self.wake.set()
+
+    def run(self, timeout: float = 60.0, exited: Optional[Callable[[], bool]] = None) -> bool:
+        """Probe until the server answers, ``exited()`` turns true or ``timeout`` passes"""
+        deadline = self.started + timeout
+        interval = self.initial
+        while True:
+            if self.is_alive():
+                self.elapsed = time.perf_counter() - self.started
+                self.ready.set()
+                self.done.set()
+                return True
+            if exited is not None and exited():
+                break
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            if self.wake.wait(min(interval, remaining)):
+                self.wake.clear()
+            else:
+                interval = min(interval * 2, self.max_interval)
+        self.done.set()
+        return False
+
+    def start(self, timeout: float = 60.0, exited: Optional[Callable[[], bool]] = None,
+              on_ready: Optional[Callable[[], None]] = None) -> threading.Thread:
+        """Run the probe loop on a background thread"""
+        def target():
+            if self.run(timeout, exited) and on_ready is not None:
+                on_ready()
+
+        thread = threading.Thread(target=target, name="readiness-probe", daemon=True)
+        thread.start()
+        return thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until ready; False on timeout or if the probe gave up"""
+        self.done.wait(timeout)
+        return self.ready.is_set()
+
+    async def wait_async(self, timeout: Optional[float] = None) -> bool:
+        """``await probe.wait_async()`` without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.wait, timeout)
+
+
+if __name__ == "__main__":
+    try:
+        from process.tts_func.sovits_client import get_sovits_client
+    except ImportError:
+        from server.process.tts_func.sovits_client import get_sovits_client
+
+    probe = ReadinessProbe(lambda: get_sovits_client().is_alive(timeout=0.5))
+    probe.start(timeout=30)
+    if probe.wait():
+        print(f"✅ GPT-SoVITS answered after {probe.elapsed * 1000:.0f} ms")
+    else:
+        print("❌ GPT-SoVITS did not come up")
@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+import numpy as np
+import soundfile as sf
+
+try:
+    from process.config_loader import get_config_section, resolve_project_path
+    from process.asr_func.audio_preprocess import frame_rms, resample, silence_bounds, to_float32_mono
+    from process.tts_func.tts_cache import file_hash
+except ImportError:
+    from server.process.config_loader import get_config_section, resolve_project_path
+    from server.process.asr_func.audio_preprocess import frame_rms, resample, silence_bounds, to_float32_mono
+    from server.process.tts_func.tts_cache import file_hash
+
+PREP_DIR = 'audio/cache/references'
+
+# Bump when the processing changes so stale cleaned clips are rebuilt
+PREP_VERSION = 2
+
+FRAME_MS = 20
+THRESHOLD_DB = -35.0
+
+
+def voiced_frames(audio: np.ndarray, sample_rate: int, frame_ms=FRAME_MS, threshold_db=THRESHOLD_DB,
+                  min_rms=0.003) -> Tuple[np.ndarray, np.ndarray, int]:
+    """(voiced mask, frame RMS, frame size) using the same energy gate as ``silence_bounds``"""
+    frame_size = max(1, int(sample_rate * frame_ms / 1000))
+    rms = frame_rms(audio, frame_size)
+    threshold = max(min_rms, float(rms.max()) * 10 ** (threshold_db / 20)) if rms.size else min_rms
+    return rms > threshold, rms, frame_size
+
+
+def compress_silences(audio: np.ndarray, sample_rate: int, max_gap_ms: float = 300.0) -> np.ndarray:
+    """Shorten every internal pause longer than ``max_gap_ms`` to that length.
+
+    Half the allowed gap is kept on each side of the cut so word endings and
+    breaths aren't clipped.
+    """
+    voiced, _, frame_size = voiced_frames(audio, sample_rate)
+    max_gap = max(2, int(max_gap_ms / FRAME_MS))
+
+    # Run boundaries of the unvoiced frames
+    edges = np.diff(np.concatenate([[0], (~voiced).astype(np.int8), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    long_gaps = (ends - starts) > max_gap
+
+    keep = np.ones(len(voiced), dtype=bool)
+    half = max_gap // 2
+    for start, end in zip(starts[long_gaps] + half, ends[long_gaps] - (max_gap - half)):
+        keep[start:end] = False
+
+    sample_keep = np.repeat(keep, frame_size)[:len(audio)]
+    return audio[sample_keep]
+
+
+def pad_duration(audio: np.ndarray, sample_rate: int, min_s: float = 3.0) -> np.ndarray:
+    """Pad a short clip with trailing silence up to ``min_s`` (GPT-SoVITS rejects refs under 3 s)"""
+    min_len = int(min_s * sample_rate)
+    if len(audio) < min_len:
+        audio = np.concatenate([audio, np.zeros(min_len - len(audio), dtype=np.float32)])
+    return audio
+
+
+class ReferencePrep:
+    """Cleans reference clips for GPT-SoVITS and caches the result by source hash.
+
+    Leading/trailing silence is trimmed, long internal pauses are shortened,
+    short clips are padded to ``min_s`` and the result is resampled to
+    ``sample_rate``. Speech is never cut: the prompt text has to match the
+    audio, so a clip with more than ``max_s`` of speech is left as it is and
+    reported for the user to replace. Cleaned clips live in ``prep_dir``
+    named by the source WAV's content hash, so an edited reference is
+    re-processed and an unchanged one costs a hash lookup.
+    """
+
+    def __init__(self, prep_dir=PREP_DIR, sample_rate: int = 32000, min_s: float = 3.0, max_s: float = 10.0,
+                 max_gap_ms: float = 300.0, enabled: bool = True):
+        self.prep_dir = resolve_project_path(prep_dir)
+        self.sample_rate = sample_rate
+        self.min_s = min_s
+        self.max_s = max_s
+        self.max_gap_ms = max_gap_ms
+        self.enabled = enabled
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        """Build from the ``reference_prep`` section of character_config.yaml"""
+        config = get_config_section('reference_prep')
+        return cls(
+            config.get('dir', PREP_DIR),
+            sample_rate=config.get('sample_rate', 32000),
+            min_s=config.get('min_s', 3.0),
+            max_s=config.get('max_s', 10.0),
+            max_gap_ms=config.get('max_gap_ms', 300),
+            enabled=config.get('enabled', True),
+        )
+
+    def settings_key(self) -> str:
+        return f"v{PREP_VERSION}-{self.sample_rate}-{self.min_s}-{self.max_s}-{self.max_gap_ms}"
+
+    def clean(self, samples: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, Dict]:
+        """Run the full cleanup on in-memory audio; returns the clip and a report"""
+        mono = to_float32_mono(samples)
+        source_duration = len(mono) / sample_rate
+        start, end = silence_bounds(mono, sample_rate, frame_ms=FRAME_MS, threshold_db=THRESHOLD_DB)
+        audio = compress_silences(mono[start:end], sample_rate, self.max_gap_ms)
+        voiced_duration = len(audio) / sample_rate
+        audio = pad_duration(audio, sample_rate, self.min_s)
+        if sample_rate != self.sample_rate:
+            audio = resample(audio, sample_rate, self.sample_rate)
+
+        report = {
+            'source_duration': round(source_duration, 3),
+            'voiced_duration': round(voiced_duration, 3),
+            'duration': round(len(audio) / self.sample_rate, 3),
+            'too_long': voiced_duration > self.max_s,
+            'padded': voiced_duration < self.min_s,
+        }
+        return audio.astype(np.float32, copy=False), report
+
+    def check(self, wav_path) -> Dict:
+        """Report what cleaning would change without writing anything"""
+        samples, sample_rate = sf.read(str(resolve_project_path(wav_path)), dtype='float32')
+        _, report = self.clean(samples, sample_rate)
+        report['needs_prep'] = (abs(report['duration'] - report['source_duration']) > 0.25
+                                or sample_rate != self.sample_rate)
+        return report
+
+    def prepare(self, wav_path) -> str:
+        """Path of the cleaned clip for ``wav_path``, building it on first use.
+
+        Returns the original path when disabled, when the clip can't be read,
+        or when it has more speech than GPT-SoVITS accepts (that one needs a
+        shorter recording and a matching prompt_text, not an automatic cut).
+        """
+        source = Path(wav_path)
+        if not source.exists():
+            source = resolve_project_path(source)
+        if not self.enabled or not source.exists():
+            return str(wav_path)
+
+        digest = file_hash(source)
+        target = self.prep_dir / f"{digest[:16]}-{self.settings_key()}.wav"
+        meta_path = target.with_suffix('.json')
+        with self.lock:
+            if target.exists():
+                return str(target)
+            try:
+                samples, sample_rate = sf.read(str(source), dtype='float32')
+                audio, report = self.clean(samples, sample_rate)
+                if report['too_long']:
+                    print(f"❌ Reference {source.name} has {report['voiced_duration']:.1f}s of speech even with "
+                          f"pauses shortened; GPT-SoVITS needs {self.min_s:.0f}-{self.max_s:.0f}s. Record or cut "
+                          f"a shorter clip and set prompt_text to exactly what it says - using it unchanged for now")
+                    return str(wav_path)
+                report.update({'source': str(source), 'hash': digest, 'version': PREP_VERSION})
+
+                self.prep_dir.mkdir(parents=True, exist_ok=True)
+                tmp = target.with_suffix('.tmp.wav')
+                sf.write(str(tmp), audio, self.sample_rate, subtype='PCM_16')
+                os.replace(tmp, target)
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2)
+            except Exception as e:
+                print(f"⚠️ Could not prepare reference {source.name}: {e}")
+                return str(wav_path)
+
+        print(f"✂️ Cleaned reference {source.name}: {report['source_duration']:.2f}s -> {report['duration']:.2f}s")
+        if report['padded']:
+            print(f"⚠️ {source.name} has under {self.min_s:.0f}s of speech; a longer sample will clone better")
+        return str(target)
+
+
+_prep = None
+_prep_lock = threading.Lock()
+
+
+def get_reference_prep() -> ReferencePrep:
+    global _prep
+    with _prep_lock:
+        if _prep is None:
+            _prep = ReferencePrep.from_config()
+        return _prep
+
+
+def prepare_reference(wav_path) -> str:
+    """Cleaned, cached reference path for GPT-SoVITS (the original if prep is disabled)"""
+    return get_reference_prep().prepare(wav_path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    paths = sys.argv[1:] or [get_config_section('sovits_ping_config').get('ref_audio_path',
+                                                                          'audio/voice_samples/main_sample.wav')]
+    prep = get_reference_prep()
+    for path in paths:
+        report = prep.check(path)
+        status = "needs cleaning" if report['needs_prep'] else "already clean"
+        if report['too_long']:
+            status = f"too long - needs a clip under {prep.max_s:.0f}s of speech"
+        print(f"{path}: {report['source_duration']:.2f}s, {report['voiced_duration']:.2f}s voiced "
+              f"-> {report['duration']:.2f}s ({status})")
+        print(f"   cleaned clip: {prep.prepare(path)}")
@@ -0,0 +1,248 @@
+import atexit
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+try:
+    from process.config_loader import get_config_section, resolve_project_path
+except ImportError:
+    from server.process.config_loader import get_config_section, resolve_project_path
+
+# Orphans from dead processes are swept at startup; where liveness can't be
+# checked (Windows) anything older than this is treated as an orphan
+ORPHAN_AGE_SECONDS = 3600
+
+
+def default_scratch_dir() -> Path:
+    """RAM-backed /dev/shm when available, otherwise the system temp dir"""
+    shm = Path('/dev/shm')
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm / 'riko_scratch'
+    return Path(tempfile.gettempdir()) / 'riko_scratch'
+
+
+def _pid_alive(pid: int) -> Optional[bool]:
+    """True/False on POSIX, None where we can't ask safely (os.kill terminates on Windows)"""
+    if sys.platform == 'win32':
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return None
+    return True
+
+
+class ScratchFile:
+    """Reference-counted scratch path; the file is deleted when the last holder releases it"""
+
+    def __init__(self, arena: 'ScratchArena', path: Path):
+        self.arena = arena
+        self.path = path
+        self.refs = 1
+        self.detached = False
+
+    def __fspath__(self):
+        return str(self.path)
+
+    def __str__(self):
+        return str(self.path)
+
+    def __enter__(self) -> 'ScratchFile':
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def retain(self) -> 'ScratchFile':
+        self.arena.retain(self)
+        return self
+
+    def release(self):
+        self.arena.release(self)
+
+    def detach(self) -> str:
+        """Hand the path to code that won't release it; evicted oldest-first past the cap"""
+        self.arena.detach(self)
+        return str(self.path)
+
+
+class ScratchArena:
+    """Bounded directory for the audio files that still have to exist on disk.
+
+    Files are named ``<pid>-<n><suffix>`` so a new process can tell its own
+    files from orphans left by a crashed one and sweep those at startup.
+    Held files are never evicted; files whose path was handed out with
+    ``detach()`` are deleted oldest-first once the arena is over
+    ``max_bytes``, and everything this process created is removed at exit.
+    """
+
+    def __init__(self, root, max_bytes: int = 64 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.pid = os.getpid()
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.files: 'OrderedDict[str, ScratchFile]' = OrderedDict()
+        self.stats = {'created': 0, 'released': 0, 'evicted': 0, 'orphans': 0}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.sweep_orphans()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls):
+        """Build the arena from the ``scratch_audio`` section of character_config.yaml"""
+        config = get_config_section('scratch_audio')
+        root = config.get('dir')
+        return cls(
+            resolve_project_path(root) if root else default_scratch_dir(),
+            max_bytes=int(config.get('max_mb', 64) * 1024 * 1024),
+        )
+
+    def sweep_orphans(self):
+        """Delete files left behind by processes that are no longer running"""
+        now = time.time()
+        for path in self.root.iterdir():
+            owner = path.name.split('-', 1)[0]
+            if not owner.isdigit() or int(owner) == self.pid:
+                continue
+            alive = _pid_alive(int(owner))
+            try:
+                if alive is False or (alive is None and now - path.stat().st_mtime > ORPHAN_AGE_SECONDS):
+                    path.unlink()
+                    self.stats['orphans'] += 1
+            except OSError:
+                pass
+        if self.stats['orphans']:
+            print(f"🧹 Removed {self.stats['orphans']} orphaned scratch audio files")
+
+    def create(self, suffix: str = '.wav') -> ScratchFile:
+        """Reserve a new scratch path (not created on disk until something writes it)"""
+        with self.lock:
+            path = self.root / f"{self.pid}-{next(self.counter)}{suffix}"
+            scratch = ScratchFile(self, path)
+            self.files[str(path)] = scratch
+            self.stats['created'] += 1
+            self.enforce_cap()
+        return scratch
+
+    def write_clip(self, clip, suffix: str = '.wav') -> ScratchFile:
+        """Persist an AudioClip into the arena"""
+        scratch = self.create(suffix)
+        clip.save(scratch.path)
+        return scratch
+
+    def retain(self, scratch: ScratchFile):
+        with self.lock:
+            scratch.refs += 1
+
+    def release(self, scratch: ScratchFile):
+        with self.lock:
+            if scratch.detached:
+                return  # owned by the cap now, or by release_path()
+            scratch.refs -= 1
+            if scratch.refs <= 0:
+                self.remove(scratch)
+                self.stats['released'] += 1
+
+    def release_path(self, path) -> bool:
+        """Release a detached file by path once it's been consumed (e.g. played)"""
+        with self.lock:
+            scratch = self.files.get(str(path))
+            if scratch is None:
+                return False
+            self.remove(scratch)
+            self.stats['released'] += 1
+            return True
+
+    def detach(self, scratch: ScratchFile):
+        with self.lock:
+            scratch.detached = True
+            scratch.refs = 0
+            self.enforce_cap()
+
+    def remove(self, scratch: ScratchFile):
+        """Delete the file and forget it (caller holds the lock)"""
+        self.files.pop(str(scratch.path), None)
+        try:
+            scratch.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Could not remove scratch file {scratch.path.name}: {e}")
+
+    def total_bytes(self) -> int:
+        total = 0
+        for scratch in self.files.values():
+            try:
+                total += scratch.path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def enforce_cap(self):
+        """Evict the oldest detached files until we're back under the byte cap (caller holds the lock)"""
+        total = self.total_bytes()
+        for scratch in list(self.files.values()):
+            if total <= self.max_bytes:
+                break
+            if not scratch.detached:
+                continue
+            try:
+                total -= scratch.path.stat().st_size
+            except OSError:
+                pass
+            self.remove(scratch)
+            self.stats['evicted'] += 1
+
+    def cleanup(self):
+        """Drop every detached file (the ones nobody will release)"""
+        with self.lock:
+            for scratch in [s for s in self.files.values() if s.detached]:
+                self.remove(scratch)
+                self.stats['evicted'] += 1
+
+    def close(self):
+        """Remove everything this process created"""
+        with self.lock:
+            for scratch in list(self.files.values()):
+                self.remove(scratch)
+
+    def report(self):
+        with self.lock:
+            live = len(self.files)
+            size = self.total_bytes()
+        print(f"🧹 Scratch audio: {live} live files ({size / 1024:.0f} KB) in {self.root}, "
+              f"{self.stats['created']} created, {self.stats['evicted']} evicted, "
+              f"{self.stats['orphans']} orphans swept")
+
+
+_arena = None
+_arena_lock = threading.Lock()
+
+
+def get_scratch_arena() -> ScratchArena:
+    """Shared arena so the byte cap covers every module"""
+    global _arena
+    with _arena_lock:
+        if _arena is None:
+            _arena = ScratchArena.from_config()
+        return _arena
+
+
+if __name__ == "__main__":
+    arena = get_scratch_arena()
+    with arena.create() as scratch:
+        scratch.path.write_bytes(b"\0" * 1024)
+        print(f"Wrote {scratch.path}")
+    arena.report()
@@ -0,0 +1,405 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from process.config_loader import get_config_section
+    from process.tts_func.voice_library import get_voice_library
+except ImportError:
+    from server.process.config_loader import get_config_section
+    from server.process.tts_func.voice_library import get_voice_library
+
+DEFAULT_BASE_URL = "http://127.0.0.1:9880"
+
+# Canonical request fields (api_v2 names) and what each API version calls them
+V1_FIELDS = {
+    'text': 'text', 'text_lang': 'text_language', 'ref_audio_path': 'refer_wav_path',
+    'prompt_text': 'prompt_text', 'prompt_lang': 'prompt_language',
+    'top_k': 'top_k', 'top_p': 'top_p', 'temperature': 'temperature', 'speed': 'speed',
+}
+V2_FIELDS = {
+    'text': 'text', 'text_lang': 'text_lang', 'ref_audio_path': 'ref_audio_path',
+    'prompt_text': 'prompt_text', 'prompt_lang': 'prompt_lang',
+    'top_k': 'top_k', 'top_p': 'top_p', 'temperature': 'temperature', 'speed': 'speed_factor',
+    'batch_size': 'batch_size', 'streaming': 'streaming_mode',
+    'text_split_method': 'text_split_method', 'parallel_infer': 'parallel_infer',
+    'split_bucket': 'split_bucket', 'fragment_interval': 'fragment_interval',
+}
+# Server-side throughput knobs tuned per voice by sovits_tuner
+THROUGHPUT_FIELDS = ('batch_size', 'text_split_method', 'parallel_infer', 'split_bucket', 'fragment_interval')
+# Always sent, even when the schema couldn't be read
+REQUIRED_FIELDS = {'text', 'text_lang', 'ref_audio_path', 'prompt_text', 'prompt_lang'}
+REFERENCE_FIELDS = ('ref_audio_path', 'prompt_text', 'prompt_lang')
+
+
+class ApiCapabilities:
+    """What the connected GPT-SoVITS server accepts, read once from its OpenAPI schema.
+
+    ``params`` is None when the schema wasn't available; every known field
+    for the version is sent then.
+    """
+
+    def __init__(self, version: str, paths: Set[str], params: Optional[Set[str]] = None):
+        self.version = version
+        self.paths = paths
+        self.params = params
+        self.field_map = V2_FIELDS if version == 'v2' else V1_FIELDS
+
+    def supports(self, field: str) -> bool:
+        name = self.field_map.get(field)
+        if name is None:
+            return False
+        return self.params is None or field in REQUIRED_FIELDS or name in self.params
+
+    @property
+    def streaming(self) -> bool:
+        return self.supports('streaming')
+
+    @property
+    def speed(self) -> bool:
+        return self.supports('speed')
+
+    @property
+    def batching(self) -> bool:
+        return self.supports('batch_size')
+
+    @property
+    def set_refer_audio(self) -> bool:
+        return '/set_refer_audio' in self.paths
+
+    @property
+    def change_refer(self) -> bool:
+        return '/change_refer' in self.paths
+
+    def describe(self) -> str:
+        flags = [name for name in ('streaming', 'speed', 'batching', 'set_refer_audio', 'change_refer')
+                 if getattr(self, name)]
+        return f"api {self.version} ({', '.join(flags) or 'basic'})"
+
+
+def throughput_profile(ref_audio_path) -> Dict:
+    """Tuned throughput knobs for the voice speaking with this reference clip, if it has been tuned.
+
+    Profiles are keyed by voice name, so re-preparing the clip (a new
+    PREP_VERSION or prep settings) doesn't orphan them.
+    """
+    profiles = get_config_section('sovits_throughput_profiles')
+    if not ref_audio_path or not profiles:
+        return {}
+    voice = get_voice_library().voice_for_reference(ref_audio_path)
+    profile = profiles.get(voice.name) if voice is not None else None
+    if not isinstance(profile, dict):
+        return {}
+    return {key: profile[key] for key in THROUGHPUT_FIELDS if key in profile}
+
+
+def schema_params(spec: dict, path: str) -> Set[str]:
+    """Query parameters and JSON body properties a path accepts in an OpenAPI spec"""
+    params = set()
+    schemas = spec.get('components', {}).get('schemas', {})
+    for operation in spec.get('paths', {}).get(path, {}).values():
+        if not isinstance(operation, dict):
+            continue
+        params.update(p.get('name') for p in operation.get('parameters', []))
+        body = operation.get('requestBody', {}).get('content', {}).get('application/json', {}).get('schema', {})
+        if '$ref' in body:
+            body = schemas.get(body['$ref'].rsplit('/', 1)[-1], {})
+        params.update(body.get('properties', {}))
+    params.discard(None)
+    return params
+
+
+class SoVITSClient:
+    """One keep-alive HTTP client shared by every GPT-SoVITS caller.
+
+    Wraps a ``requests.Session`` with a bounded connection pool, explicit
+    connect/read timeouts and a retry policy for connection failures, and
+    records per-endpoint latency for every request it makes.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_size=8, connect_timeout=3.05,
+                 read_timeout=60.0, retries=2, backoff=0.2, preload_reference=True):
+        self.base_url = base_url.rstrip('/')
+        self.preload_reference = preload_reference
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Only retry when nothing reached the server (or it said "try again") -
+        # re-sending a request whose synthesis is already running wastes GPU time
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size,
+                              max_retries=retry, pool_block=True)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Health checks must answer quickly, so they get their own retry-free pool
+        self.probe_session = requests.Session()
+        self.probe_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0))
+
+        self.metrics_lock = threading.Lock()
+        self.metrics = defaultdict(lambda: {'count': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0})
+
+        self.caps: Optional[ApiCapabilities] = None
+        self.caps_lock = threading.Lock()
+
+        # Reference registered on the server, and requests currently relying on it
+        self.reference: Optional[Tuple] = None
+        self.reference_users = 0
+        self.reference_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, base_url=None):
+        """Build a client from the ``sovits_client`` section of character_config.yaml"""
+        config = get_config_section('sovits_client')
+        return cls(
+            base_url=base_url or config.get('base_url', DEFAULT_BASE_URL),
+            pool_size=config.get('pool_size', 8),
+            connect_timeout=config.get('connect_timeout', 3.05),
+            read_timeout=config.get('read_timeout', 60.0),
+            retries=config.get('retries', 2),
+            backoff=config.get('backoff', 0.2),
+            preload_reference=config.get('preload_reference', True),
+        )
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def record(self, endpoint: str, elapsed: float, ok: bool):
+        with self.metrics_lock:
+            m = self.metrics[endpoint]
+            m['count'] += 1
+            m['total_time'] += elapsed
+            m['max_time'] = max(m['max_time'], elapsed)
+            if not ok:
+                m['errors'] += 1
+
+    def request(self, method: str, path: str, probe: bool = False, **kwargs) -> requests.Response:
+        """Send a request through the pooled session and time it"""
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = f"{method} /{path.lstrip('/')}"
+        session = self.probe_session if probe else self.session
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = session.request(method, self.url(path), **kwargs)
+            ok = response.status_code < 400
+            return response
+        finally:
+            self.record(endpoint, time.perf_counter() - start, ok)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    @contextmanager
+    def stream(self, method: str, path: str, **kwargs):
+        """Streaming request; the recorded latency is time to response headers"""
+        response = self.request(method, path, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+
+    def is_alive(self, timeout: float = 3.0) -> bool:
+        """Cheap reachability check - any HTTP answer means the server is up"""
+        try:
+            self.get('/', probe=True, timeout=(min(timeout, self.timeout[0]), timeout))
+            return True
+        except requests.RequestException:
+            return False
+
+    def capabilities(self, refresh: bool = False) -> ApiCapabilities:
+        """Negotiate the API version once per server; raises if the server can't be reached"""
+        with self.caps_lock:
+            if self.caps is None or refresh:
+                self.caps = self.detect_capabilities()
+                print(f"🤝 GPT-SoVITS at {self.base_url}: {self.caps.describe()}")
+            return self.caps
+
+    def detect_capabilities(self) -> ApiCapabilities:
+        """Read /openapi.json (both api.py and api_v2 are FastAPI apps); probe /tts if it's disabled"""
+        response = self.get('/openapi.json', probe=True)
+        if response.status_code == 200:
+            try:
+                spec = response.json()
+                paths = set(spec.get('paths', {}))
+                if '/tts' in paths:
+                    return ApiCapabilities('v2', paths, schema_params(spec, '/tts'))
+                return ApiCapabilities('v1', paths, schema_params(spec, '/'))
+            except ValueError:
+                pass
+        # No schema: a 404 on /tts means the v1 server
+        version = 'v1' if self.get('/tts', probe=True).status_code == 404 else 'v2'
+        return ApiCapabilities(version, set())
+
+    def forget_capabilities(self):
+        """Drop the negotiated API (the server was restarted, possibly as another version)"""
+        with self.caps_lock:
+            self.caps = None
+        with self.reference_lock:
+            self.reference = None
+
+    def set_reference(self, ref_audio_path: str, prompt_text: str = "", prompt_lang: str = "en") -> bool:
+        """Register the reference clip on the server so its features are extracted once.
+
+        api_v2 caches the prompt features for ``/set_refer_audio``'s clip, and
+        api.py makes ``/change_refer``'s clip the default for requests that
+        omit it. False if the server has neither endpoint, or while requests
+        are still relying on the current registration (the same guard as
+        ``reference_for``; the next request registers it once they finish).
+        """
+        key = (str(ref_audio_path), prompt_text, prompt_lang)
+        with self.reference_lock:
+            if self.reference == key:
+                return True
+            if self.reference_users > 0:
+                return False
+            if not self.register_reference(key):
+                return False
+            self.reference = key
+            return True
+
+    def register_reference(self, key: Tuple) -> bool:
+        """Send the reference to whichever endpoint the server has (caller holds reference_lock)"""
+        ref_audio_path, prompt_text, prompt_lang = key
+        caps = self.capabilities()
+        if caps.set_refer_audio:
+            response = self.get('/set_refer_audio', params={'refer_audio_path': ref_audio_path})
+        elif caps.change_refer:
+            response = self.post('/change_refer', json={'refer_wav_path': ref_audio_path,
+                                                        'prompt_text': prompt_text,
+                                                        'prompt_language': prompt_lang})
+        else:
+            return False
+        response.raise_for_status()
+        print(f"📌 Reference registered on {self.base_url}: {Path(ref_audio_path).name}")
+        return True
+
+    @contextmanager
+    def reference_for(self, fields: Dict):
+        """Fields to actually send for one request, registering its reference first if needed.
+
+        On api.py the reference fields are left out once registered, so the
+        request is text-only. The registration isn't switched while another
+        request is still relying on the old one; that request's neighbours
+        just send their reference in full.
+        """
+        key = tuple(fields.get(name) for name in REFERENCE_FIELDS)
+        if not self.preload_reference or key[0] is None:
+            yield fields
+            return
+
+        with self.reference_lock:
+            if self.reference != key and self.reference_users == 0:
+                try:
+                    if self.register_reference(key):
+                        self.reference = key
+                except requests.RequestException as e:
+                    print(f"⚠️ Could not register reference audio: {e}")
+            registered = self.reference == key
+            if registered:
+                self.reference_users += 1
+        if not registered:
+            yield fields
+            return
+
+        try:
+            if self.capabilities().change_refer and not self.capabilities().set_refer_audio:
+                yield {k: v for k, v in fields.items() if k not in REFERENCE_FIELDS}
+            else:
+                # api_v2 insists on ref_audio_path, but skips re-extraction when it matches
+                yield fields
+        finally:
+            with self.reference_lock:
+                self.reference_users -= 1
+
+    def build_request(self, fields: Dict, streaming: bool = False) -> Tuple[str, str, Dict]:
+        """``(method, path, request kwargs)`` for canonical fields in this server's dialect.
+
+        Fields the server doesn't accept are dropped instead of being sent and
+        ignored. The voice's tuned throughput profile fills in any knobs the
+        caller didn't set.
+        """
+        caps = self.capabilities()
+        fields = dict(throughput_profile(fields.get('ref_audio_path')), **fields)
+        if streaming:
+            fields['streaming'] = True
+        payload = {caps.field_map[key]: value for key, value in fields.items()
+                   if value is not None and caps.supports(key)}
+        if caps.version == 'v2':
+            payload['media_type'] = 'wav'
+            return 'POST', '/tts', {'json': payload}
+        return 'GET', '/', {'params': payload}
+
+    def synthesize(self, fields: Dict, meta: Optional[Dict] = None, on_miss=None):
+        """Synthesize canonical fields to an AudioClip through the TTS cache.
+
+        The cache key is version-independent, so a hit never touches the
+        server. ``on_miss`` (e.g. "make sure the server is up") runs before
+        a real request; returning False skips it.
+        """
+        try:
+            from process.tts_func.tts_cache import get_tts_cache, key_for_payload
+        except ImportError:
+            from server.process.tts_func.tts_cache import get_tts_cache, key_for_payload
+
+        def fetch():
+            if on_miss is not None and not on_miss():
+                return None
+            with self.reference_for(fields) as send:
+                method, path, kwargs = self.build_request(send)
+                response = self.request(method, path, **kwargs)
+            response.raise_for_status()
+            return response.content
+
+        return get_tts_cache().get_or_synthesize_clip(key_for_payload("gpt-sovits", fields), fetch,
+                                                      meta=dict({'text': fields.get('text', '')}, **(meta or {})))
+
+    def latency_stats(self) -> dict:
+        """Per-endpoint request count, error count, mean and max latency in ms"""
+        with self.metrics_lock:
+            return {
+                endpoint: {
+                    'count': m['count'],
+                    'errors': m['errors'],
+                    'mean_ms': m['total_time'] / m['count'] * 1000 if m['count'] else 0.0,
+                    'max_ms': m['max_time'] * 1000,
+                }
+                for endpoint, m in self.metrics.items()
+            }
+
+    def report(self):
+        """Print per-endpoint latency metrics"""
+        for endpoint, m in self.latency_stats().items():
+            print(f"📡 {endpoint}: {m['count']} requests, {m['errors']} errors, "
+                  f"mean {m['mean_ms']:.0f} ms, max {m['max_ms']:.0f} ms")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_sovits_client() -> SoVITSClient:
+    """Shared client so all TTS modules reuse the same connection pool"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SoVITSClient.from_config()
+        return _client
@@ -1,49 +1,53 @@
-import requests
 ### MUST START SERVERS FIRST USING START ALL SERVER SCRIPT
 import time
-import soundfile as sf 
-import sounddevice as sd
-import yaml
 
-# Load YAML config
-with open('../../../character_config.yaml', 'r') as f:
-    char_config = yaml.safe_load(f)
+try:
+    from process.tts_func.pipelined_speaker import PipelinedSpeaker
+    from process.tts_func.streaming_tts import can_stream, speak_streaming
+    from process.tts_func.sovits_supervisor import routed_client, worker_count
+    from process.tts_func.voice_library import get_active_voice
+    from process.tts_func.playback_engine import get_playback_engine
+except ImportError:
+    from server.process.tts_func.pipelined_speaker import PipelinedSpeaker
+    from server.process.tts_func.streaming_tts import can_stream, speak_streaming
+    from server.process.tts_func.sovits_supervisor import routed_client, worker_count
+    from server.process.tts_func.voice_library import get_active_voice
+    from server.process.tts_func.playback_engine import get_playback_engine
 
 
 def play_audio(path):
-    data, samplerate = sf.read(path)
-    sd.play(data, samplerate)
-    sd.wait()  # Wait until playback is finished
+    get_playback_engine().play_file(path).wait()  # Wait until playback is finished
 
-def sovits_gen(in_text, output_wav_pth = "output.wav"):
-    url = "http://127.0.0.1:9880/"
-
-    params = {
+def build_params(in_text):
+    voice = get_active_voice()
+    return {
         "text": in_text,
-        "text_language": char_config['sovits_ping_config']['text_lang'],
-        "refer_wav_path": char_config['sovits_ping_config']['ref_audio_path'],  # Make sure this path is valid
-        "prompt_text": char_config['sovits_ping_config']['prompt_text'],
-        "prompt_language": char_config['sovits_ping_config']['prompt_lang']
+        "text_lang": voice.text_lang,
+        "ref_audio_path": voice.ref_audio_path,  # Make sure this path is valid
+        "prompt_text": voice.prompt_text,
+        "prompt_lang": voice.prompt_lang
     }
 
+def request_audio(params):
+    """Audio from GPT-SoVITS as an AudioClip, served from the TTS cache when this exact request was made before"""
+    with routed_client() as client:
+        return client.synthesize(params, meta={'engine': 'gpt-sovits'})  # throws if not 200
+
+def sovits_gen(in_text, output_wav_pth = "output.wav"):
+    params = build_params(in_text)
+
     try:
         print(f"🎵 Requesting TTS from GPT-SoVITS...")
         print(f"   Text: {in_text}")
-        print(f"   Language: {params['text_language']}")
-        print(f"   Reference: {params['refer_wav_path']}")
-        
-        response = requests.get(url, params=params, timeout=30)
-        
-        print(f"   Raw response: {response.text[:200]}...")
+        print(f"   Language: {params['text_lang']}")
+        print(f"   Reference: {params['ref_audio_path']}")
         
-        response.raise_for_status()  # throws if not 200
+        clip = request_audio(params)
 
-        print(f"✅ Response status: {response.status_code}")
-        print(f"   Content length: {len(response.content)} bytes")
+        print(f"   Duration: {clip.duration:.2f}s")
 
-        # Save the response audio if it's binary
-        with open(output_wav_pth, "wb") as f:
-            f.write(response.content)
+        # Only this function writes to disk - everything else stays in memory
+        clip.save(output_wav_pth)
         
         print(f"✅ Audio saved as {output_wav_pth}")
         return output_wav_pth
@@ -53,6 +57,28 @@ def sovits_gen(in_text, output_wav_pth = "output.wav"):
         return None
 
 
+def sovits_synthesize(in_text):
+    """Synthesize one chunk of text in memory, returning an AudioClip"""
+    try:
+        return request_audio(build_params(in_text))
+    except Exception as e:
+        print(f"❌ Error in sovits_synthesize: {e}")
+        return None
+
+
+_speaker = None
+
+def sovits_speak(in_text):
+    """Speak a whole reply: streamed when the server supports it, otherwise
+    sentence by sentence, synthesizing ahead while playing"""
+    global _speaker
+    if can_stream():
+        return speak_streaming(build_params(in_text))
+    if _speaker is None:
+        _speaker = PipelinedSpeaker(sovits_synthesize, max_workers=max(2, worker_count()),
+                                    prefetch=max(2, worker_count()))
+    return _speaker.speak(in_text)
+
 
 if __name__ == "__main__":
 
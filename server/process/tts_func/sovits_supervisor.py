@@ -0,0 +1,361 @@
+import asyncio
+import atexit
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from process.config_loader import get_config_section, resolve_project_path
+    from process.tts_func.sovits_client import SoVITSClient, get_sovits_client
+    from process.tts_func.readiness import ReadinessProbe
+except ImportError:
+    from server.process.config_loader import get_config_section, resolve_project_path
+    from server.process.tts_func.sovits_client import SoVITSClient, get_sovits_client
+    from server.process.tts_func.readiness import ReadinessProbe
+
+DEFAULT_PORT = 9880
+# Longest wait between restarts of a worker that keeps crashing
+MAX_RESTART_DELAY = 30.0
+
+
+class SoVITSWorker:
+    """One GPT-SoVITS server on one port: its process (if we own it), log tail and load.
+
+    A worker whose port already answers when the supervisor starts is adopted
+    as-is - it's health-checked and routed to, but never spawned or restarted.
+    """
+
+    def __init__(self, port: int, client: SoVITSClient, log_lines: int = 200):
+        self.port = port
+        self.client = client
+        self.process: Optional[subprocess.Popen] = None
+        self.readiness: Optional[ReadinessProbe] = None
+        self.log = deque(maxlen=log_lines)
+        self.healthy = False
+        self.in_flight = 0
+        self.served = 0
+        self.restarts = 0
+        self.next_restart = 0.0
+
+    @property
+    def owned(self) -> bool:
+        return self.process is not None
+
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def starting(self) -> bool:
+        return self.readiness is not None and not self.readiness.done.is_set()
+
+    def spawn(self, command: List[str], cwd: Path, echo: bool = False) -> ReadinessProbe:
+        """Start the server with stdout/stderr merged into one pipe that a thread keeps draining"""
+        self.readiness = ReadinessProbe(lambda: self.client.is_alive(timeout=2))
+        self.process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+        )
+        self.healthy = False
+        threading.Thread(target=self.drain, args=(self.process, self.readiness, echo),
+                         name=f"sovits-log-{self.port}", daemon=True).start()
+        return self.readiness
+
+    def drain(self, process: subprocess.Popen, readiness: ReadinessProbe, echo: bool):
+        """Read the child's output until it exits so a full pipe can never block it"""
+        for line in process.stdout:
+            line = line.rstrip()
+            self.log.append(line)
+            readiness.on_log_line(line)
+            if echo:
+                print(f"[sovits:{self.port}] {line}")
+        process.stdout.close()
+
+    def check(self) -> bool:
+        self.healthy = self.client.is_alive(timeout=2)
+        return self.healthy
+
+    def stop(self, timeout: float = 5.0):
+        if not self.running():
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def log_tail(self, lines: int = 20) -> List[str]:
+        return list(self.log)[-lines:]
+
+
+class SoVITSSupervisor:
+    """Pool of GPT-SoVITS servers on consecutive ports.
+
+    ``start()`` launches a server on every port that isn't already answering,
+    then a monitor thread health-checks the pool, restarts owned workers that
+    crash (with exponential backoff) and keeps the healthy set current.
+    A spawned worker is marked healthy by its ReadinessProbe the moment it
+    answers, not on the next health-check tick; ``ready`` is set as soon as
+    any worker is up.
+    ``acquire()`` hands out the client of the healthy worker with the fewest
+    requests in flight, so concurrent sentence synthesis spreads across the
+    pool. Without ``start()`` the supervisor only routes across servers that
+    something else launched.
+    """
+
+    def __init__(self, gpt_sovits_dir, script: str = 'api.py', base_port: int = DEFAULT_PORT,
+                 workers: int = 1, extra_args: Optional[List[str]] = None, health_interval: float = 5.0,
+                 max_restarts: int = 5, startup_timeout: float = 120.0, log_lines: int = 200,
+                 echo_logs: bool = False):
+        self.gpt_sovits_dir = Path(gpt_sovits_dir)
+        self.script = script
+        self.extra_args = list(extra_args or [])
+        self.health_interval = health_interval
+        self.max_restarts = max_restarts
+        self.startup_timeout = startup_timeout
+        self.echo_logs = echo_logs
+
+        self.lock = threading.Condition()
+        self.workers = []
+        shared = get_sovits_client()
+        for port in range(base_port, base_port + max(1, workers)):
+            # The default port keeps using the shared client so a one-worker pool changes nothing
+            if shared.base_url.endswith(f":{port}"):
+                client = shared
+            else:
+                client = SoVITSClient.from_config(base_url=f"http://127.0.0.1:{port}")
+            self.workers.append(SoVITSWorker(port, client, log_lines))
+
+        self.ready = threading.Event()
+        self.spawning = False
+        self.stop_event = threading.Event()
+        self.monitor = None
+
+    @classmethod
+    def from_config(cls):
+        """Build from the ``sovits_workers`` section of character_config.yaml"""
+        config = get_config_section('sovits_workers')
+        return cls(
+            resolve_project_path(config.get('dir', 'GPT-SoVITS')),
+            script=config.get('script', 'api.py'),
+            base_port=config.get('base_port', DEFAULT_PORT),
+            workers=config.get('workers', 1),
+            extra_args=config.get('args'),
+            health_interval=config.get('health_interval', 5.0),
+            max_restarts=config.get('max_restarts', 5),
+            startup_timeout=config.get('startup_timeout', 120.0),
+            log_lines=config.get('log_lines', 200),
+            echo_logs=config.get('echo_logs', False),
+        )
+
+    def command(self, port: int) -> List[str]:
+        return [sys.executable, self.script, '-p', str(port)] + self.extra_args
+
+    def start(self) -> bool:
+        """Spawn a server on every port that isn't already serving and start supervising"""
+        if not (self.gpt_sovits_dir / self.script).exists():
+            print(f"❌ GPT-SoVITS not found at {self.gpt_sovits_dir / self.script}")
+            return False
+
+        with self.lock:
+            self.spawning = True
+        for worker in self.workers:
+            if worker.running():
+                continue
+            if worker.check():
+                print(f"✅ Adopting GPT-SoVITS already running on port {worker.port}")
+                continue
+            try:
+                self.spawn(worker)
+                print(f"🚀 Started GPT-SoVITS worker on port {worker.port} (pid {worker.process.pid})")
+            except Exception as e:
+                print(f"❌ Could not start GPT-SoVITS worker on port {worker.port}: {e}")
+        if self.healthy_count():
+            self.mark_ready()
+        self.ensure_monitor()
+        return True
+
+    def spawn(self, worker: SoVITSWorker):
+        """Launch a worker and probe it until it answers"""
+        worker.client.forget_capabilities()
+        probe = worker.spawn(self.command(worker.port), self.gpt_sovits_dir, self.echo_logs)
+        probe.start(self.startup_timeout, exited=lambda: not worker.running(),
+                    on_ready=lambda: self.on_worker_ready(worker))
+
+    def on_worker_ready(self, worker: SoVITSWorker):
+        worker.healthy = True
+        worker.restarts = 0
+        print(f"✅ GPT-SoVITS worker on port {worker.port} is healthy "
+              f"(ready after {worker.readiness.elapsed:.2f}s)")
+        self.mark_ready()
+
+    def mark_ready(self):
+        with self.lock:
+            self.ready.set()
+            self.lock.notify_all()
+
+    def ensure_monitor(self):
+        with self.lock:
+            if self.monitor is None or not self.monitor.is_alive():
+                self.stop_event.clear()
+                self.monitor = threading.Thread(target=self.monitor_loop, name="sovits-supervisor", daemon=True)
+                self.monitor.start()
+
+    def monitor_loop(self):
+        while not self.stop_event.is_set():
+            for worker in self.workers:
+                self.supervise(worker)
+            with self.lock:
+                self.lock.notify_all()
+            self.stop_event.wait(self.health_interval if self.all_healthy() else 1.0)
+
+    def supervise(self, worker: SoVITSWorker):
+        """Health-check one worker and restart it if we own it and it died"""
+        if worker.starting:
+            return  # its readiness probe reports in
+        if worker.owned and not worker.running():
+            worker.healthy = False
+            if not self.spawning or worker.restarts >= self.max_restarts:
+                return
+            if time.monotonic() < worker.next_restart:
+                return
+            print(f"⚠️ GPT-SoVITS worker on port {worker.port} exited ({worker.process.returncode}); "
+                  f"last output:")
+            for line in worker.log_tail(5):
+                print(f"   {line}")
+            worker.restarts += 1
+            worker.next_restart = time.monotonic() + min(MAX_RESTART_DELAY, 2 ** worker.restarts)
+            try:
+                self.spawn(worker)
+                print(f"🔄 Restarted GPT-SoVITS worker on port {worker.port} "
+                      f"({worker.restarts}/{self.max_restarts})")
+            except Exception as e:
+                print(f"❌ Restart failed on port {worker.port}: {e}")
+            return
+
+        was_healthy = worker.healthy
+        if worker.check() and not was_healthy:
+            print(f"✅ GPT-SoVITS worker on port {worker.port} is healthy")
+            worker.restarts = 0
+            self.mark_ready()
+
+    def all_healthy(self) -> bool:
+        return all(worker.healthy for worker in self.workers)
+
+    def healthy_count(self) -> int:
+        return sum(worker.healthy for worker in self.workers)
+
+    def wait_ready(self, timeout: float = 60.0, count: int = 1) -> bool:
+        """Block until at least ``count`` workers answer health checks"""
+        self.ensure_monitor()
+        with self.lock:
+            return self.lock.wait_for(lambda: self.healthy_count() >= count, timeout)
+
+    async def wait_ready_async(self, timeout: float = 60.0, count: int = 1) -> bool:
+        """``await supervisor.wait_ready_async()`` from asyncio code (e.g. the web UI)"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.wait_ready, timeout, count)
+
+    @contextmanager
+    def acquire(self):
+        """Client of the least-loaded healthy worker, held for the duration of one request"""
+        with self.lock:
+            candidates = [w for w in self.workers if w.healthy] or self.workers
+            worker = min(candidates, key=lambda w: (w.in_flight, w.served))
+            worker.in_flight += 1
+            worker.served += 1
+        try:
+            yield worker.client
+        finally:
+            with self.lock:
+                worker.in_flight -= 1
+
+    def is_idle(self) -> bool:
+        """True when no synthesis request is in flight on any worker"""
+        with self.lock:
+            return all(worker.in_flight == 0 for worker in self.workers)
+
+    def stop(self):
+        """Stop supervising and terminate every worker we spawned"""
+        self.stop_event.set()
+        with self.lock:
+            self.spawning = False
+        for worker in self.workers:
+            worker.stop()
+
+    def report(self):
+        for worker in self.workers:
+            state = 'healthy' if worker.healthy else 'down'
+            origin = f"pid {worker.process.pid}" if worker.owned else 'external'
+            print(f"🧩 port {worker.port}: {state}, {origin}, {worker.served} served, "
+                  f"{worker.in_flight} in flight, {worker.restarts} restarts")
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def get_sovits_supervisor() -> SoVITSSupervisor:
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = SoVITSSupervisor.from_config()
+            atexit.register(_supervisor.stop)
+        return _supervisor
+
+
+def worker_count() -> int:
+    """Configured pool size - how many sentences are worth synthesizing at once"""
+    return len(get_sovits_supervisor().workers)
+
+
+@contextmanager
+def routed_client():
+    """Client to send one synthesis request through.
+
+    With a single configured worker this is just the shared client; with a
+    pool it's the least-loaded healthy worker. Either way the request is
+    counted as in flight, so background work can tell the server is busy.
+    """
+    supervisor = get_sovits_supervisor()
+    if len(supervisor.workers) > 1:
+        supervisor.ensure_monitor()
+    with supervisor.acquire() as client:
+        yield client
+
+
+def start_gpt_sovits_pool(timeout: float = 60.0) -> bool:
+    """Launch the configured pool and wait for the first worker to come up"""
+    supervisor = get_sovits_supervisor()
+    if not supervisor.start():
+        return False
+    print("⏳ Waiting for GPT-SoVITS server to start...")
+    if supervisor.wait_ready(timeout):
+        print(f"✅ GPT-SoVITS is running ({supervisor.healthy_count()}/{len(supervisor.workers)} workers up)")
+        return True
+    print(f"❌ GPT-SoVITS failed to start within {timeout:.0f} seconds")
+    for worker in supervisor.workers:
+        for line in worker.log_tail(5):
+            print(f"   [{worker.port}] {line}")
+    return False
+
+
+if __name__ == "__main__":
+    if start_gpt_sovits_pool():
+        try:
+            while True:
+                time.sleep(10)
+                get_sovits_supervisor().report()
+        except KeyboardInterrupt:
+            pass
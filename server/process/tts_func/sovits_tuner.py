@@ -0,0 +1,168 @@
+import re
+import statistics
+import time
+from typing import Dict, List, Optional
+import yaml
+
+try:
+    from process.config_loader import CONFIG_PATH, load_char_config
+    from process.tts_func.audio_clip import AudioClip
+    from process.tts_func.sovits_client import THROUGHPUT_FIELDS, get_sovits_client
+    from process.tts_func.voice_library import get_voice_library
+except ImportError:
+    from server.process.config_loader import CONFIG_PATH, load_char_config
+    from server.process.tts_func.audio_clip import AudioClip
+    from server.process.tts_func.sovits_client import THROUGHPUT_FIELDS, get_sovits_client
+    from server.process.tts_func.voice_library import get_voice_library
+
+PROFILES_SECTION = 'sovits_throughput_profiles'
+# A candidate has to beat the best RTF by this fraction to replace it
+MIN_IMPROVEMENT = 0.02
+
+# Fixed corpus: a short reply, a typical sentence and a multi-sentence answer
+CORPUS = [
+    "Hmph, fine.",
+    "I guess I can help you with that, but only because I have nothing better to do.",
+    "Okay, listen carefully. First you open the settings menu, then you pick the audio tab. "
+    "If the microphone still isn't detected after that, try restarting the app, baka!",
+]
+
+# api_v2 defaults first; the sweep moves one knob at a time from the best profile so far
+SEARCH_SPACE = {
+    'batch_size': [1, 4, 8, 16],
+    'text_split_method': ['cut5', 'cut0', 'cut1'],
+    'parallel_infer': [True, False],
+    'split_bucket': [True, False],
+    'fragment_interval': [0.3, 0.15, 0.07],
+}
+
+
+class SoVITSTuner:
+    """Finds the fastest api_v2 throughput settings for one voice on the local server.
+
+    Each candidate profile synthesizes the whole corpus (bypassing the TTS
+    cache) and is scored by mean real-time factor - synthesis time over
+    audio duration, lower is better. The sweep is coordinate descent: every
+    knob is tried in turn with the others held at the best values found so
+    far, which needs a dozen-odd runs instead of the full grid.
+    """
+
+    def __init__(self, client=None, corpus: Optional[List[str]] = None, repeats: int = 2):
+        self.client = client or get_sovits_client()
+        self.corpus = corpus or CORPUS
+        self.repeats = max(1, repeats)
+        self.results: List[Dict] = []
+
+    def measure(self, base: Dict, profile: Dict) -> Dict:
+        """Latency and RTF of one profile over the corpus"""
+        latencies, rtfs = [], []
+        for _ in range(self.repeats):
+            for text in self.corpus:
+                fields = dict(base, text=text, **profile)
+                with self.client.reference_for(fields) as send:
+                    method, path, kwargs = self.client.build_request(send)
+                    start = time.perf_counter()
+                    response = self.client.request(method, path, **kwargs)
+                    elapsed = time.perf_counter() - start
+                response.raise_for_status()
+                clip = AudioClip.from_wav_bytes(response.content)
+                latencies.append(elapsed)
+                rtfs.append(elapsed / clip.duration if clip.duration else float('inf'))
+        result = {
+            'profile': profile,
+            'latency_ms': statistics.median(latencies) * 1000,
+            'rtf': statistics.mean(rtfs),
+        }
+        self.results.append(result)
+        print(f"   {profile} -> RTF {result['rtf']:.3f}, median {result['latency_ms']:.0f} ms")
+        return result
+
+    def tune(self, voice) -> Dict:
+        """Sweep the search space for ``voice``; returns the best profile with its scores"""
+        caps = self.client.capabilities()
+        space = {key: values for key, values in SEARCH_SPACE.items() if caps.supports(key)}
+        if not space:
+            raise RuntimeError(f"GPT-SoVITS {caps.describe()} has no throughput settings to tune")
+
+        base = {
+            'text_lang': voice.text_lang,
+            'ref_audio_path': voice.ref_audio_path,
+            'prompt_text': voice.prompt_text,
+            'prompt_lang': voice.prompt_lang,
+        }
+        print(f"🔧 Tuning GPT-SoVITS for voice '{voice.name}' ({len(self.corpus)} sentences x {self.repeats})")
+
+        # Warm-up so the first candidate doesn't pay for model and reference loading
+        self.measure(base, {})
+        self.results.clear()
+
+        best = self.measure(base, {key: values[0] for key, values in space.items()})
+        for key, values in space.items():
+            for value in values[1:]:
+                candidate = dict(best['profile'], **{key: value})
+                try:
+                    result = self.measure(base, candidate)
+                except Exception as e:
+                    print(f"   {candidate} failed: {e}")
+                    continue
+                # Needs a real win, not run-to-run noise
+                if result['rtf'] < best['rtf'] * (1 - MIN_IMPROVEMENT):
+                    best = result
+
+        print(f"🏁 Best for '{voice.name}': {best['profile']} "
+              f"(RTF {best['rtf']:.3f}, median {best['latency_ms']:.0f} ms)")
+        return best
+
+
+def profile_entry(voice, best: Dict) -> Dict:
+    # Looked up by voice name; the source clip is only recorded for reference
+    entry = {'source_audio_path': voice.source_audio_path}
+    entry.update({key: best['profile'][key] for key in THROUGHPUT_FIELDS if key in best['profile']})
+    entry['rtf'] = round(best['rtf'], 4)
+    entry['latency_ms'] = round(best['latency_ms'], 1)
+    entry['tuned_at'] = time.strftime('%Y-%m-%d %H:%M')
+    return entry
+
+
+def save_profile(voice_name: str, entry: Dict, path=CONFIG_PATH):
+    """Write one voice's profile into character_config.yaml.
+
+    Only the ``sovits_throughput_profiles`` block is rewritten; the rest of
+    the file, comments included, is left exactly as it was.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    profiles = dict((yaml.safe_load(text) or {}).get(PROFILES_SECTION) or {})
+    profiles[voice_name] = entry
+    block = yaml.safe_dump({PROFILES_SECTION: profiles}, sort_keys=False, default_flow_style=False)
+    header = "# Written by sovits_tuner - best GPT-SoVITS throughput settings per voice\n"
+
+    # The existing block runs from its key (and our header comment) to the next top-level line
+    pattern = re.compile(rf"^(?:{re.escape(header)})?{PROFILES_SECTION}:.*?(?=^\S|\Z)", re.MULTILINE | re.DOTALL)
+    if pattern.search(text):
+        text = pattern.sub(lambda _: header + block + "\n", text, count=1)
+    else:
+        text = text.rstrip('\n') + "\n\n" + header + block
+    text = text.rstrip('\n') + "\n"
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    load_char_config(reload=True)
+
+
+def tune_voice(name: Optional[str] = None, repeats: int = 2) -> Dict:
+    """Tune the named (or active) voice and persist its profile"""
+    library = get_voice_library()
+    voice = library.get(name) if name else library.active
+    best = SoVITSTuner(repeats=repeats).tune(voice)
+    entry = profile_entry(voice, best)
+    save_profile(voice.name, entry)
+    print(f"💾 Saved throughput profile for '{voice.name}' to {CONFIG_PATH.name}")
+    return entry
+
+
+if __name__ == "__main__":
+    import sys
+
+    tune_voice(sys.argv[1] if len(sys.argv) > 1 else None)
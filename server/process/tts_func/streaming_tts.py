@@ -0,0 +1,228 @@
+import struct
+import threading
+import time
+from contextlib import nullcontext
+from typing import Iterator
+import numpy as np
+
+try:
+    from process.tts_func.sovits_supervisor import routed_client
+    from process.tts_func.playback_engine import close_source, get_playback_engine
+    from process.tts_func.tts_cache import get_tts_cache, key_for_payload
+    from process.tts_func.audio_clip import AudioClip
+except ImportError:
+    from server.process.tts_func.sovits_supervisor import routed_client
+    from server.process.tts_func.playback_engine import close_source, get_playback_engine
+    from server.process.tts_func.tts_cache import get_tts_cache, key_for_payload
+    from server.process.tts_func.audio_clip import AudioClip
+
+# GPT-SoVITS models output 32 kHz mono int16 unless the WAV header says otherwise
+DEFAULT_SAMPLE_RATE = 32000
+
+
+class PCMStreamDecoder:
+    """Incrementally decode a streamed WAV (header + int16 PCM) into float32 frames.
+
+    api_v2 in ``streaming_mode`` sends a WAV header chunk followed by raw PCM
+    chunks whose boundaries don't line up with sample boundaries, so odd
+    trailing bytes are carried over to the next chunk.
+    """
+
+    def __init__(self, default_sample_rate: int = DEFAULT_SAMPLE_RATE):
+        self.sample_rate = default_sample_rate
+        self.channels = 1
+        self.sample_width = 2
+        self.header_done = False
+        self.pending = b""
+
+    def parse_header(self) -> bool:
+        """Consume the RIFF header from ``pending``; False if more bytes are needed"""
+        if not self.pending.startswith(b"RIFF"):
+            # Raw PCM (media_type=raw) - nothing to parse
+            self.header_done = True
+            return True
+        if len(self.pending) < 12:
+            return False
+
+        pos = 12
+        while pos + 8 <= len(self.pending):
+            chunk_id = self.pending[pos:pos + 4]
+            chunk_size = struct.unpack('<I', self.pending[pos + 4:pos + 8])[0]
+            if chunk_id == b"fmt ":
+                if pos + 8 + 16 > len(self.pending):
+                    return False
+                _, channels, sample_rate, _, _, bits = struct.unpack(
+                    '<HHIIHH', self.pending[pos + 8:pos + 24])
+                self.channels, self.sample_rate, self.sample_width = channels, sample_rate, bits // 8
+            elif chunk_id == b"data":
+                # Streamed headers carry a bogus/zero data size - everything after is PCM
+                self.pending = self.pending[pos + 8:]
+                self.header_done = True
+                return True
+            pos += 8 + chunk_size
+        return False
+
+    def feed(self, data: bytes) -> np.ndarray:
+        """Add bytes from the HTTP body; returns any complete frames as float32 (frames, channels)"""
+        self.pending += data
+        if not self.header_done and not self.parse_header():
+            return np.zeros((0, self.channels), dtype=np.float32)
+
+        frame_bytes = self.sample_width * self.channels
+        usable = len(self.pending) - len(self.pending) % frame_bytes
+        chunk, self.pending = self.pending[:usable], self.pending[usable:]
+
+        samples = np.frombuffer(chunk, dtype='<i2').astype(np.float32) / 32768.0
+        return samples.reshape(-1, self.channels)
+
+
+def stream_tts(fields: dict, decoder: PCMStreamDecoder,
+               chunk_size: int = 4096, client=None) -> Iterator[np.ndarray]:
+    """Send a streaming TTS request and yield decoded float32 frames as they arrive"""
+    with routed_client() if client is None else nullcontext(client) as client:
+        with client.reference_for(fields) as send:
+            method, path, kwargs = client.build_request(send, streaming=True)
+            with client.stream(method, path, **kwargs) as response:
+                response.raise_for_status()
+                for data in response.iter_content(chunk_size=chunk_size):
+                    if data:
+                        frames = decoder.feed(data)
+                        if len(frames):
+                            yield frames
+
+
+def prepend(head: np.ndarray, frames: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+    """``head`` followed by the rest of ``frames``; closing this closes ``frames`` too"""
+    try:
+        yield head
+        yield from frames
+    finally:
+        close_source(frames)
+
+
+class StreamingAudioPlayer:
+    """Feeds the TTS response body straight into the shared playback engine.
+
+    The first ``jitter_ms`` of audio is buffered before queueing so a slow
+    second chunk doesn't cause an underrun right at the start. The frame
+    iterator is closed however playback ends, so a stopped stream releases
+    its HTTP response and worker slot straight away.
+    """
+
+    def __init__(self, jitter_ms: int = 120):
+        self.jitter_ms = jitter_ms
+        self.handle = None
+        self.stop_flag = threading.Event()
+        self.lock = threading.Lock()
+
+    def play(self, frames: Iterator[np.ndarray], decoder: PCMStreamDecoder) -> bool:
+        """Play frames as they are decoded. Returns True if any audio was played."""
+        with self.lock:
+            self.stop_flag.clear()
+            self.handle = None
+            start = time.perf_counter()
+            jitter = []
+            buffered = 0
+
+            try:
+                for chunk in frames:
+                    if self.stop_flag.is_set():
+                        close_source(frames)
+                        return False
+                    jitter.append(chunk)
+                    buffered += len(chunk)
+                    if buffered * 1000 >= self.jitter_ms * decoder.sample_rate:
+                        break
+
+                # Short replies may never fill the jitter buffer
+                if not jitter or self.stop_flag.is_set():
+                    close_source(frames)
+                    return False
+                print(f"⚡ Streaming audio started after {(time.perf_counter() - start) * 1000:.0f} ms")
+                # The engine closes the source once the item ends or is cancelled
+                handle = get_playback_engine().play_stream(prepend(np.concatenate(jitter), frames),
+                                                           decoder.sample_rate)
+                self.handle = handle
+                handle.wait()
+                return True
+            except Exception as e:
+                if not self.stop_flag.is_set():
+                    print(f"❌ Streaming playback error: {e}")
+                if self.handle is None:
+                    close_source(frames)
+                return self.handle is not None
+            finally:
+                self.handle = None
+
+    def stop(self):
+        """Interrupt the current stream"""
+        self.stop_flag.set()
+        handle, self.handle = self.handle, None
+        if handle is not None:
+            handle.cancel()
+
+
+_player = None
+
+
+def get_streaming_player() -> StreamingAudioPlayer:
+    """Shared player so ``stop()`` reaches whichever caller is streaming"""
+    global _player
+    if _player is None:
+        _player = StreamingAudioPlayer()
+    return _player
+
+
+def can_stream() -> bool:
+    """True when the GPT-SoVITS server can stream (api_v2); False for api.py or an unreachable server"""
+    try:
+        with routed_client() as client:
+            return client.capabilities().streaming
+    except Exception:
+        return False
+
+
+def record_frames(frames: Iterator[np.ndarray], recorded: list) -> Iterator[np.ndarray]:
+    """Pass frames through, keeping a copy; ``recorded`` ends with None only if the stream completed"""
+    try:
+        for chunk in frames:
+            recorded.append(chunk)
+            yield chunk
+        recorded.append(None)
+    finally:
+        close_source(frames)
+
+
+def speak_streaming(fields: dict) -> bool:
+    """Stream a canonical TTS request straight to the speakers.
+
+    The TTS cache is checked first (same key as a plain request), and a
+    stream that plays to the end is stored there, so a repeated reply never
+    reaches the server. Servers without streaming support (api.py v1) get a
+    normal request whose clip is played as soon as it arrives, rather than a
+    doomed streaming attempt.
+    """
+    cache = get_tts_cache()
+    key = key_for_payload("gpt-sovits", fields)
+    cached = cache.get(key)
+    if cached is not None:
+        return AudioClip(cached[0], cached[1], {'engine': 'gpt-sovits', 'cached': True}).play().wait()
+
+    decoder = PCMStreamDecoder()
+    try:
+        with routed_client() as client:
+            if not client.capabilities().streaming:
+                clip = client.synthesize(fields, meta={'engine': 'gpt-sovits'})
+                if clip is None:
+                    return False
+                clip.play().wait()
+                return True
+            recorded = []
+            played = get_streaming_player().play(
+                record_frames(stream_tts(fields, decoder, client=client), recorded), decoder)
+        if recorded and recorded[-1] is None and len(recorded) > 1:
+            cache.put(key, np.concatenate(recorded[:-1]), decoder.sample_rate)
+        return played
+    except Exception as e:
+        print(f"❌ Streaming TTS error: {e}")
+        return False
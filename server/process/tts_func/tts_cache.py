@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+import soundfile as sf
+
+try:
+    from process.config_loader import get_config_section, resolve_project_path
+    from process.tts_func.audio_clip import AudioClip
+except ImportError:
+    from server.process.config_loader import get_config_section, resolve_project_path
+    from server.process.tts_func.audio_clip import AudioClip
+
+_file_hashes = {}
+_file_hash_lock = threading.Lock()
+
+
+def file_hash(path) -> str:
+    """SHA-256 of a file's contents, memoized on (path, size, mtime)"""
+    path = Path(path)
+    if not path.exists():
+        path = resolve_project_path(path)
+    if not path.exists():
+        # Unknown file - fall back to the path itself so keys stay stable
+        return hashlib.sha256(str(path).encode()).hexdigest()
+
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _file_hash_lock:
+        if memo_key in _file_hashes:
+            return _file_hashes[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+    with _file_hash_lock:
+        _file_hashes[memo_key] = digest.hexdigest()
+    return _file_hashes[memo_key]
+
+
+def make_key(engine: str, text: str, emotion_params: Optional[dict] = None, ref_audio_path=None,
+             prompt_text: Optional[str] = None, language: Optional[str] = None,
+             prompt_lang: Optional[str] = None) -> str:
+    """Content-addressed cache key for one synthesis request"""
+    parts = {
+        'engine': engine,
+        'text': text,
+        'emotion': emotion_params or {},
+        'ref': file_hash(ref_audio_path) if ref_audio_path else None,
+        'prompt_text': prompt_text,
+        'prompt_lang': prompt_lang,
+        'language': language,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def key_for_payload(engine: str, payload: dict) -> str:
+    """Cache key for a GPT-SoVITS request (api.py v1 or api_v2 field names)"""
+    core = {'text', 'text_lang', 'text_language', 'ref_audio_path', 'refer_wav_path',
+            'prompt_text', 'prompt_lang', 'prompt_language'}
+    return make_key(
+        engine,
+        payload.get('text', ''),
+        emotion_params={k: v for k, v in payload.items() if k not in core},
+        ref_audio_path=payload.get('ref_audio_path') or payload.get('refer_wav_path'),
+        prompt_text=payload.get('prompt_text'),
+        language=payload.get('text_lang') or payload.get('text_language'),
+        prompt_lang=payload.get('prompt_lang') or payload.get('prompt_language'),
+    )
+
+
+class TTSAudioCache:
+    """Disk cache of synthesized audio with an in-memory LRU index.
+
+    Clips are stored as FLAC under ``cache_dir`` named by their key. The
+    index is rebuilt from the directory on startup (oldest mtime first) and
+    entries are evicted least-recently-used once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, cache_dir, max_bytes: int = 256 * 1024 * 1024, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.index = OrderedDict()  # key -> compressed size on disk
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bytes_saved': 0}
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.load_index()
+
+    @classmethod
+    def from_config(cls):
+        """Build the cache from the ``tts_cache`` section of character_config.yaml"""
+        config = get_config_section('tts_cache')
+        return cls(
+            resolve_project_path(config.get('dir', 'audio/cache/tts')),
+            max_bytes=int(config.get('max_mb', 256) * 1024 * 1024),
+            enabled=config.get('enabled', True),
+        )
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.flac"
+
+    def load_index(self):
+        """Rebuild the LRU index from the files already on disk"""
+        entries = []
+        for path in self.cache_dir.glob("*.flac"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self.index[key] = size
+            self.total_bytes += size
+        self.evict()
+
+    def evict(self):
+        """Drop least-recently-used clips until we're within the byte budget"""
+        while self.total_bytes > self.max_bytes and self.index:
+            key, size = self.index.popitem(last=False)
+            self.total_bytes -= size
+            self.stats['evictions'] += 1
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
+
+    def get(self, key: str):
+        """Return (samples, sample_rate) for a cached clip, or None"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            if key not in self.index:
+                self.stats['misses'] += 1
+                return None
+            self.index.move_to_end(key)
+
+        path = self.path_for(key)
+        try:
+            samples, sample_rate = sf.read(path, dtype='float32')
+            os.utime(path)  # keep LRU order across restarts
+        except Exception:
+            with self.lock:
+                self.total_bytes -= self.index.pop(key, 0)
+                self.stats['misses'] += 1
+            return None
+
+        with self.lock:
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += samples.nbytes
+        return samples, sample_rate
+
+    def put(self, key: str, samples, sample_rate: int):
+        """Store a clip as FLAC and evict old entries if over budget"""
+        if not self.enabled:
+            return
+        path = self.path_for(key)
+        # Per-writer temp name: two threads (or processes) storing the same key mustn't share one
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            sf.write(tmp_path, samples, sample_rate, format='FLAC', subtype='PCM_16')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️ Could not cache TTS audio: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+
+        size = path.stat().st_size
+        with self.lock:
+            self.total_bytes -= self.index.pop(key, 0)
+            self.index[key] = size
+            self.total_bytes += size
+            self.stats['stores'] += 1
+            self.evict()
+
+    def get_or_synthesize_clip(self, key: str, synthesize: Callable[[], Optional[bytes]],
+                               meta: Optional[dict] = None) -> Optional[AudioClip]:
+        """Cache in front of a synthesis call that returns WAV bytes; decodes in memory"""
+        cached = self.get(key)
+        if cached is not None:
+            return AudioClip(cached[0], cached[1], dict(meta or {}, cached=True))
+
+        wav = synthesize()
+        if not wav:
+            return None
+        clip = AudioClip.from_wav_bytes(wav, dict(meta or {}, cached=False))
+        self.put(key, clip.samples, clip.sample_rate)
+        return clip
+
+    def get_or_synthesize_file(self, key: str, output_path, synthesize: Callable[[str], Optional[str]]) -> Optional[str]:
+        """Cache in front of a synthesis call that writes ``output_path``"""
+        cached = self.get(key)
+        if cached is not None:
+            sf.write(str(output_path), cached[0], cached[1])
+            return str(output_path)
+
+        result = synthesize(str(output_path))
+        if result and os.path.exists(result):
+            try:
+                samples, sample_rate = sf.read(result, dtype='float32')
+                self.put(key, samples, sample_rate)
+            except Exception as e:
+                print(f"⚠️ Could not read TTS audio for caching: {e}")
+        return result
+
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def report(self):
+        """Print hit rate, bytes saved and current cache size"""
+        print(f"💾 TTS cache: {self.hit_rate():.0%} hit rate "
+              f"({self.stats['hits']} hits / {self.stats['misses']} misses), "
+              f"{self.stats['bytes_saved'] / 1e6:.1f} MB of audio not re-synthesized, "
+              f"{self.total_bytes / 1e6:.1f}/{self.max_bytes / 1e6:.0f} MB on disk, "
+              f"{self.stats['evictions']} evictions")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSAudioCache:
+    """Shared cache so every TTS entry point hits the same index"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSAudioCache.from_config()
+        return _cache
@@ -1,21 +1,31 @@
-import os
-import tempfile
 import subprocess
-import shutil
 from pathlib import Path
-import soundfile as sf
-import sounddevice as sd
 import numpy as np
 from typing import Optional
-import yaml
 
-# Load config to get voice sample path
-with open('character_config.yaml', 'r') as f:
-    char_config = yaml.safe_load(f)
+try:
+    from process.tts_func.engine_manager import get_engine
+    from process.tts_func.voice_profile import load_voice_profile
+    from process.tts_func.voice_library import get_voice_library
+    from process.tts_func.playback_engine import get_playback_engine
+    from process.tts_func.audio_clip import AudioClip
+except ImportError:
+    from server.process.tts_func.engine_manager import get_engine
+    from server.process.tts_func.voice_profile import load_voice_profile
+    from server.process.tts_func.voice_library import get_voice_library
+    from server.process.tts_func.playback_engine import get_playback_engine
+    from server.process.tts_func.audio_clip import AudioClip
+
 
 class VoiceCloneTTS:
     def __init__(self):
-        self.voice_sample_path = Path(char_config['sovits_ping_config']['ref_audio_path'])
+        library = get_voice_library()
+        self.use_voice(library.active)
+        library.on_switch(self.use_voice)
+    
+    def use_voice(self, voice):
+        """Switch to a voice library entry and (re)load its sample"""
+        self.voice_sample_path = Path(voice.ref_audio_path)
         self.setup_voice_cloning()
         
     def setup_voice_cloning(self):
@@ -30,7 +40,10 @@ class VoiceCloneTTS:
         
         # Try to load the voice sample
         try:
-            self.voice_data, self.voice_sample_rate = sf.read(self.voice_sample_path)
+            # Samples and analysis come from the cached, memory-mapped voice profile
+            self.voice_profile = load_voice_profile(self.voice_sample_path)
+            self.voice_data = self.voice_profile.samples
+            self.voice_sample_rate = self.voice_profile.sample_rate
             print(f"✅ Loaded voice sample: {len(self.voice_data)} samples at {self.voice_sample_rate}Hz")
             self.voice_available = True
             
@@ -44,9 +57,9 @@ class VoiceCloneTTS:
     def analyze_voice_sample(self):
         """Analyze the voice sample to understand its characteristics"""
         try:
-            # Basic audio analysis
-            duration = len(self.voice_data) / self.voice_sample_rate
-            rms = np.sqrt(np.mean(self.voice_data**2))
+            # Basic audio analysis (precomputed in the voice profile)
+            duration = self.voice_profile.duration
+            rms = self.voice_profile.rms
             
             print(f"🎭 Voice sample analysis:")
             print(f"   Duration: {duration:.2f} seconds")
@@ -68,15 +81,10 @@ class VoiceCloneTTS:
     def estimate_pitch_range(self):
         """Estimate pitch range from voice sample"""
         try:
-            # Simple pitch estimation using zero crossings
-            zero_crossings = np.where(np.diff(np.signbit(self.voice_data)))[0]
-            if len(zero_crossings) > 1:
-                avg_period = np.mean(np.diff(zero_crossings)) * 2  # Approximate period
-                estimated_pitch = self.voice_sample_rate / avg_period
-                return estimated_pitch
-            return 200  # Default female pitch
+            # Zero-crossing estimate, computed once when the profile was built
+            return self.voice_profile.pitch_hz
         except:
-            return 200
+            return 200  # Default female pitch
     
     def detect_emotion(self, text: str) -> str:
         """Detect emotion from text"""
@@ -163,74 +171,65 @@ class VoiceCloneTTS:
             print(f"❌ Error creating synthesis: {e}")
             return self.voice_data  # Fallback to original
     
-    def generate_speech(self, text: str, output_path: str, emotion: Optional[str] = None) -> str:
-        """Generate speech using the character voice"""
+    def synthesize(self, text: str, emotion: Optional[str] = None) -> Optional[AudioClip]:
+        """Generate speech in memory using the character voice"""
         if not self.voice_available:
             print("❌ Character voice not available")
             return None
         
+        # Detect emotion if not provided
+        if emotion is None:
+            emotion = self.detect_emotion(text)
+        
+        print(f"🎭 Generating speech with character voice (emotion: {emotion})")
+        meta = {'engine': 'character', 'text': text, 'emotion': emotion}
+        
         try:
-            # Detect emotion if not provided
-            if emotion is None:
-                emotion = self.detect_emotion(text)
-            
-            print(f"🎭 Generating speech with character voice (emotion: {emotion})")
-            
             # Create voice synthesis
             synthesized_audio = self.create_voice_synthesis(text, emotion)
-            
-            if synthesized_audio is not None:
-                # Save the synthesized audio
-                sf.write(output_path, synthesized_audio, self.voice_sample_rate)
-                print(f"🎵 Generated character voice: {output_path}")
-                return output_path
-            else:
-                # Fallback: use original voice sample
-                print("⚠️ Using original voice sample as fallback")
-                shutil.copy2(self.voice_sample_path, output_path)
-                return output_path
-                
         except Exception as e:
             print(f"❌ Error generating speech: {e}")
-            # Fallback: copy original sample
-            try:
-                shutil.copy2(self.voice_sample_path, output_path)
-                return output_path
-            except:
-                return None
+            synthesized_audio = None
+        
+        if synthesized_audio is None:
+            # Fallback: use original voice sample
+            print("⚠️ Using original voice sample as fallback")
+            synthesized_audio = self.voice_data
+        return AudioClip(synthesized_audio, self.voice_sample_rate, meta)
+    
+    def generate_speech(self, text: str, output_path: str, emotion: Optional[str] = None) -> str:
+        """Generate speech using the character voice and save it to ``output_path``"""
+        clip = self.synthesize(text, emotion)
+        if clip is None:
+            return None
+        
+        try:
+            clip.save(output_path)
+            print(f"🎵 Generated character voice: {output_path}")
+            return output_path
+        except Exception as e:
+            print(f"❌ Error saving speech: {e}")
+            return None
     
     def play_character_voice(self, text: str, emotion: Optional[str] = None):
-        """Play character voice directly"""
+        """Play character voice directly (never touches disk)"""
         try:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                tmp_path = tmp_file.name
-            
-            audio_path = self.generate_speech(text, tmp_path, emotion)
-            if audio_path:
-                data, samplerate = sf.read(audio_path)
-                sd.play(data, samplerate)
-                sd.wait()
-                # Clean up after playback
-                try:
-                    os.unlink(tmp_path)
-                except:
-                    pass  # Ignore cleanup errors
+            clip = self.synthesize(text, emotion)
+            if clip is not None:
+                clip.play().wait()
         except Exception as e:
             print(f"❌ Error playing character voice: {e}")
 
 def play_audio(path):
     """Play audio file"""
     try:
-        data, samplerate = sf.read(path)
-        sd.play(data, samplerate)
-        sd.wait()
+        get_playback_engine().play_file(path).wait()
     except Exception as e:
         print(f"❌ Error playing audio: {e}")
 
 def sovits_gen_character(text: str, output_path: str = "output.wav", emotion: Optional[str] = None) -> str:
     """Generate TTS using character voice (replaces other TTS functions)"""
-    voice_clone = VoiceCloneTTS()
-    return voice_clone.generate_speech(text, output_path, emotion)
+    return get_engine('character').generate_speech(text, output_path, emotion)
 
 # For compatibility
 def sovits_gen(text: str, output_path: str = "output.wav") -> str:
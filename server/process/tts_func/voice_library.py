@@ -0,0 +1,266 @@
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import yaml
+
+try:
+    from process.config_loader import get_config_section, load_char_config, resolve_project_path
+    from process.tts_func.voice_profile import load_voice_profile
+    from process.tts_func.reference_prep import get_reference_prep
+except ImportError:
+    from server.process.config_loader import get_config_section, load_char_config, resolve_project_path
+    from server.process.tts_func.voice_profile import load_voice_profile
+    from server.process.tts_func.reference_prep import get_reference_prep
+
+DEFAULT_VOICE = 'default'
+WARMUP_TEXT = "Hello."
+
+
+class Voice:
+    """One reference clip plus everything GPT-SoVITS needs to speak with it"""
+
+    def __init__(self, name: str, ref_audio_path, prompt_text: str = "", prompt_lang: str = "en",
+                 text_lang: str = "en", preset: str = "default", meta: Optional[Dict] = None):
+        self.name = name
+        # What the user supplied, and what GPT-SoVITS gets (the cleaned clip once scan() prepared it)
+        self.source_audio_path = str(ref_audio_path)
+        self.ref_audio_path = str(ref_audio_path)
+        self.prompt_text = prompt_text
+        self.prompt_lang = prompt_lang
+        self.text_lang = text_lang
+        self.preset = preset
+        self.meta = meta or {}
+        # Emotion -> variant of this voice with its own reference clip and prompt
+        self.emotions: Dict[str, 'Voice'] = {}
+        self._profile = None
+
+    @classmethod
+    def from_directory(cls, directory: Path) -> Optional['Voice']:
+        """Load ``<dir>/voice.yaml`` (ref_audio defaults to the first WAV in the directory)"""
+        meta_path = directory / 'voice.yaml'
+        meta = {}
+        if meta_path.exists():
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = yaml.safe_load(f) or {}
+
+        ref = meta.pop('ref_audio', None)
+        ref_path = directory / ref if ref else next(iter(sorted(directory.glob('*.wav'))), None)
+        if ref_path is None or not ref_path.exists():
+            print(f"⚠️ Voice '{directory.name}' has no reference audio - skipping")
+            return None
+
+        emotions = meta.pop('emotions', None) or {}
+        voice = cls(
+            directory.name,
+            ref_path,
+            prompt_text=meta.pop('prompt_text', ''),
+            prompt_lang=meta.pop('prompt_lang', 'en'),
+            text_lang=meta.pop('text_lang', 'en'),
+            preset=meta.pop('preset', 'default'),
+            meta=meta,
+        )
+        voice.add_emotions(emotions, directory)
+        return voice
+
+    def add_emotions(self, emotions: Dict, base_dir: Path):
+        """Attach per-emotion references (``{emotion: {ref_audio, prompt_text, prompt_lang}}``)"""
+        for emotion, entry in emotions.items():
+            ref = Path(entry.get('ref_audio', ''))
+            ref_path = ref if ref.is_absolute() else base_dir / ref
+            if not entry.get('ref_audio') or not ref_path.exists():
+                print(f"⚠️ Voice '{self.name}' emotion '{emotion}' has no reference audio - using the base clip")
+                continue
+            self.emotions[emotion] = Voice(
+                f"{self.name}:{emotion}",
+                ref_path,
+                prompt_text=entry.get('prompt_text', ''),
+                prompt_lang=entry.get('prompt_lang', self.prompt_lang),
+                text_lang=self.text_lang,
+                preset=self.preset,
+            )
+
+    def for_emotion(self, emotion: Optional[str]) -> 'Voice':
+        """Reference to speak ``emotion`` with - its own clip if one is configured, else this voice"""
+        return self.emotions.get(emotion, self)
+
+    @property
+    def profile(self):
+        """Memory-mapped, preprocessed reference audio (built on first use)"""
+        if self._profile is None:
+            self._profile = load_voice_profile(self.ref_audio_path)
+        return self._profile
+
+    @property
+    def system_prompt(self) -> Optional[str]:
+        """Persona prompt from the ``presets`` entry this voice is paired with"""
+        presets = load_char_config().get('presets', {})
+        return presets.get(self.preset, presets.get('default', {})).get('system_prompt')
+
+
+class VoiceLibrary:
+    """Directory of reference voices with a switchable active voice.
+
+    Each subdirectory of ``voices_dir`` is one voice (a WAV plus an optional
+    ``voice.yaml`` with prompt_text, prompt_lang, text_lang, preset and an
+    ``emotions`` map of per-emotion clips). The voice from
+    ``sovits_ping_config`` is always available as ``default``, with its
+    emotion clips taken from ``emotion_refs``.
+    TTS modules read ``active`` on every request, so ``switch`` takes effect
+    on the next sentence without restarting anything.
+    """
+
+    def __init__(self, voices_dir, active: str = DEFAULT_VOICE):
+        self.voices_dir = Path(voices_dir)
+        self.voices: Dict[str, Voice] = {}
+        self.lock = threading.Lock()
+        self.listeners: List[Callable[[Voice], None]] = []
+        self.scan()
+        if active not in self.voices:
+            print(f"⚠️ Voice '{active}' not found in {self.voices_dir} - using '{DEFAULT_VOICE}'. "
+                  f"Available: {', '.join(self.voices)}")
+            active = DEFAULT_VOICE
+        self.active_name = active
+
+    @classmethod
+    def from_config(cls):
+        """Build the library from the ``voice_library`` section of character_config.yaml"""
+        config = get_config_section('voice_library')
+        return cls(resolve_project_path(config.get('dir', 'audio/voices')),
+                   active=config.get('active', DEFAULT_VOICE))
+
+    def scan(self):
+        """(Re)load the voice directory; the config voice stays as ``default``"""
+        ping = get_config_section('sovits_ping_config')
+        default = Voice(
+            DEFAULT_VOICE,
+            resolve_project_path(ping.get('ref_audio_path', 'audio/voice_samples/main_sample.wav')),
+            prompt_text=ping.get('prompt_text', ''),
+            prompt_lang=ping.get('prompt_lang', 'en'),
+            text_lang=ping.get('text_lang', 'en'),
+        )
+        default.add_emotions(get_config_section('emotion_refs'), resolve_project_path('.'))
+        voices = {DEFAULT_VOICE: default}
+        if self.voices_dir.is_dir():
+            for directory in sorted(p for p in self.voices_dir.iterdir() if p.is_dir()):
+                voice = Voice.from_directory(directory)
+                if voice is not None:
+                    voices[voice.name] = voice
+
+        # Trimmed, length-clamped references (cached by source hash, so cheap after the first run);
+        # emotion clips too, so picking one at synthesis time is just a dict lookup
+        prep = get_reference_prep()
+        for voice in voices.values():
+            for variant in [voice, *voice.emotions.values()]:
+                variant.ref_audio_path = prep.prepare(variant.source_audio_path)
+
+        with self.lock:
+            # Keep already-loaded profiles for voices that didn't change
+            for name, voice in voices.items():
+                old = self.voices.get(name)
+                if old is not None and old.ref_audio_path == voice.ref_audio_path:
+                    voice._profile = old._profile
+            self.voices = voices
+
+    def names(self) -> List[str]:
+        return list(self.voices)
+
+    def get(self, name: str) -> Voice:
+        if name not in self.voices:
+            raise KeyError(f"Unknown voice '{name}'. Available: {', '.join(self.voices)}")
+        return self.voices[name]
+
+    def voice_for_reference(self, ref_audio_path) -> Optional[Voice]:
+        """The voice a reference clip (prepared or source) belongs to; emotion clips map to their base voice"""
+        path = str(ref_audio_path)
+        with self.lock:
+            voices = list(self.voices.values())
+        for voice in voices:
+            for variant in [voice, *voice.emotions.values()]:
+                if path in (variant.ref_audio_path, variant.source_audio_path):
+                    return voice
+        return None
+
+    @property
+    def active(self) -> Voice:
+        with self.lock:
+            return self.voices.get(self.active_name) or self.voices[DEFAULT_VOICE]
+
+    def on_switch(self, callback: Callable[[Voice], None]):
+        """Register a callback run with the new voice after every switch"""
+        self.listeners.append(callback)
+
+    def switch(self, name: str, prewarm: bool = True) -> Voice:
+        """Make ``name`` the active voice; optionally warm the server with it in the background"""
+        voice = self.get(name)
+        # Preprocess before switching so the first sentence doesn't pay for it
+        voice.profile
+        with self.lock:
+            self.active_name = name
+        print(f"🎙️ Active voice: {name}")
+
+        for callback in self.listeners:
+            try:
+                callback(voice)
+            except Exception as e:
+                print(f"⚠️ Voice switch listener failed: {e}")
+
+        if prewarm:
+            threading.Thread(target=self.prewarm, args=(voice,), daemon=True).start()
+        return voice
+
+    def prewarm(self, voice: Voice):
+        """Register the new reference on every GPT-SoVITS worker (a tiny synthesis where there's no endpoint for it
+        or the worker is still busy with the old one)"""
+        try:
+            try:
+                from process.tts_func.sovits_supervisor import get_sovits_supervisor
+            except ImportError:
+                from server.process.tts_func.sovits_supervisor import get_sovits_supervisor
+
+            for worker in get_sovits_supervisor().workers:
+                client = worker.client
+                if client.set_reference(voice.ref_audio_path, voice.prompt_text, voice.prompt_lang):
+                    continue
+                method, path, kwargs = client.build_request({
+                    "text": WARMUP_TEXT,
+                    "text_lang": voice.text_lang,
+                    "ref_audio_path": voice.ref_audio_path,
+                    "prompt_text": voice.prompt_text,
+                    "prompt_lang": voice.prompt_lang,
+                })
+                client.request(method, path, **kwargs).raise_for_status()
+            print(f"🔥 GPT-SoVITS warmed up for voice '{voice.name}'")
+        except Exception as e:
+            print(f"⚠️ Could not pre-warm voice '{voice.name}': {e}")
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_voice_library() -> VoiceLibrary:
+    """Shared library so a switch is seen by every TTS module"""
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = VoiceLibrary.from_config()
+        return _library
+
+
+def get_active_voice() -> Voice:
+    return get_voice_library().active
+
+
+def switch_voice(name: str, prewarm: bool = True) -> Voice:
+    """Hot-switch the voice used by all TTS modules"""
+    return get_voice_library().switch(name, prewarm)
+
+
+if __name__ == "__main__":
+    library = get_voice_library()
+    for name in library.names():
+        voice = library.get(name)
+        marker = "*" if name == library.active.name else " "
+        print(f"{marker} {name}: {voice.ref_audio_path} (preset: {voice.preset})")
+        for emotion, variant in voice.emotions.items():
+            print(f"     {emotion}: {variant.ref_audio_path}")
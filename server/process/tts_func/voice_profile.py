@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+import soundfile as sf
+
+try:
+    from process.config_loader import resolve_project_path
+    from process.asr_func.audio_preprocess import silence_bounds, to_float32_mono
+    from process.tts_func.tts_cache import file_hash
+except ImportError:
+    from server.process.config_loader import resolve_project_path
+    from server.process.asr_func.audio_preprocess import silence_bounds, to_float32_mono
+    from server.process.tts_func.tts_cache import file_hash
+
+PROFILE_DIR = 'audio/cache/voice_profiles'
+
+# Bump when the analysis changes so stale profiles are recomputed
+PROFILE_VERSION = 1
+
+
+def zero_crossing_pitch(mono: np.ndarray, sample_rate: int, default: float = 200.0) -> float:
+    """Rough pitch from the mean zero-crossing interval (what the voice modules always used)"""
+    zero_crossings = np.where(np.diff(np.signbit(mono)))[0]
+    if len(zero_crossings) > 1:
+        avg_period = np.mean(np.diff(zero_crossings)) * 2  # Approximate period
+        return float(sample_rate / avg_period)
+    return default
+
+
+def frame_pitches(mono: np.ndarray, sample_rate: int, frame_ms=40, fmin=80.0, fmax=500.0) -> np.ndarray:
+    """Autocorrelation f0 of each voiced frame, in Hz"""
+    frame = int(sample_rate * frame_ms / 1000)
+    min_lag, max_lag = int(sample_rate / fmax), int(sample_rate / fmin)
+    if frame <= max_lag or len(mono) < frame:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = mono[:len(mono) // frame * frame].reshape(-1, frame)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    voiced = frames[energy > max(0.01, energy.max() * 0.1)]
+
+    pitches = []
+    for f in voiced:
+        f = f - f.mean()
+        corr = np.correlate(f, f, mode='full')[frame - 1:]
+        if corr[0] <= 0:
+            continue
+        lag = min_lag + int(np.argmax(corr[min_lag:max_lag]))
+        # Only keep clearly periodic frames
+        if corr[lag] / corr[0] > 0.3:
+            pitches.append(sample_rate / lag)
+    return np.asarray(pitches, dtype=np.float32)
+
+
+class VoiceProfile:
+    """Analysis of a reference clip, computed once and cached on disk.
+
+    The samples are stored as a float32 ``.npy`` (memory-mapped on load) and
+    the statistics as a ``.json`` sidecar, both named by the WAV's content
+    hash so editing the clip produces a new profile.
+    """
+
+    def __init__(self, samples: np.ndarray, meta: Dict):
+        self.samples = samples
+        self.meta = meta
+        self.sample_rate = meta['sample_rate']
+        self.duration = meta['duration']
+        self.rms = meta['rms']
+        self.pitch_hz = meta['pitch_hz']
+        self.pitch_stats = meta['pitch_stats']
+        self.trim_start = meta['trim_start']
+        self.trim_end = meta['trim_end']
+
+    @property
+    def trimmed(self) -> np.ndarray:
+        """Samples without leading/trailing silence"""
+        return self.samples[self.trim_start:self.trim_end]
+
+    def characteristics(self) -> Dict:
+        """Summary in the shape VoiceCloneTTS.voice_characteristics uses"""
+        return {
+            'duration': self.duration,
+            'rms': self.rms,
+            'sample_rate': self.sample_rate,
+            'pitch_range': self.pitch_hz,
+        }
+
+    @classmethod
+    def compute(cls, wav_path, npy_path: Path, meta_path: Path, digest: str) -> 'VoiceProfile':
+        """Read and analyze the WAV, then write the profile artifacts"""
+        samples, sample_rate = sf.read(wav_path, dtype='float32')
+        mono = to_float32_mono(samples)
+        start, end = silence_bounds(mono, sample_rate)
+        pitches = frame_pitches(mono[start:end], sample_rate)
+
+        meta = {
+            'version': PROFILE_VERSION,
+            'source': str(wav_path),
+            'hash': digest,
+            'sample_rate': int(sample_rate),
+            'channels': 1 if samples.ndim == 1 else int(samples.shape[1]),
+            'duration': len(samples) / sample_rate,
+            'rms': float(np.sqrt(np.mean(samples ** 2))) if samples.size else 0.0,
+            'pitch_hz': zero_crossing_pitch(mono, sample_rate),
+            'pitch_stats': {
+                'median': float(np.median(pitches)) if pitches.size else None,
+                'p10': float(np.percentile(pitches, 10)) if pitches.size else None,
+                'p90': float(np.percentile(pitches, 90)) if pitches.size else None,
+                'voiced_frames': int(pitches.size),
+            },
+            'trim_start': start,
+            'trim_end': end,
+        }
+
+        npy_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_npy = npy_path.with_suffix('.tmp.npy')
+        np.save(tmp_npy, samples)
+        os.replace(tmp_npy, npy_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        print(f"🎼 Built voice profile for {Path(wav_path).name}")
+        return cls(np.load(npy_path, mmap_mode='r'), meta)
+
+
+_profiles: Dict[str, VoiceProfile] = {}
+_profiles_lock = threading.Lock()
+
+
+def load_voice_profile(wav_path, profile_dir: Optional[str] = None) -> VoiceProfile:
+    """Profile for a reference WAV: memoized in-process, then on disk, else computed"""
+    wav_path = Path(wav_path)
+    if not wav_path.exists():
+        wav_path = resolve_project_path(wav_path)
+    if not wav_path.exists():
+        raise FileNotFoundError(f"Voice sample not found: {wav_path}")
+
+    digest = file_hash(wav_path)
+    with _profiles_lock:
+        if digest in _profiles:
+            return _profiles[digest]
+
+        base = resolve_project_path(profile_dir or PROFILE_DIR) / digest[:16]
+        npy_path, meta_path = base.with_suffix('.npy'), base.with_suffix('.json')
+
+        profile = None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') == PROFILE_VERSION and meta.get('hash') == digest:
+                profile = VoiceProfile(np.load(npy_path, mmap_mode='r'), meta)
+        except (OSError, ValueError, KeyError):
+            profile = None
+
+        if profile is None:
+            profile = VoiceProfile.compute(wav_path, npy_path, meta_path, digest)
+
+        _profiles[digest] = profile
+        return profile
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    for path in sys.argv[1:]:
+        start = time.perf_counter()
+        profile = load_voice_profile(path)
+        print(f"{path}: {profile.duration:.2f}s @ {profile.sample_rate}Hz, rms {profile.rms:.4f}, "
+              f"pitch ~{profile.pitch_hz:.0f}Hz {profile.pitch_stats}, "
+              f"voiced {profile.trim_start}-{profile.trim_end} "
+              f"({(time.perf_counter() - start) * 1000:.1f} ms)")